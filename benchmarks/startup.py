@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2025 Olivier Churlaud <olivier@churlaud.com>
+# SPDX-FileCopyrightText: 2025 CNES
+#
+# SPDX-License-Identifier: MIT
+
+"""Measure the time spent importing modules when opsconf starts, and check it against a budget.
+
+The import time is given by `python3 -X importtime`. Each case is run several times and the
+fastest run is kept. A first run, not measured, writes the bytecode cache of the modules, as it is
+for an installed opsconf: the compilation of the sources is not part of the startup. It must be run
+from an opsconf repository, with opsconf in the PYTHONPATH.
+
+The times depend on the machine and on its load, so this benchmark is run by hand and is not part of
+the tests.
+
+Usage:
+    benchmarks/startup.py [--runs N] [--budget CASE=MS ...] [--details]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+OPSCONF_BIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'bin', 'opsconf')
+
+# the arguments given to python3 for each case
+CASES = [
+    ('help', [OPSCONF_BIN, '--help']),
+    ('status', [OPSCONF_BIN, 'status', '--offline']),
+    # the git hooks only import these modules before doing their checks
+    ('hooks', ['-c', 'import opsconf\nfrom opsconf import libgit']),
+    ]
+
+# the maximum import time of each case, in milliseconds
+BUDGETS = {
+    'help': 80,
+    'status': 100,
+    'hooks': 60,
+    }
+
+
+def parseImportTime(stderr):
+    """Parse the output of `python3 -X importtime`.
+
+    Args:
+        stderr (str): the standard error of the command.
+
+    Returns:
+        (int, list of (str, int)): the total import time and the cumulative time of each top-level
+                                   import, in microseconds.
+    """
+    topLevelImports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit() and not name.startswith('  '):
+            # only the top-level imports, their cumulative time contains the nested ones
+            topLevelImports.append((name.strip(), int(cumulative)))
+    return sum(duration for _, duration in topLevelImports), topLevelImports
+
+
+def measure(arguments, runs):
+    """Measure the import time of a case.
+
+    Args:
+        arguments (list of str): the arguments given to python3.
+        runs (int): the number of runs.
+
+    Returns:
+        (int, list of (str, int)): the import times of the fastest run (see `parseImportTime()`).
+    """
+    # the bytecode is written even if the environment disables it
+    environment = dict(os.environ)
+    environment.pop('PYTHONDONTWRITEBYTECODE', None)
+    subprocess.run([sys.executable] + arguments, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                   env=environment, check=False)
+
+    results = []
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, '-X', 'importtime'] + arguments,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=False)
+        results.append(parseImportTime(proc.stderr.decode('utf-8')))
+    return min(results, key=lambda result: result[0])
+
+
+def main():
+    """Run the benchmark.
+
+    Returns:
+        int: 0 if all the cases are within their budget, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(description="Check the import time of opsconf at startup.")
+    parser.add_argument('--runs', help="number of runs per case (default: 5)", type=int, default=5)
+    parser.add_argument('--budget', help="the budget of a case, in milliseconds", metavar='CASE=MS',
+                        action='append', default=[])
+    parser.add_argument('--details', help="show the slowest top-level imports", action='store_true')
+    args = parser.parse_args()
+
+    budgets = dict(BUDGETS)
+    for budget in args.budget:
+        case, milliseconds = budget.split('=', 1)
+        budgets[case] = float(milliseconds)
+
+    overBudget = 0
+    print("| {:<8} | {:>10} | {:>10} | {:<6} |".format('Case', 'Time (ms)', 'Budget', 'Status'))
+    for case, arguments in CASES:
+        total, topLevelImports = measure(arguments, args.runs)
+        status = 'OK' if total / 1000 <= budgets[case] else 'KO'
+        if status == 'KO':
+            overBudget += 1
+        print("| {:<8} | {:>10.1f} | {:>10.1f} | {:<6} |".format(case, total / 1000, budgets[case], status))
+        if args.details:
+            for name, duration in sorted(topLevelImports, key=lambda item: item[1], reverse=True)[:10]:
+                print("|   {:<30} {:>10.1f} ms".format(name, duration / 1000))
+    return 1 if overBudget > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2025 Olivier Churlaud <olivier@churlaud.com>
+# SPDX-FileCopyrightText: 2025 CNES
+#
+# SPDX-License-Identifier: MIT
+
+"""Measure the opsconf subcommands on a generated repository, and compare them to a baseline.
+
+An opsconf repository of the requested shape is generated with its bare remote in a temporary
+directory: its history is written with `git fast-import`, then a part of the files is qualified and
+validated. Each subcommand is then run and measured: wall time, number of git processes (counted
+by a `git` wrapper put first in the PATH) and peak RSS of the process tree.
+
+The read-only subcommands are run several times and the fastest run is kept. The other ones change
+the repository, so they are run once, in the order of CASES.
+
+Usage:
+    benchmarks/subcommands.py [--files N] [--versions N] [--tags N] [--deletions N] [--promotion-ratio R]
+                              [--runs N] [--output FILE] [--baseline FILE] [--tolerance R] [--keep DIR]
+"""
+
+import argparse
+import csv
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+OPSCONF_BIN = os.path.join(ROOT_DIR, 'src', 'bin', 'opsconf')
+OPSCONF_LIB = os.path.join(ROOT_DIR, 'src', 'lib')
+OPSCONF_SHARE = os.path.join(ROOT_DIR, 'src', 'share')
+
+FILES_PER_DIRECTORY = 20
+LINES_PER_FILE = 20
+# the git wrapper that counts the git processes before running the real git
+GIT_WRAPPER = """#!/bin/sh
+echo "$$" >> "$OPSCONF_BENCH_GIT_LOG"
+exec {git} "$@"
+"""
+
+# the subcommands, as (<name>, <function giving the arguments and the stdin>, <whether it is read-only>)
+CASES = [
+    ('status', lambda repo: (['status', '--offline'], None), True),
+    ('status-notes', lambda repo: (['status', '--offline', '--with-notes'], None), True),
+    ('log', lambda repo: (['log', '--offline', repo['promoted'][0]], None), True),
+    ('log-all', lambda repo: (['log', '--offline', '--all', repo['promoted'][0]], None), True),
+    ('diff', lambda repo: (['diff', '--offline', repo['promoted'][0], '1', str(repo['versions'])], None), True),
+    ('qualify', lambda repo: (['qualify', '-m', 'benchmark', repo['promoted'][0]], None), False),
+    ('validate', lambda repo: (['validate', '-m', 'benchmark', repo['promoted'][0]], None), False),
+    ('qualifyFromFile-dry-run', lambda repo: (['toolbox', 'qualifyFromFile', '--dry-run', repo['csv']], None), True),
+    ('qualifyFromFile', lambda repo: (['toolbox', 'qualifyFromFile', '-m', 'benchmark', repo['csv']], None), False),
+    ('validateFromFile', lambda repo: (['toolbox', 'validateFromFile', '-m', 'benchmark', repo['csv']], None), False),
+    ('commit-r', lambda repo: (['commit', '-r', '-m', 'benchmark', repo['changedDirectory']], None), False),
+    ('remove-r', lambda repo: (['remove', '-r', '-m', 'benchmark', repo['removedDirectory']], b'y\n'), False),
+    ]
+
+
+def _git(arguments, cwd, inputContent=None):
+    """Internal function to run git and get its output.
+
+    Args:
+        arguments (list of str): the arguments of git.
+        cwd (str): the path where to run git from.
+        inputContent (bytes, optional): a content to feed to git through the stdin. Defaults to None.
+
+    Returns:
+        str: the stdout of git.
+    """
+    proc = subprocess.run(['git'] + arguments, cwd=cwd, input=inputContent, stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE, check=True)
+    return proc.stdout.decode('utf-8')
+
+
+def _getEnvironment(gitLog=None, wrapperDir=None):
+    """Internal function to get the environment of the opsconf processes.
+
+    Args:
+        gitLog (str, optional): the file where the git wrapper counts the git processes. Defaults to None.
+        wrapperDir (str, optional): the directory of the git wrapper. Defaults to None (no wrapper).
+
+    Returns:
+        dict: the environment.
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([OPSCONF_LIB] + [path for path in [env.get('PYTHONPATH')] if path])
+    env['OPSCONF_DIR'] = OPSCONF_SHARE
+    env['GIT_AUTHOR_NAME'] = env['GIT_COMMITTER_NAME'] = 'Benchmark'
+    env['GIT_AUTHOR_EMAIL'] = env['GIT_COMMITTER_EMAIL'] = 'benchmark@opsconf.tld'
+    if wrapperDir is not None:
+        env['PATH'] = os.pathsep.join([wrapperDir, env.get('PATH', '')])
+        env['OPSCONF_BENCH_GIT_LOG'] = gitLog
+    return env
+
+
+def _getIdent(timestamp):
+    """Internal function to get the identity of the generated commits, for `git fast-import`.
+
+    Args:
+        timestamp (int): the date of the commit.
+
+    Returns:
+        str: the identity and the date.
+    """
+    return 'Benchmark <benchmark@opsconf.tld> {} +0000'.format(timestamp)
+
+
+def _writeHistory(local, shape):
+    """Internal function to write the history of the branch work with a single `git fast-import`.
+
+    Each round changes every file once, so that each file has one version per round. The deleted
+    files are removed at the end.
+
+    Args:
+        local (str): the path of the local repository.
+        shape (dict): the shape of the repository.
+
+    Returns:
+        (list of str, list of str): the files that still exist and the files that were deleted.
+    """
+    files = ['dir{:03d}/file{:05d}.txt'.format(k // FILES_PER_DIRECTORY, k) for k in range(shape['files'])]
+    deleted = files[len(files) - shape['deletions']:] if shape['deletions'] > 0 else []
+    parent = _git(['rev-parse', 'refs/heads/work'], local).strip()
+
+    stream = []
+    timestamp = 1700000000
+    mark = 0
+    for version in range(1, shape['versions'] + 1):
+        for filename in files:
+            mark += 1
+            timestamp += 1
+            message = 'v{}: change {} for the benchmark\n'.format(version, filename).encode('utf-8')
+            content = ''.join('{} line {} of v{}\n'.format(filename, line, version)
+                              for line in range(LINES_PER_FILE)).encode('utf-8')
+            stream.append('commit refs/heads/work\nmark :{mark}\nauthor {ident}\ncommitter {ident}\ndata {size}\n'
+                          .format(mark=mark, ident=_getIdent(timestamp), size=len(message)).encode('utf-8'))
+            stream.append(message)
+            if mark == 1:
+                stream.append('from {}\n'.format(parent).encode('utf-8'))
+            stream.append('M 100644 inline {}\ndata {}\n'.format(filename, len(content)).encode('utf-8'))
+            stream.append(content)
+            stream.append(b'\n')
+    for filename in deleted:
+        timestamp += 1
+        message = 'vZZ: remove {} for the benchmark\n'.format(filename).encode('utf-8')
+        stream.append('commit refs/heads/work\nauthor {ident}\ncommitter {ident}\ndata {size}\n'
+                      .format(ident=_getIdent(timestamp), size=len(message)).encode('utf-8'))
+        stream.append(message)
+        stream.append('D {}\n\n'.format(filename).encode('utf-8'))
+    _git(['fast-import', '--quiet'], local, inputContent=b''.join(stream))
+
+    # the tags are spread over the history
+    commits = _git(['rev-list', '--reverse', 'work'], local).split()
+    for k in range(shape['tags']):
+        commitHash = commits[(k + 1) * len(commits) // (shape['tags'] + 1)]
+        _git(['tag', '-a', '-m', 'Benchmark tag {}'.format(k), 'bench-tag-{:03d}'.format(k), commitHash], local)
+
+    _git(['reset', '-q', '--hard', 'work'], local)
+    _git(['push', '-q', '--tags', 'origin', 'work'], local)
+    return [filename for filename in files if filename not in deleted], deleted
+
+
+def generateRepository(workDir, shape):
+    """Generate an opsconf repository and its bare remote.
+
+    Args:
+        workDir (str): the directory where to create them.
+        shape (dict): the shape of the repository, as {'files': <int>, 'versions': <int>, 'tags': <int>,
+                      'deletions': <int>, 'promotionRatio': <float>}.
+
+    Returns:
+        dict: the description of the repository used by the CASES.
+    """
+    remote = os.path.join(workDir, 'remote.git')
+    local = os.path.join(workDir, 'local')
+    env = _getEnvironment()
+    subprocess.run(['git', 'init', '-q', '--bare', remote], check=True)
+    subprocess.run(['git', 'clone', '-q', remote, local], check=True, stderr=subprocess.DEVNULL)
+    for key, value in [('user.name', 'Benchmark'), ('user.email', 'benchmark@opsconf.tld')]:
+        _git(['config', key, value], local)
+    subprocess.run([sys.executable, OPSCONF_BIN, 'init'], cwd=local, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    files, deleted = _writeHistory(local, shape)
+
+    # a part of the files is qualified and validated in older versions, so that they can be promoted again
+    promoted = files[:max(1, int(len(files) * shape['promotionRatio']))]
+    script = ("import sys\nimport opsconf\nfiles = sys.argv[2:]\n"
+              "opsconf.promoteVersions(opsconf.OPSCONF_BRANCH_QUALIF, [(f, max(1, {v} - 1)) for f in files], 'setup')\n"
+              "opsconf.promoteVersions(opsconf.OPSCONF_BRANCH_VALID, [(f, max(1, {v} - 2)) for f in files], 'setup')\n"
+              .format(v=shape['versions']))
+    subprocess.run([sys.executable, '-c', script, 'promote'] + promoted, cwd=local, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+
+    # the toolbox scripts promote the last versions of the other promoted files
+    csvPath = os.path.join(workDir, 'promotion.csv')
+    with open(csvPath, 'w') as f:
+        csvWriter = csv.writer(f, delimiter=';')
+        csvWriter.writerow(['filename', 'version'])
+        for filename in promoted[1:]:
+            csvWriter.writerow([filename, shape['versions']])
+
+    # commit -r changes the first directory, remove -r removes the last one of the remaining files
+    changedDirectory = os.path.dirname(files[0])
+    removedDirectory = os.path.dirname(files[-1])
+    for filename in files:
+        if os.path.dirname(filename) == changedDirectory:
+            with open(os.path.join(local, filename), 'a') as f:
+                f.write("changed for the benchmark\n")
+
+    return {
+        'local': local,
+        'versions': shape['versions'],
+        'files': files,
+        'deleted': deleted,
+        'promoted': promoted,
+        'csv': csvPath,
+        'changedDirectory': changedDirectory,
+        'removedDirectory': removedDirectory,
+        }
+
+
+def runCase(repo, arguments, inputContent, wrapperDir):
+    """Run an opsconf subcommand and measure it.
+
+    Args:
+        repo (dict): the description of the repository.
+        arguments (list of str): the arguments of opsconf.
+        inputContent (bytes or None): a content to feed to opsconf through the stdin.
+        wrapperDir (str): the directory of the git wrapper.
+
+    Returns:
+        dict: the measures as {'wallTime': <float, in seconds>, 'gitProcesses': <int>,
+              'peakRssKiB': <int>, 'returnCode': <int>}.
+    """
+    gitLog = os.path.join(wrapperDir, 'git.log')
+    with open(gitLog, 'w'):
+        pass
+    env = _getEnvironment(gitLog, wrapperDir)
+
+    startTime = time.perf_counter()
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen([sys.executable, OPSCONF_BIN] + arguments, cwd=repo['local'], env=env,
+                                stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderr)
+        if inputContent is not None:
+            proc.stdin.write(inputContent)
+        proc.stdin.close()
+        # wait4 gives the resource usage of the process and of the processes it waited for
+        _, status, rusage = os.wait4(proc.pid, 0)
+        wallTime = time.perf_counter() - startTime
+        proc.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+        if proc.returncode != 0:
+            stderr.seek(0)
+            sys.stderr.write(stderr.read().decode('utf-8', 'replace'))
+
+    with open(gitLog, 'r') as f:
+        gitProcesses = sum(1 for _ in f)
+    return {'wallTime': wallTime, 'gitProcesses': gitProcesses, 'peakRssKiB': rusage.ru_maxrss,
+            'returnCode': proc.returncode}
+
+
+def compareToBaseline(results, baseline, tolerance):
+    """Compare the results to a baseline.
+
+    Args:
+        results (dict): the results of the cases.
+        baseline (dict): the results of the baseline.
+        tolerance (float): the accepted ratio between the results and the baseline.
+
+    Returns:
+        list of str: the regressions.
+    """
+    regressions = []
+    for case, measures in results.items():
+        if case not in baseline:
+            continue
+        for key in ['wallTime', 'gitProcesses', 'peakRssKiB']:
+            reference = baseline[case][key]
+            if reference > 0 and measures[key] > reference * tolerance:
+                regressions.append("{}: {} is {:.2f} times the baseline ({} > {})"
+                                   .format(case, key, measures[key] / reference, measures[key], reference))
+    return regressions
+
+
+def main():
+    """Run the benchmark.
+
+    Returns:
+        int: 0 if all the cases succeed without regression, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(description="Measure the opsconf subcommands on a generated repository.")
+    parser.add_argument('--files', help="number of files (default: 200)", type=int, default=200)
+    parser.add_argument('--versions', help="number of versions per file (default: 5)", type=int, default=5)
+    parser.add_argument('--tags', help="number of tags (default: 5)", type=int, default=5)
+    parser.add_argument('--deletions', help="number of deleted files (default: 10)", type=int, default=10)
+    parser.add_argument('--promotion-ratio', help="ratio of files qualified and validated (default: 0.5)",
+                        type=float, default=0.5, dest='promotionRatio')
+    parser.add_argument('--runs', help="number of runs of the read-only cases (default: 3)", type=int, default=3)
+    parser.add_argument('--output', help="the JSON file where to write the results", metavar='FILE')
+    parser.add_argument('--baseline', help="the JSON file of the results to compare to", metavar='FILE')
+    parser.add_argument('--tolerance', help="the accepted ratio to the baseline (default: 1.25)", type=float,
+                        default=1.25)
+    parser.add_argument('--keep', help="generate the repository in DIR and keep it", metavar='DIR')
+    args = parser.parse_args()
+
+    shape = {'files': args.files, 'versions': args.versions, 'tags': args.tags, 'deletions': args.deletions,
+             'promotionRatio': args.promotionRatio}
+    if shape['files'] - shape['deletions'] < 2:
+        parser.error("at least 2 files must remain after the deletions")
+
+    workDir = args.keep if args.keep is not None else tempfile.mkdtemp(prefix='opsconf-bench-')
+    os.makedirs(workDir, exist_ok=True)
+    try:
+        startTime = time.perf_counter()
+        repo = generateRepository(workDir, shape)
+        print("Repository generated in {:.1f} s: {}".format(time.perf_counter() - startTime, shape))
+
+        wrapperDir = os.path.join(workDir, 'bin')
+        os.makedirs(wrapperDir, exist_ok=True)
+        wrapper = os.path.join(wrapperDir, 'git')
+        with open(wrapper, 'w') as f:
+            f.write(GIT_WRAPPER.format(git=shutil.which('git')))
+        os.chmod(wrapper, 0o755)
+
+        results = {}
+        failures = 0
+        print("| {:<24} | {:>10} | {:>6} | {:>10} | {:<6} |".format('Case', 'Time (s)', 'Git', 'RSS (MiB)', 'Status'))
+        for case, getArguments, readOnly in CASES:
+            arguments, inputContent = getArguments(repo)
+            runs = [runCase(repo, arguments, inputContent, wrapperDir) for _ in range(args.runs if readOnly else 1)]
+            measures = min(runs, key=lambda run: run['wallTime'])
+            results[case] = measures
+            status = 'OK' if measures['returnCode'] == 0 else 'KO'
+            if status == 'KO':
+                failures += 1
+            print("| {:<24} | {:>10.3f} | {:>6} | {:>10.1f} | {:<6} |".format(
+                case, measures['wallTime'], measures['gitProcesses'], measures['peakRssKiB'] / 1024, status))
+    finally:
+        if args.keep is None:
+            shutil.rmtree(workDir, ignore_errors=True)
+
+    report = {
+        'shape': shape,
+        'git': subprocess.run(['git', '--version'], stdout=subprocess.PIPE, check=True).stdout.decode('utf-8').strip(),
+        'python': sys.version.split()[0],
+        'cases': results,
+        }
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    regressions = []
+    if args.baseline is not None:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        if baseline['shape'] != shape:
+            print("Warning: the baseline was measured on another shape: {}".format(baseline['shape']))
+        regressions = compareToBaseline(results, baseline['cases'], args.tolerance)
+        for regression in regressions:
+            print("Regression: {}".format(regression))
+    return 1 if failures > 0 or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,7 +16,7 @@ setup(name='opsconf-{}'.format(suffix),
       url='https://github.com/CNES/opstools-opsconf',
       license='MIT',
       package_dir={ '': 'src/lib' },
-      packages=['opsconf', 'opsconf.subcommand', 'opsconf.subcommand.toolbox'],
+      packages=['opsconf', 'opsconf.libgit', 'opsconf.subcommand', 'opsconf.subcommand.toolbox'],
       scripts=['src/bin/opsconf'],
       data_files=[ ('share/opsconf/githooks', ['src/share/githooks/pre-commit',
                                                'src/share/githooks/post-commit',
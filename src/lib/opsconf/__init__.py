@@ -4,4 +4,11 @@
 # SPDX-License-Identifier: MIT
 
 """Opsconf package. All the libraries to run opsconf are here."""
+import os
+
 from .libopsconf import *
+
+if os.environ.get('OPSCONF_PROFILE'):
+    # the profiling is enabled by the environment, in opsconf and in the git hooks
+    from .libgit import profiling
+    profiling.enableProfiling(os.environ['OPSCONF_PROFILE'])
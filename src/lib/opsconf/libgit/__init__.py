@@ -0,0 +1,1812 @@
+# SPDX-FileCopyrightText: 2025 Olivier Churlaud <olivier@churlaud.com>
+# SPDX-FileCopyrightText: 2025 CNES
+#
+# SPDX-License-Identifier: MIT
+
+"""Python wrapper around git operations that are usefull for opsconf"""
+
+import atexit
+import logging
+import os.path
+import shlex
+import subprocess
+import tempfile
+import threading
+import time
+
+LOGGER = logging.getLogger('opsconf.libgit')
+
+# the function that records each git command, registered by `profiling.enableProfiling()`
+_COMMAND_RECORDER = {'function': None}
+
+class GitError(RuntimeError):
+    """The standard error for this libgit module.
+    """
+    pass
+
+
+class GitNoLogError(GitError):
+    """The error to raise when no log was found.
+    """
+    pass
+
+
+def _runCmd(command, raiseException=True, cwd=None, inputContent=None, outputCleanup=True):
+    """Run a shell command.
+
+    Args:
+        command (str or list of str): the command to run
+        raiseException (bool, optional): whether to raise an exception or not if the command returns
+                                         an errorcode that is not 0. Defaults to True.
+        cwd (str, optional): the path where to run the command from. Defaults to None.
+        inputContent (bytes, optional): a content to feed to the command through the stdin. Defaults to None.
+        outputCleanup (bool, optional): whether to strip or not the newlines from the stdout and stderr.
+                                           Defaults to True.
+
+    Raises:
+        GitError: if raiseException is True and the errorcode returned by the command is not 0 this exception
+                  is raised.
+
+    Returns:
+        (str, str, int): the stdout, stderr and errorcode returned by the command.
+    """
+    if isinstance(command, str):
+        splittedCommand = shlex.split(command)
+    else:
+        splittedCommand = command
+
+    if inputContent is not None:
+        stdin = subprocess.PIPE
+    else:
+        stdin = None
+
+    LOGGER.debug("Running command: %s", splittedCommand)
+    recorder = _COMMAND_RECORDER['function']
+    if recorder is not None:
+        startTime = time.time()
+    with subprocess.Popen(splittedCommand, stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=stdin, cwd=cwd) as proc:
+        out, err = proc.communicate(input=inputContent)
+        if recorder is not None:
+            recorder(splittedCommand, startTime, time.time() - startTime, len(out), proc.returncode)
+        stdout = out.decode('utf-8')
+        stderr = err.decode('utf-8')
+        if outputCleanup:
+            stdout = stdout.rstrip()
+            stderr = stderr.rstrip()
+        errno = proc.returncode
+
+        LOGGER.debug('Return: %s', {'errno': errno, 'stdout': stdout, 'stderr': stderr})
+
+    if raiseException and errno != 0:
+        raise GitError("errno: {} ; {}".format(errno, stderr))
+    return stdout, stderr, errno
+
+
+def setCommandRecorder(recorder):
+    """Set the function called after each git command (see `opsconf.libgit.profiling`).
+
+    Args:
+        recorder (function or None): the function, called with the command (list of str), its start time
+                                     (float, as given by `time.time()`), its duration in seconds (float),
+                                     the size of its stdout (int) and its errorcode (int). None to stop
+                                     recording the commands.
+    """
+    _COMMAND_RECORDER['function'] = recorder
+
+
+def getCommandRecorder():
+    """Get the function called after each git command.
+
+    Returns:
+        function or None: the function set by `setCommandRecorder()`, None if the commands are not recorded.
+    """
+    return _COMMAND_RECORDER['function']
+
+
+class CatFileProcess:
+    """A long-lived 'git cat-file --batch' (or '--batch-check') coprocess.
+
+    The object names are written to the stdin of the process and the answers are read
+    from its stdout, so that looking up an object costs no fork. Several requests can be
+    sent at once: they are written by a separate thread while the answers are read, so
+    that neither of the pipes can fill up and block the other side. If the git commands are
+    recorded (see `setCommandRecorder()`), each batch of requests is recorded as a command.
+
+    Object names are resolved by git relatively to the working directory where the process
+    was started ('<rev>:./<path>' syntax).
+    """
+
+    def __init__(self, withContent=True, cwd=None):
+        """Start the coprocess.
+
+        Args:
+            withContent (bool, optional): whether to get the content of the objects ('--batch')
+                                          or only their description ('--batch-check'). Defaults to True.
+            cwd (str, optional): the path where to run the command from. Defaults to None.
+        """
+        self.withContent = withContent
+        if withContent:
+            self._command = ['git', 'cat-file', '--batch']
+        else:
+            self._command = ['git', 'cat-file', '--batch-check']
+        # the size of the answers read so far
+        self._readBytes = 0
+        LOGGER.debug("Starting coprocess: %s", self._command)
+        # the coprocess outlives this call: it is stopped by close()
+        self._proc = subprocess.Popen(self._command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,  # pylint: disable=consider-using-with
+                                      stderr=subprocess.PIPE, cwd=cwd)
+
+    def isAlive(self):
+        """Check if the coprocess is still running.
+
+        Returns:
+            bool: True if the coprocess can still answer requests.
+        """
+        return self._proc.poll() is None
+
+    def query(self, objectNames):
+        """Get the description (and the content) of several objects at once.
+
+        Args:
+            objectNames (list of str): the objects to look for (anything 'git rev-parse' understands).
+
+        Raises:
+            GitError: if the coprocess died while answering, this exception is raised.
+
+        Returns:
+            list of dict or None: for each object, in the same order, None if the object does not exist,
+                                  or {'hash': <str>, 'type': <str>, 'size': <int>} (plus 'content': <bytes>
+                                  if the coprocess was started with content).
+        """
+        if not objectNames:
+            return []
+        for objectName in objectNames:
+            if '\n' in objectName:
+                raise GitError("Invalid object name: {!r}".format(objectName))
+
+        recorder = _COMMAND_RECORDER['function']
+        if recorder is not None:
+            startTime = time.time()
+            readBytes = self._readBytes
+        requests = ''.join('{}\n'.format(objectName) for objectName in objectNames).encode('utf-8')
+        writer = threading.Thread(target=self._write, args=(requests,))
+        writer.start()
+        try:
+            return [self._readAnswer() for _ in objectNames]
+        finally:
+            writer.join()
+            if recorder is not None:
+                recorder(self._command, startTime, time.time() - startTime, self._readBytes - readBytes,
+                         0 if self.isAlive() else self._proc.returncode)
+
+    def _write(self, requests):
+        """Internal function to send the requests to the coprocess.
+
+        Args:
+            requests (bytes): the object names, one per line.
+        """
+        try:
+            self._proc.stdin.write(requests)
+            self._proc.stdin.flush()
+        except (BrokenPipeError, ValueError):
+            # the reader gets the end of file and reports the error
+            pass
+
+    def _readAnswer(self):
+        """Internal function to read the answer to one request.
+
+        Raises:
+            GitError: if the coprocess died, this exception is raised.
+
+        Returns:
+            dict or None: the object description, None if the object does not exist.
+        """
+        header = self._proc.stdout.readline()
+        self._readBytes += len(header)
+        if not header:
+            self._proc.wait()
+            stderr = self._proc.stderr.read().decode('utf-8').rstrip()
+            raise GitError("git cat-file stopped: errno: {} ; {}".format(self._proc.returncode, stderr))
+
+        fields = header.decode('utf-8').rstrip('\n').rsplit(' ', 2)
+        if fields[-1] in ['missing', 'ambiguous'] or len(fields) != 3:
+            return None
+
+        objectInfo = {'hash': fields[0], 'type': fields[1], 'size': int(fields[2])}
+        if self.withContent:
+            content = self._proc.stdout.read(objectInfo['size'])
+            # each content is followed by a newline
+            self._proc.stdout.read(1)
+            self._readBytes += len(content) + 1
+            objectInfo['content'] = content
+        return objectInfo
+
+    def close(self):
+        """Stop the coprocess."""
+        if self.isAlive():
+            try:
+                self._proc.stdin.close()
+            except BrokenPipeError:
+                pass
+        self._proc.wait()
+        self._proc.stdout.close()
+        self._proc.stderr.close()
+
+
+_CATFILE_PROCESSES = {}
+
+
+def _getCatFileProcess(withContent):
+    """Get the cat-file coprocess for the current working directory, start it if needed.
+
+    Args:
+        withContent (bool): whether the coprocess shall return the content of the objects.
+
+    Returns:
+        CatFileProcess: the running coprocess.
+    """
+    key = (os.getcwd(), withContent)
+    catFile = _CATFILE_PROCESSES.get(key)
+    if catFile is None or not catFile.isAlive():
+        catFile = CatFileProcess(withContent=withContent)
+        _CATFILE_PROCESSES[key] = catFile
+    return catFile
+
+
+@atexit.register
+def closeCatFileProcesses():
+    """Stop all the cat-file coprocesses."""
+    while _CATFILE_PROCESSES:
+        _, catFile = _CATFILE_PROCESSES.popitem()
+        catFile.close()
+
+
+def getObjectsInfo(objectNames):
+    """Get the description of several objects in a single request.
+
+    Args:
+        objectNames (list of str): the objects to look for (e.g. '<commit>', '<revision>:<path>').
+
+    Returns:
+        list of dict or None: for each object, None if it does not exist,
+                              or {'hash': <str>, 'type': <str>, 'size': <int>}.
+    """
+    return _getCatFileProcess(withContent=False).query(list(objectNames))
+
+
+def getObjectInfo(objectName):
+    """Get the description of an object.
+
+    Args:
+        objectName (str): the object to look for (e.g. '<commit>', '<revision>:<path>').
+
+    Returns:
+        dict or None: None if the object does not exist, or {'hash': <str>, 'type': <str>, 'size': <int>}.
+    """
+    return getObjectsInfo([objectName])[0]
+
+
+def readObjects(objectNames):
+    """Read several objects in a single request.
+
+    Args:
+        objectNames (list of str): the objects to read (e.g. '<commit>', '<revision>:<path>').
+
+    Returns:
+        list of dict or None: for each object, None if it does not exist,
+                              or {'hash': <str>, 'type': <str>, 'size': <int>, 'content': <bytes>}.
+    """
+    return _getCatFileProcess(withContent=True).query(list(objectNames))
+
+
+def readObject(objectName):
+    """Read an object.
+
+    Args:
+        objectName (str): the object to read (e.g. '<commit>', '<revision>:<path>').
+
+    Returns:
+        dict or None: None if the object does not exist,
+                      or {'hash': <str>, 'type': <str>, 'size': <int>, 'content': <bytes>}.
+    """
+    return readObjects([objectName])[0]
+
+
+def resolveRevision(revision):
+    """Get the hash of the commit a revision points to.
+
+    Args:
+        revision (str): the revision (branch, tag, commit).
+
+    Raises:
+        GitError: if the revision does not exist, this exception is raised.
+
+    Returns:
+        str: the hash of the commit.
+    """
+    objectInfo = getObjectInfo('{}^{{commit}}'.format(revision))
+    if objectInfo is None:
+        raise GitError("Unknown revision: {}".format(revision))
+    return objectInfo['hash']
+
+
+def _parseIdent(identLine):
+    """Internal function to split a commit identity line ('Name <email> timestamp timezone').
+
+    Args:
+        identLine (str): the identity, as written in the commit object.
+
+    Returns:
+        (str, str): the identity 'Name <email>' and the date 'timestamp timezone'.
+    """
+    ident, timestamp, timezone = identLine.rsplit(' ', 2)
+    return ident, "{} {}".format(timestamp, timezone)
+
+
+def readCommit(revision):
+    """Read and parse a commit object.
+
+    Args:
+        revision (str): the revision of the commit.
+
+    Raises:
+        GitError: if the revision does not exist, this exception is raised.
+
+    Returns:
+        dict: the commit as
+              {
+                  'hash': <str>,
+                  'tree': <str>,
+                  'parents': <list of str>,
+                  'author': <str>,  # 'Name <email>'
+                  'authorDate': <str>,  # 'timestamp timezone', as understood by 'git commit --date'
+                  'committer': <str>,
+                  'committerDate': <str>,
+                  'message': <str>  # the raw message (%B)
+              }
+    """
+    commitObject = readObject('{}^{{commit}}'.format(revision))
+    if commitObject is None:
+        raise GitError("Unknown revision: {}".format(revision))
+
+    rawHeaders, _, message = commitObject['content'].decode('utf-8').partition('\n\n')
+    commit = {'hash': commitObject['hash'], 'parents': [], 'message': message}
+    for header in rawHeaders.split('\n'):
+        # continuation lines (gpgsig, mergetag, ...) start with a space
+        key, _, value = header.partition(' ')
+        if key == 'tree':
+            commit['tree'] = value
+        elif key == 'parent':
+            commit['parents'].append(value)
+        elif key == 'author':
+            commit['author'], commit['authorDate'] = _parseIdent(value)
+        elif key == 'committer':
+            commit['committer'], commit['committerDate'] = _parseIdent(value)
+    return commit
+
+
+_REPOSITORY_STATE = {}
+_REPOSITORY_STATE_STATS = {'hits': 0, 'misses': 0}
+# incremented each time the known facts are forgotten
+_REPOSITORY_STATE_GENERATION = {'value': 0}
+
+
+def _getRepositoryState(key, compute):
+    """Internal function to get a fact about the repository, computed once per working directory.
+
+    The facts stay valid until an operation that changes them calls `invalidateRepositoryState()`.
+
+    Args:
+        key (str): the name of the fact.
+        compute (function): the function that computes the fact if it is not known yet.
+
+    Returns:
+        object: the value of the fact.
+    """
+    cacheKey = (os.getcwd(), key)
+    if cacheKey in _REPOSITORY_STATE:
+        _REPOSITORY_STATE_STATS['hits'] += 1
+        return _REPOSITORY_STATE[cacheKey]
+    _REPOSITORY_STATE_STATS['misses'] += 1
+    value = compute()
+    _REPOSITORY_STATE[cacheKey] = value
+    return value
+
+
+def invalidateRepositoryState():
+    """Forget the known facts about the repository (current branch, root, ...)."""
+    _REPOSITORY_STATE.clear()
+    _REPOSITORY_STATE_GENERATION['value'] += 1
+
+
+def getRepositoryStateGeneration():
+    """Get the generation of the known facts about the repository.
+
+    The generation changes each time an operation that changes the references calls
+    `invalidateRepositoryState()`: what was computed in the same generation is still valid.
+
+    Returns:
+        int: the generation.
+    """
+    return _REPOSITORY_STATE_GENERATION['value']
+
+
+def getRepositoryStateStats():
+    """Get the hit and miss counters of the repository facts cache.
+
+    Returns:
+        dict: the counters as {'hits': <int>, 'misses': <int>}.
+    """
+    return dict(_REPOSITORY_STATE_STATS)
+
+
+@atexit.register
+def _logRepositoryStateStats():
+    """Internal function to log the counters of the repository facts cache."""
+    LOGGER.debug("Repository state cache: %(hits)d hits, %(misses)d misses", _REPOSITORY_STATE_STATS)
+
+
+def isGitRepository():
+    """Check if this is a git repository.
+
+    Returns:
+        bool: True if this is a git repository.
+    """
+    _, _, errno = _runCmd(['git', 'rev-parse', '--is-inside-work-tree'], raiseException=False)
+    return errno == 0
+
+
+def isRepositoryEmpty():
+    """Check if the git repository is empty.
+
+    Returns:
+        bool: True if the git repository is empty. False otherwise.
+    """
+    _, _, errno = _runCmd(['git', 'rev-parse', '--verify', 'HEAD'], raiseException=False)
+    return errno != 0
+
+
+def setConfig(key, value):
+    """Set a configuration parameter.
+
+    Args:
+        key (str): the configuration key to set.
+        value (str): the value to affect to the key.
+    """
+    _, _, _ = _runCmd(['git', 'config', '--local', key, value])
+
+def isAncestor(child, ancestor):
+    """Check if one revision is the ancestor of another.
+
+    Args:
+        child (str): the revision that would be the child of the other.
+        ancestor (str): the revision that would be the ancestor of the other.
+
+    Raises:
+        GitError: if something goes wrong in the command, this exception is raised
+
+    Returns:
+        bool: True if 'ancestor' is the ancestor of 'child'. False otherwise.
+    """
+    _, stderr, errno = _runCmd(['git', 'merge-base', '--is-ancestor', ancestor, child], raiseException=False)
+    if errno == 0:
+        return True
+    elif errno == 1:
+        return False
+    else:
+        raise GitError("errno = {}, stderr = {}".format(errno, stderr))
+
+
+def getMergeBase(revision1, revision2):
+    """Get the best common ancestor of two revisions.
+
+    Args:
+        revision1 (str): the first revision.
+        revision2 (str): the second revision.
+
+    Raises:
+        GitError: if something goes wrong in the command, this exception is raised
+
+    Returns:
+        str or None: the hash of the common ancestor, None if the revisions have no common history.
+    """
+    stdout, stderr, errno = _runCmd(['git', 'merge-base', revision1, revision2], raiseException=False)
+    if errno == 0:
+        return stdout
+    elif errno == 1:
+        return None
+    else:
+        raise GitError("errno = {}, stderr = {}".format(errno, stderr))
+
+
+def getGitDir():
+    """Get the path .git directory from the repository.
+
+    Returns:
+        str: the path of the .git directory.
+    """
+    return _getRepositoryState('gitDir', lambda: _runCmd(['git', 'rev-parse', '--git-dir'])[0])
+
+
+def getGitRoot():
+    """Get the root path of the repository.
+
+    Returns:
+        str: the root path of the repository.
+    """
+    return _getRepositoryState('gitRoot', lambda: _runCmd(['git', 'rev-parse', '--show-toplevel'])[0])
+
+
+def getPathPrefix():
+    """Get the path of the current directory, relatively to the root of the repository.
+
+    Returns:
+        str: the prefix ('' at the root of the repository, 'some/dir/' otherwise).
+    """
+    return _getRepositoryState('pathPrefix', lambda: _runCmd(['git', 'rev-parse', '--show-prefix'])[0])
+
+
+def toRepositoryPath(filename, prefix=None):
+    """Translate a path into a path relative to the root of the repository.
+
+    Args:
+        filename (str): the path, absolute or relative to the current directory.
+        prefix (str, optional): the result of `getPathPrefix()`, if already known. Defaults to None.
+
+    Returns:
+        str: the path from the root of the repository, as git displays it.
+    """
+    if os.path.isabs(filename):
+        return os.path.relpath(filename, getGitRoot())
+    if prefix is None:
+        prefix = getPathPrefix()
+    return os.path.normpath(os.path.join(prefix, filename))
+
+
+def getCurrentBranch():
+    """Get the current branch (that is checked out).
+
+    Returns:
+        str: the current branch.
+    """
+    return _getRepositoryState('currentBranch', lambda: _runCmd(['git', 'rev-parse', '--abbrev-ref', 'HEAD'])[0])
+
+
+_REVISION_PATHS = {}
+
+
+def listPathsInRevision(revision):
+    """List the paths of the files of a revision.
+
+    The list is cached by commit, so the tree of a revision is only read once.
+
+    Args:
+        revision (str): the revision (branch, tag, commit) to read.
+
+    Raises:
+        GitError: if the revision does not exist, this exception is raised.
+
+    Returns:
+        frozenset of str: the file paths, from the root of the repository.
+    """
+    commitHash = resolveRevision(revision)
+    paths = _REVISION_PATHS.get(commitHash)
+    if paths is None:
+        stdout, _, _ = _runCmd(['git', 'ls-tree', '-r', '-z', '--full-tree', commitHash], outputCleanup=False)
+        paths = set()
+        for entry in stdout.split('\0'):
+            if not entry:
+                continue
+            metadata, path = entry.split('\t', 1)
+            # only the blobs are files (not the submodules)
+            if metadata.split(' ')[1] == 'blob':
+                paths.add(path)
+        paths = frozenset(paths)
+        _REVISION_PATHS[commitHash] = paths
+    return paths
+
+
+def existFileInRevision(filename, revision, absolutePath=False):
+    """Check if the file exists in the revision (branch, tag, commit).
+
+    If the files of the revision were already listed, the cached list is used. Otherwise the
+    path is checked directly, without reading the whole tree.
+
+    Args:
+        filename (str): the file path to search.
+        revision (str): the revison (branch, tag, commit) where to search.
+        absolutePath (bool): whether the path is absolute (from the root of the repo) or
+            relative to the current directory.
+
+    Returns:
+        bool: True if the file was found. False otherwise.
+    """
+    if _REVISION_PATHS:
+        commitInfo = getObjectInfo('{}^{{commit}}'.format(revision))
+        if commitInfo is not None and commitInfo['hash'] in _REVISION_PATHS:
+            path = filename if absolutePath else toRepositoryPath(filename)
+            return path in _REVISION_PATHS[commitInfo['hash']]
+
+    if absolutePath:
+        objectName = '{}:{}'.format(revision, filename)
+    else:
+        # './' makes git resolve the path from the current directory
+        objectName = '{}:./{}'.format(revision, os.path.relpath(filename))
+    LOGGER.debug("looking for: %s", objectName)
+    objectInfo = getObjectInfo(objectName)
+    return objectInfo is not None and objectInfo['type'] == 'blob'
+
+
+def existFilesInRevision(filenames, revision, absolutePath=False):
+    """Check if several files exist in the revision (branch, tag, commit).
+
+    Args:
+        filenames (list of str): the file paths to search.
+        revision (str): the revison (branch, tag, commit) where to search.
+        absolutePath (bool): whether the paths are absolute (from the root of the repo) or
+            relative to the current directory.
+
+    Returns:
+        list of bool: for each file, True if it was found. False otherwise.
+    """
+    if not absolutePath:
+        prefix = getPathPrefix()
+        filenames = [toRepositoryPath(filename, prefix) for filename in filenames]
+    try:
+        paths = listPathsInRevision(revision)
+    except GitError:
+        return [False] * len(filenames)
+    return [filename in paths for filename in filenames]
+
+
+def listChangedFiles():
+    """List the repository's file that are not added nor committed.
+
+    Returns:
+        list of str: the file paths.
+    """
+    modified, _, _ = _runCmd(['git', 'ls-files', '-m'])
+    untracked, _, _ = _runCmd(['git', 'ls-files', '-o', '--exclude-standard'])
+    return modified.splitlines() + untracked.splitlines()
+
+
+def listCachedFiles(againstRevision='HEAD'):
+    """List the files that are currently cached.
+
+    Args:
+        againstRevision (str, optional): the revision to compare to. Defaults to 'HEAD'.
+
+    Returns:
+        list of str: the list of files that are currently cached.
+    """
+    stdout, _, _ = _runCmd(['git', 'diff', '--cached', '--name-only', againstRevision])
+    return stdout.splitlines()
+
+
+def listAllFilesInRevision(revision):
+    """List the repository's files at the given revision.
+
+    Args:
+        revision (str): the revision to use.
+
+    Returns:
+        list of str: the file paths.
+    """
+    stdout, _, _ = _runCmd(['git', 'ls-tree', '-r', '--name-only', revision])
+    return stdout.splitlines()
+
+
+def getLocalBranchTip():
+    """Get the revision of the local branch
+
+    Returns:
+        str: the hash of the revision
+    """
+    return resolveRevision('HEAD')
+
+
+def getRemoteBranchTip():
+    """Get the revision of the remote branch of the current one.
+
+    Returns:
+        str: the hash of the revision
+    """
+    if isHeadABranch():
+        hashStr, _, _ = _runCmd(['git', 'rev-parse', '@{u}'])
+    else:
+        # we are on a tag or commit, so we get the *local* hash
+        hashStr, _, _ = _runCmd(['git', 'rev-list', '-n', '1', 'HEAD'])
+    return hashStr
+
+
+def getEmptyTreeObject():
+    """Get an empty tree object (like if the repository was empty)
+
+    Returns:
+        str: an empty tree object hash
+    """
+    return _getRepositoryState('emptyTree', lambda: _runCmd(['git', 'hash-object', '-t', 'tree', '/dev/null'])[0])
+
+
+def existRemoteBranch(branch):
+    """Check if a remote branch exists.
+
+    Args:
+        branch (str): the branch to search.
+
+    Returns:
+        bool: True if the branch exists. False otherwise.
+    """
+    _, _, errno = _runCmd(['git', 'show-ref', 'refs/remotes/origin/{}'.format(branch)], raiseException=False)
+    return errno == 0
+
+
+def existLocalBranch(branch):
+    """Check if a local branch exists.
+
+    Args:
+        branch (str): the branch to search.
+
+    Returns:
+        bool: True if the branch exists. False otherwise.
+    """
+    _, _, errno = _runCmd(['git', 'show-ref', 'refs/heads/{}'.format(branch)], raiseException=False)
+    return errno == 0
+
+
+def initRepository():
+    """Initialize the repository.
+
+    Raises:
+        GitError: if the repository was already initialized, this exception is raised.
+    """
+    if isGitRepository():
+        raise GitError("This is already a git repository. Not doing anything.")
+    try:
+        _runCmd(['git', 'init'])
+    finally:
+        invalidateRepositoryState()
+
+
+def fetch(remote=None, branch=None):
+    """Fetch the distant repositories
+
+    Args:
+        remote (str, optional): the remote to fetch. Defaults to None.
+        branch (str, optional): the branch to fetch. Defaults to None.
+
+    Raises:
+        ValueError: if the branch is given without remote, this exception is raised
+    """
+    cmd = ['git', 'fetch']
+    if remote is None and branch is not None:
+        raise ValueError("Branch can be set only if remote is set")
+    if remote is not None:
+        cmd.append(remote)
+    if branch is not None:
+        cmd.append(branch)
+
+    try:
+        _runCmd(cmd)
+    finally:
+        invalidateRepositoryState()
+
+
+def fetchRefs(remote, refspecs):
+    """Fetch several references from a remote, with a single command.
+
+    Args:
+        remote (str): the remote to fetch.
+        refspecs (list of str): the refspecs to fetch (e.g. '+refs/heads/work:refs/remotes/origin/work').
+    """
+    try:
+        _runCmd(['git', 'fetch', remote] + list(refspecs))
+    finally:
+        invalidateRepositoryState()
+
+
+def isRevisionABranch(revision):
+    """Check if a revision is a branch.
+
+    Args:
+        revision (str): the revision to check.
+
+    Returns:
+        bool: True if the revision is a branch, False otherwise.
+    """
+    _, _, errno = _runCmd(['git', 'show-ref', '--verify', 'refs/heads/{}'.format(str(revision))], raiseException=False)
+    return errno == 0
+
+
+def isHeadABranch():
+    """Check if the head is a branch (if not, it's in a detached state)
+
+    Returns:
+        bool: True if it's a branch, False if we are in a detached state (tag, commit)
+    """
+    return _getRepositoryState('isHeadABranch',
+                               lambda: _runCmd(['git', 'symbolic-ref', '-q', 'HEAD'], raiseException=False)[2] == 0)
+
+
+def getHeadBranch():
+    """Get the branch HEAD points to, even if this branch has no commit yet.
+
+    Returns:
+        str: the branch, or None if HEAD is detached.
+    """
+    branch, _, errno = _runCmd(['git', 'symbolic-ref', '-q', '--short', 'HEAD'], raiseException=False)
+    return branch if errno == 0 else None
+
+
+def switchToRevision(revision):
+    """Switch to a revision.
+
+    Args:
+        revision (str): the revision to switch to (branch, tag, commit).
+    """
+    try:
+        if isRevisionABranch(revision):
+            _runCmd(['git', 'switch', str(revision)])
+        else:
+            _runCmd(['git', 'switch', '--detach', str(revision)])
+    finally:
+        invalidateRepositoryState()
+
+
+def bringFileFromRevision(filename, revision):
+    """Bring a file to the repository as it was in a given revision.
+
+    Args:
+        filename (str): the path of the file to bring.
+        revision (str): the revision where to retrieve it.
+    """
+    _runCmd(['git', 'restore', '--source' ,str(revision), filename])
+
+
+def createBranch(branch):
+    """Create a branch.
+
+    Args:
+        branch (str): the name of the branch to create.
+    """
+    try:
+        _runCmd(['git', 'branch', branch])
+    finally:
+        invalidateRepositoryState()
+
+
+def createAndSwitchToOrphanBranch(branch):
+    """Create an orphan branch and switch to it.
+
+    Args:
+        branch (str): the name of the branch to create
+    """
+    try:
+        _runCmd(['git', 'checkout', '--orphan', branch])
+    finally:
+        invalidateRepositoryState()
+
+
+def addOneFile(filename):
+    """Add a single file to the index.
+
+    This command does not commit this change.
+
+    Args:
+        filename (str): path of the file to add.
+    """
+    _runCmd(['git', 'add', filename])
+
+
+def addFiles(filenames):
+    """Add several files to the index, with a single command.
+
+    This command does not commit this change.
+
+    Args:
+        filenames (list of str): paths of the files to add.
+    """
+    _runCmd(['git', 'add', '--'] + list(filenames))
+
+
+def listIndexEntries(paths):
+    """Get the entries of the index for several files.
+
+    Args:
+        paths (list of str): the paths of the files, from the root of the repository.
+
+    Returns:
+        dict: the entry of each path found in the index, as {<path>: {'mode': <str>, 'hash': <str>}}.
+    """
+    stdout, _, _ = _runCmd(['git', 'ls-files', '--stage', '-z', '--full-name', '--', ':/'],
+                           outputCleanup=False)
+    wantedPaths = set(paths)
+    entries = {}
+    for entry in stdout.split('\0'):
+        if not entry:
+            continue
+        metadata, path = entry.split('\t', 1)
+        if path in wantedPaths:
+            mode, objectHash, _ = metadata.split(' ')
+            entries[path] = {'mode': mode, 'hash': objectHash}
+    return entries
+
+
+def removeOneFile(filename):
+    """Remove a single file from the repository.
+
+    This command does not commit this change.
+
+    Args:
+        filename (str): the path of the file to remove.
+    """
+    _runCmd(['git', 'rm', filename])
+
+
+def commitOneFile(filename, message, date=None, author=None):
+    """Commit the changes on a single file.
+
+    Args:
+        filename (str): the path of the file to commit.
+        message (str): the commit message.
+        date (str, optional): the date of the commit. Defaults to None.
+                              If not given, the current date is used
+        author (str, optional): the author of the commit. Defaults to None.
+                                If not given, the author configured in git is used
+    """
+    cmd = ['git', 'commit', '-m', message]
+    if date is not None:
+        cmd += ['--date', date]
+    if author is not None:
+        cmd += ['--author', author]
+
+    cmd += [filename]
+    try:
+        _runCmd(cmd)
+    finally:
+        invalidateRepositoryState()
+
+
+def addNoteToCommit(commitHash, noteMessage, topic="commits"):
+    """Add a note to a given commit.
+
+    Args:
+        commitHash (str): the commit hash to which to add a note.
+        noteMessage (str): the text from the note.
+        topic (str, optional): the notes topic (refs/notes/{topic}). Defaults to 'commits'
+    """
+    _runCmd(['git', 'notes', '--ref', topic, 'append', '-m', noteMessage, commitHash])
+
+
+def pushNotes(remote="origin", topic="commits"):
+    """Push the notes to the remote
+
+    Args:
+        remote (str, optional): the remote where to push the notes. Defaults to 'origin'.
+        topic (str, optional): the notes topic (refs/notes/{topic}). Defaults to 'commits'
+    """
+    _runCmd(['git', 'push', remote, 'refs/notes/{}'.format(topic)])
+
+
+def pullNotes(remote="origin"):
+    """Pull the notes to the remote
+
+    Args:
+        remote (str, optional): the remote where to push the notes. Defaults to 'origin'.
+    """
+    _runCmd(['git', 'fetch', remote, 'refs/notes/*:refs/notes/*'])
+
+
+def getNotesFromCommit(commitHash, topic="commits"):
+    """Get the notes from a given commit.
+
+    Args:
+        commitHash (str): the hash of the commit from which to get the notes.
+        topic (str, optional): the notes topic (refs/notes/{topic}). Defaults to 'commits'
+
+    Returns:
+        list of str: the notes of the commit (split by '\n\n')
+    """
+    # if the commit has no note, the command returns 1
+    # with raiseException=False, stdout will be empty
+    stdout, _, _ = _runCmd(['git', 'notes', '--ref', topic, 'show', commitHash], raiseException=False)
+    return stdout.split('\n\n')
+
+
+def listNotes(topic="commits"):
+    """List the commits that have a note, with a single `git notes list`.
+
+    Args:
+        topic (str, optional): the notes topic (refs/notes/{topic}). Defaults to 'commits'
+
+    Returns:
+        dict: the blob of the note of each commit, as {<commit hash>: <blob hash>}.
+    """
+    stdout, _, _ = _runCmd(['git', 'notes', '--ref', topic, 'list'])
+    notes = {}
+    for line in stdout.splitlines():
+        blobHash, commitHash = line.split()
+        notes[commitHash] = blobHash
+    return notes
+
+
+def getAllNotes(topic="commits"):
+    """Get the notes of all the commits at once: the note blobs are read in a single request.
+
+    Args:
+        topic (str, optional): the notes topic (refs/notes/{topic}). Defaults to 'commits'
+
+    Returns:
+        dict: the note of each commit that has one, as {<commit hash>: <str>}.
+    """
+    blobs = listNotes(topic)
+    commitHashes = sorted(blobs)
+    notes = {}
+    for commitHash, blob in zip(commitHashes, readObjects(blobs[commitHash] for commitHash in commitHashes)):
+        if blob is not None:
+            notes[commitHash] = blob['content'].decode('utf-8')
+    return notes
+
+
+def resetTree(hard=False, soft=False, mixed=False):
+    """Reset the repository to it's HEAD state.
+
+    See the help of the command `git reset` for more details on the behavior.
+
+    Args:
+        hard (bool, optional): discard all changes from the index and the working directory.
+                               Defaults to False.
+        soft (bool, optional): undo the last commit, but keep the changes in the index. Defaults to False.
+        mixed (bool, optional): remove all the changes from the index, but keep them in the working directory.
+                                Defaults to False.
+
+    Raises:
+        ValueError: if more than one option is set to True, this exception is raised.
+    """
+    cmd = ['git', 'reset']
+    if sum([hard, soft, mixed]) > 1:
+        raise ValueError("gitReset: only one of 'hard' or 'soft' or 'mixed' can be True")
+    if hard:
+        cmd.append('--hard')
+    if soft:
+        cmd.append('--soft')
+    if mixed:
+        cmd.append('--mixed')  # default value for git reset
+    try:
+        _runCmd(cmd)
+    finally:
+        invalidateRepositoryState()
+
+
+def cherryPick(gitHash):
+    """Cherry pick a commit.
+
+    Args:
+        gitHash (str): the hash of the commit to cherry-pick.
+    """
+    try:
+        _runCmd(['git', 'cherry-pick', gitHash])
+    finally:
+        invalidateRepositoryState()
+
+
+def merge(otherBranch, ffOnly=None):
+    """Merge an other branch to the current one.
+
+    Args:
+        otherBranch (str): the other branch to merge in the current one.
+        ffOnly (bool, optional): whether the merge should be fast-forward or not. Defaults to None.
+                                If not set, the configured behavior of git is used.
+    """
+    cmd = ['git', 'merge', otherBranch]
+    if ffOnly is not None and ffOnly:
+        cmd.append('--ff-only')
+    try:
+        _runCmd(cmd)
+    finally:
+        invalidateRepositoryState()
+
+
+def push(branch, newBranch=False, remote='origin'):
+    """Push the local changes to the remote.
+
+    Args:
+        branch (str): the branch to push.
+        newBranch (bool, optional): whether the branch to push exists or not in the remote. Defaults to False.
+        remote (str, optional): the remote to push to. Defaults to 'origin'.
+    """
+    if newBranch:
+        _runCmd(['git', 'push', '-u', remote, branch])
+    else:
+        _runCmd(['git', 'push', remote, branch])
+
+
+def pushRefs(refs, remote='origin', setUpstream=False):
+    """Push several references at once, atomically: either the remote accepts all of them, or none.
+
+    Args:
+        refs (list of str): the references to push.
+        remote (str, optional): the remote to push to. Defaults to 'origin'.
+        setUpstream (bool, optional): whether the pushed branches shall track the remote ones. Defaults to False.
+
+    Raises:
+        GitError: if the push fails, this exception is raised and the remote is unchanged.
+    """
+    cmd = ['git', 'push', '--atomic']
+    if setUpstream:
+        cmd.append('--set-upstream')
+    _runCmd(cmd + [remote] + list(refs))
+
+
+def writeBlob(content):
+    """Write a file content in the object database.
+
+    Args:
+        content (bytes): the content.
+
+    Returns:
+        str: the hash of the blob.
+    """
+    stdout, _, _ = _runCmd(['git', 'hash-object', '-w', '--stdin'], inputContent=content)
+    return stdout
+
+
+def getIdent(role='committer'):
+    """Get the identity git uses for new commits.
+
+    Args:
+        role (str, optional): 'author' or 'committer'. Defaults to 'committer'.
+
+    Returns:
+        str: the identity as 'Name <email> <timestamp> <timezone>'.
+    """
+    stdout, _, _ = _runCmd(['git', 'var', 'GIT_{}_IDENT'.format(role.upper())])
+    return stdout
+
+
+def cleanupMessage(message):
+    """Clean up a commit message the way `git commit -m` does.
+
+    Args:
+        message (str): the raw message.
+
+    Returns:
+        str: the message without trailing spaces nor extra empty lines, ending with a newline.
+    """
+    stdout, _, _ = _runCmd(['git', 'stripspace'], inputContent=message.encode('utf-8'), outputCleanup=False)
+    return stdout
+
+
+def _quoteFastImportPath(path):
+    """Internal function to quote a path for `git fast-import` if needed.
+
+    Args:
+        path (str): the path.
+
+    Returns:
+        str: the path, quoted if it starts with a quote or contains a newline.
+    """
+    if not path.startswith('"') and '\n' not in path:
+        return path
+    return '"{}"'.format(path.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+
+
+def _runFastImport(stream):
+    """Internal function to run `git fast-import` on a stream, and get the marks of the objects it created.
+
+    Args:
+        stream (list of bytes): the chunks of the stream.
+
+    Returns:
+        dict: the hash of each mark, as {':<mark>': <hash>}.
+    """
+    with tempfile.TemporaryDirectory(prefix='opsconf-') as tmpDir:
+        marksPath = os.path.join(tmpDir, 'marks')
+        _runCmd(['git', 'fast-import', '--quiet', '--export-marks={}'.format(marksPath)],
+                inputContent=b''.join(stream))
+        with open(marksPath, 'r') as f:
+            return dict(line.split() for line in f if line.strip())
+
+
+def buildCommits(parent, commits):
+    """Write a series of commits in the object database, with a single `git fast-import`.
+
+    No reference is changed, and neither the index nor the working directory are used: the
+    files must already be in the object database. No hook is run.
+
+    Args:
+        parent (str or None): the parent of the first commit, None for a root commit.
+        commits (list of dict): the commits, from the oldest to the newest, as
+                                {'message': <str>, 'files': <list of (mode, hash, path)>}, with
+                                optionally 'author': <str> ('Name <email> timestamp timezone').
+                                The author defaults to the one configured in git.
+                                A file with the mode None is deleted.
+
+    Raises:
+        GitError: if the commits cannot be created, this exception is raised.
+
+    Returns:
+        list of str: the hashes of the commits.
+    """
+    # fast-import needs a reference to build the commits on: it is reset at the end, so that
+    # it is never written
+    tmpRef = 'refs/opsconf/fast-import-{}'.format(os.getpid())
+    defaultAuthor = getIdent('author')
+    committer = getIdent('committer')
+    stream = []
+    for k, commit in enumerate(commits):
+        message = commit['message'].encode('utf-8')
+        stream.append('commit {}\nmark :{}\nauthor {}\ncommitter {}\ndata {}\n'
+                      .format(tmpRef, k + 1, commit.get('author', defaultAuthor), committer, len(message))
+                      .encode('utf-8'))
+        stream.append(message)
+        stream.append(b'\n')
+        if k == 0 and parent is not None:
+            stream.append('from {}\n'.format(parent).encode('utf-8'))
+        for mode, objectHash, path in commit['files']:
+            if mode is None:
+                stream.append('D {}\n'.format(_quoteFastImportPath(path)).encode('utf-8'))
+            else:
+                stream.append('M {} {} {}\n'.format(mode, objectHash, _quoteFastImportPath(path)).encode('utf-8'))
+        stream.append(b'\n')
+    stream.append('reset {}\n\n'.format(tmpRef).encode('utf-8'))
+
+    marks = _runFastImport(stream)
+    return [marks[':{}'.format(k + 1)] for k in range(len(commits))]
+
+
+def createCommits(branch, parent, commits):
+    """Create a series of commits on a branch, with a single `git fast-import`.
+
+    The branch is updated, but neither the index nor the working directory: the changed files
+    must already be in the object database (see `addFiles()`). No hook is run.
+
+    Args:
+        branch (str): the branch where to create the commits.
+        parent (str or None): the current commit of the branch, None if the branch has no commit yet.
+        commits (list of dict): the commits, from the oldest to the newest (see `buildCommits()`).
+
+    Raises:
+        GitError: if the commits cannot be created or the branch moved in the meantime, this
+                  exception is raised. The branch is unchanged.
+
+    Returns:
+        str: the hash of the last commit.
+    """
+    tip = buildCommits(parent, commits)[-1]
+    # an empty old value means that the branch must not exist yet
+    updateRef(branch, tip, parent if parent is not None else '')
+    return tip
+
+
+def buildNotesCommit(parent, notes, message="Notes added by 'git notes append'"):
+    """Write a commit of a notes reference in the object database, with a single `git fast-import`.
+
+    No reference is changed. The commits must not have a note yet in the parent.
+
+    Args:
+        parent (str or None): the current commit of the notes reference, None if it has none yet.
+        notes (dict): the note of each commit as {<commit hash>: <str>}.
+        message (str, optional): the message of the notes commit. Defaults to the one of `git notes append`.
+
+    Raises:
+        GitError: if the commit cannot be created, this exception is raised.
+
+    Returns:
+        str: the hash of the notes commit.
+    """
+    tmpRef = 'refs/opsconf/fast-import-{}'.format(os.getpid())
+    commitMessage = message.encode('utf-8')
+    stream = ['commit {}\nmark :1\ncommitter {}\ndata {}\n'
+              .format(tmpRef, getIdent('committer'), len(commitMessage)).encode('utf-8'),
+              commitMessage, b'\n']
+    if parent is not None:
+        stream.append('from {}\n'.format(parent).encode('utf-8'))
+    for commitHash, note in sorted(notes.items()):
+        # the note is cleaned up the way `git notes append -m` does
+        content = cleanupMessage(note).encode('utf-8')
+        stream.append('N inline {}\ndata {}\n'.format(commitHash, len(content)).encode('utf-8'))
+        stream.append(content)
+        stream.append(b'\n')
+    stream.append('\nreset {}\n\n'.format(tmpRef).encode('utf-8'))
+
+    return _runFastImport(stream)[':1']
+
+
+def listCommitChanges(commitHashes):
+    """List the files changed by several commits, compared to their first parent, with a single command.
+
+    Args:
+        commitHashes (list of str): the full hashes of the commits.
+
+    Returns:
+        dict: the changes of each commit, as {<hash>: <list of dict>}, each change being
+              {'status': <str>, 'oldMode': <str>, 'newMode': <str>, 'oldHash': <str>, 'newHash': <str>,
+              'path': <str>}. A mode is '000000' if the file does not exist on this side.
+    """
+    changes = {commitHash: [] for commitHash in commitHashes}
+    if not changes:
+        return changes
+    stdout, _, _ = _runCmd(['git', 'diff-tree', '--stdin', '-r', '-z', '--no-renames', '--root'],
+                           inputContent=''.join(commitHash + '\n' for commitHash in commitHashes).encode('utf-8'),
+                           outputCleanup=False)
+    tokens = stdout.split('\0')
+    currentCommit = None
+    k = 0
+    while k < len(tokens):
+        token = tokens[k]
+        if token.startswith(':'):
+            oldMode, newMode, oldHash, newHash, status = token[1:].split(' ')
+            changes[currentCommit].append({'status': status, 'oldMode': oldMode, 'newMode': newMode,
+                                           'oldHash': oldHash, 'newHash': newHash, 'path': tokens[k + 1]})
+            k += 2
+        else:
+            if token:
+                currentCommit = token.strip()
+            k += 1
+    return changes
+
+
+def diffTrees(fromRevision, toRevision, paths=None):
+    """List the files that differ between two revisions, with a single command.
+
+    Args:
+        fromRevision (str): the revision used as reference.
+        toRevision (str): the revision containing the changes.
+        paths (list of str, optional): the paths to compare, from the root of the repository. Defaults to None.
+                                       If None, the whole revisions are compared.
+
+    Returns:
+        list of dict: the changes, sorted by path, as {'status': <str>, 'oldMode': <str>, 'newMode': <str>,
+                      'oldHash': <str>, 'newHash': <str>, 'path': <str>}. A mode is '000000' if the file
+                      does not exist on this side.
+    """
+    cmd = ['git', 'diff-tree', '-r', '-z', '--no-renames', fromRevision, toRevision]
+    if paths is not None:
+        cmd += ['--'] + list(paths)
+    stdout, _, _ = _runCmd(cmd, cwd=getGitRoot(), outputCleanup=False)
+    tokens = stdout.split('\0')
+    changes = []
+    for k in range(0, len(tokens) - 1, 2):
+        oldMode, newMode, oldHash, newHash, status = tokens[k][1:].split(' ')
+        changes.append({'status': status, 'oldMode': oldMode, 'newMode': newMode,
+                        'oldHash': oldHash, 'newHash': newHash, 'path': tokens[k + 1]})
+    return changes
+
+
+def listTreeEntries(revision, paths):
+    """Get the entries of several files in a revision.
+
+    Args:
+        revision (str): the revision (branch, tag, commit).
+        paths (list of str or None): the paths of the files, from the root of the repository.
+                                     None for all the files of the revision.
+
+    Returns:
+        dict: the entry of each path found, as {<path>: {'mode': <str>, 'hash': <str>}}.
+    """
+    entries = {}
+    if paths is None:
+        cmd = ['git', 'ls-tree', '-r', '-z', '--full-tree', revision]
+    elif paths:
+        cmd = ['git', 'ls-tree', '-z', '--full-tree', revision, '--'] + list(paths)
+    else:
+        return entries
+    stdout, _, _ = _runCmd(cmd, outputCleanup=False)
+    for entry in stdout.split('\0'):
+        if not entry:
+            continue
+        metadata, path = entry.split('\t', 1)
+        mode, objectType, objectHash = metadata.split(' ')
+        # only the blobs are files (not the submodules)
+        if paths is None and objectType != 'blob':
+            continue
+        entries[path] = {'mode': mode, 'hash': objectHash}
+    return entries
+
+
+def moveWorkTree(fromRevision, toRevision):
+    """Update the index and the working directory from one revision to another.
+
+    Only the files that differ between the revisions are changed, and the local changes are kept.
+    HEAD is not moved.
+
+    Args:
+        fromRevision (str): the revision the index and the working directory currently match.
+        toRevision (str): the revision to move to.
+
+    Raises:
+        GitError: if a local change would be overwritten, this exception is raised and nothing is changed.
+    """
+    _runCmd(['git', 'read-tree', '-m', '-u', fromRevision, toRevision])
+
+
+def setHeadBranch(branch):
+    """Make HEAD point to a branch, without touching the index nor the working directory.
+
+    Args:
+        branch (str): the branch to check out.
+    """
+    try:
+        _runCmd(['git', 'symbolic-ref', 'HEAD', 'refs/heads/{}'.format(branch)])
+    finally:
+        invalidateRepositoryState()
+
+
+def updateRef(branch, newValue, oldValue=None):
+    """Move a branch to another commit, without touching the index nor the working directory.
+
+    Args:
+        branch (str): the branch to move.
+        newValue (str): the commit the branch shall point to.
+        oldValue (str, optional): the commit the branch is expected to point to. Defaults to None.
+                                  If given and the branch points elsewhere, nothing is done.
+
+    Raises:
+        GitError: if the branch cannot be moved, this exception is raised.
+    """
+    cmd = ['git', 'update-ref', 'refs/heads/{}'.format(branch), newValue]
+    if oldValue is not None:
+        cmd.append(oldValue)
+    try:
+        _runCmd(cmd)
+    finally:
+        invalidateRepositoryState()
+
+
+def updateRefs(updates):
+    """Move several references at once: either all of them are moved, or none is.
+
+    Args:
+        updates (list of (str, str, str)): the references to move, as (<full reference name>,
+                                           <new commit>, <expected current commit>).
+                                           A new commit None deletes the reference, an expected
+                                           commit None means that the reference must not exist yet.
+
+    Raises:
+        GitError: if one of the references cannot be moved, this exception is raised and nothing is changed.
+    """
+    lines = []
+    for ref, newValue, oldValue in updates:
+        if newValue is None:
+            lines.append('delete {} {}\n'.format(ref, oldValue))
+        elif oldValue is None:
+            lines.append('create {} {}\n'.format(ref, newValue))
+        else:
+            lines.append('update {} {} {}\n'.format(ref, newValue, oldValue))
+    try:
+        _runCmd(['git', 'update-ref', '--stdin'], inputContent=''.join(lines).encode('utf-8'))
+    finally:
+        invalidateRepositoryState()
+
+
+def pushTag(tag, remote='origin'):
+    """Push a tag to the remote.
+
+    Args:
+        tag (str): the name of the tag.
+        remote (str, optional): the remote to push to. Defaults to 'origin'.
+    """
+    _runCmd(['git', 'push', remote, tag])
+
+
+def setTag(tag, message=None):
+    """Set a tag to the current HEAD.
+
+    Args:
+        tag (str): name of the tag.
+        message (str, optional): description of the tag. Defaults to None. If a message is given, the tag
+                                 is annotated. If not, the tag is simple.
+    """
+    try:
+        if message is None:
+            _runCmd(['git', 'tag', tag])
+        else:
+            _runCmd(['git', 'tag', '-a', tag, '-m', message])
+    finally:
+        invalidateRepositoryState()
+
+
+def listTags():
+    """List the tags
+
+    Returns:
+        list of str: the tags
+    """
+    stdout, _, _ = _runCmd(['git', 'tag', '-l'])
+    return stdout.splitlines()
+
+
+def listRefs(patterns):
+    """List the references matching patterns, with the commit they point to.
+
+    Annotated tags are peeled, so that every reference is associated to a commit.
+
+    Args:
+        patterns (list of str): the patterns of the references (e.g. 'refs/heads/work', 'refs/tags').
+
+    Returns:
+        dict: the commit hash of each reference, as {<refname>: <hash>}.
+    """
+    stdout, _, _ = _runCmd(['git', 'for-each-ref', '--format=%(refname)%00%(objectname)%00%(*objectname)'] + list(patterns))
+    refs = {}
+    for line in stdout.splitlines():
+        refname, objectHash, peeledHash = line.split('\0')
+        refs[refname] = peeledHash or objectHash
+    return refs
+
+
+def listRefsDetails(patterns):
+    """List the references matching patterns, with the details of the commit they point to, with a single command.
+
+    Annotated tags are peeled: the commit, tree and date are the ones of the tagged commit.
+
+    Args:
+        patterns (list of str): the patterns of the references (e.g. 'refs/heads/work', 'refs/tags').
+
+    Returns:
+        list of dict: the references, sorted by refname, as {'refname': <str>, 'commit': <str>, 'tree': <str>,
+                      'date': <str>, 'tagger': <str>, 'subject': <str>}. The date is the committer date of the
+                      commit (ISO 8601), the tagger is empty if the reference is not an annotated tag, and the
+                      subject is the one of the tag if annotated, of the commit otherwise.
+    """
+    fields = ['%(refname)', '%(objectname)', '%(*objectname)', '%(tree)', '%(*tree)',
+              '%(committerdate:iso-strict)', '%(*committerdate:iso-strict)', '%(taggername) %(taggeremail)',
+              '%(contents:subject)']
+    stdout, _, _ = _runCmd(['git', 'for-each-ref', '--format={}'.format('%00'.join(fields))] + list(patterns))
+    refs = []
+    for line in stdout.splitlines():
+        refname, objectHash, peeledHash, tree, peeledTree, date, peeledDate, tagger, subject = line.split('\0')
+        refs.append({
+            'refname': refname,
+            'commit': peeledHash or objectHash,
+            'tree': peeledTree or tree,
+            'date': peeledDate or date,
+            'tagger': tagger.strip(),
+            'subject': subject
+        })
+    return refs
+
+
+def countTreesChanges(fromTree, toTrees):
+    """Count the files that differ between a tree and several other ones, with a single command.
+
+    Args:
+        fromTree (str): the hash of the tree used as reference.
+        toTrees (iterable of str): the hashes of the trees to compare to the reference.
+
+    Returns:
+        dict: the number of files that differ from the reference, as {<tree>: <int>}.
+    """
+    counts = {tree: 0 for tree in toTrees}
+    # each pair of trees with differences is printed as a '<from> <to>' line, followed by the paths
+    headers = {'{} {}'.format(fromTree, tree): tree for tree in counts if tree != fromTree}
+    if not headers:
+        return counts
+    inputContent = ''.join('{}\n'.format(header) for header in headers).encode('utf-8')
+    stdout, _, _ = _runCmd(['git', 'diff-tree', '--stdin', '-r', '-z', '--name-only', '--no-renames'],
+                           inputContent=inputContent, outputCleanup=False)
+    currentTree = None
+    for token in stdout.split('\0'):
+        header, newline, path = token.partition('\n')
+        if newline and header in headers:
+            currentTree = headers[header]
+            token = path
+        if token and currentTree is not None:
+            counts[currentTree] += 1
+    return counts
+
+
+def _parseLogNameStatusRecord(record):
+    """Internal function to parse one commit from the output of `iterLogNameStatus()`.
+
+    Args:
+        record (bytes): the commit, without its leading \\x01.
+
+    Returns:
+        dict: the commit, see `iterLogNameStatus()`.
+    """
+    # fields and names are separated by \0, the names start after a newline
+    fields = record.decode('utf-8').split('\0')
+    commitHash, parents, subject = fields[:3]
+    names = [field.strip('\n') for field in fields[3:]]
+    names = [name for name in names if name]
+    return {
+        'hash': commitHash,
+        'parents': parents.split(),
+        'subject': subject,
+        'files': list(zip(names[0::2], names[1::2]))
+    }
+
+
+def iterLogNameStatus(revision, reverse=False, chunkSize=65536):
+    """Walk the linear history of a revision, with the files changed by each commit.
+
+    Only the first parent of the commits is followed. The output of git is parsed while it is
+    produced, so that the memory does not grow with the history and the walk can be interrupted.
+    If the git commands are recorded (see `setCommandRecorder()`), the walk is recorded when git exits.
+
+    Args:
+        revision (str): the revision or revision range (e.g. 'work', '<hash>..work').
+        reverse (bool, optional): whether to walk from the oldest commit to the newest. Defaults to False.
+        chunkSize (int, optional): the size of the blocks read from git. Defaults to 65536.
+
+    Raises:
+        GitError: if git fails (e.g. unknown revision), this exception is raised.
+
+    Yields:
+        dict: the commits as
+              {
+                  'hash': <str>,
+                  'parents': <list of str>,
+                  'subject': <str>,
+                  'files': <list of (str, str)>  # (status, path), e.g. ('M', 'dir/file')
+              }.
+    """
+    cmd = ['git', 'log', '--first-parent', '--no-renames', '--name-status', '-z', '--format=%x01%H%x00%P%x00%s']
+    if reverse:
+        cmd.append('--reverse')
+    cmd += [revision, '--']
+    LOGGER.debug("Running command: %s", cmd)
+    recorder = _COMMAND_RECORDER['function']
+    if recorder is not None:
+        startTime = time.time()
+    readBytes = 0
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as proc:
+        try:
+            pending = b''
+            for chunk in iter(lambda: proc.stdout.read(chunkSize), b''):
+                readBytes += len(chunk)
+                records = (pending + chunk).split(b'\x01')
+                pending = records.pop()
+                for record in records:
+                    if record:
+                        yield _parseLogNameStatusRecord(record)
+            if pending:
+                yield _parseLogNameStatusRecord(pending)
+            stderr = proc.stderr.read().decode('utf-8').rstrip()
+            if proc.wait() != 0:
+                raise GitError("errno: {} ; {}".format(proc.returncode, stderr))
+        finally:
+            # the walk was interrupted by the caller
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            if recorder is not None:
+                recorder(cmd, startTime, time.time() - startTime, readBytes, proc.returncode)
+
+
+def getLastCommitsByPath(revision, paths):
+    """Get the last commit that changed each path, with a single walk of the history.
+
+    The walk stops as soon as all the paths are found.
+
+    Args:
+        revision (str): the revision (branch, tag, commit).
+        paths (iterable of str): the paths from the root of the repository.
+
+    Returns:
+        dict: the last commit of each path found, as {<path>: {'hash': <str>, 'subject': <str>}}.
+    """
+    remainingPaths = set(paths)
+    lastCommits = {}
+    if not remainingPaths:
+        return lastCommits
+    walk = iterLogNameStatus(revision)
+    try:
+        for commit in walk:
+            for _, path in commit['files']:
+                if path in remainingPaths:
+                    remainingPaths.remove(path)
+                    lastCommits[path] = {'hash': commit['hash'], 'subject': commit['subject']}
+            if not remainingPaths:
+                break
+    finally:
+        walk.close()
+    return lastCommits
+
+
+def logOneFile(filename, revision='HEAD', pattern=None, outputFormat='%h %s', logCount=None):
+    """Get the history logs of a single file.
+
+    Args:
+        filename (str): the path of the file of interest.
+        revision (str, optional): the revision in which to get the history logs. Defaults to 'HEAD'.
+        pattern (str, optional): the pattern of logs to filter. Defaults to None.
+        outputFormat (str, optional): the format in which the logs shall be returned. Defaults to '%h %s'.
+        logCount (_type_, optional): the number of logs to return. Defaults to None.
+
+    Returns:
+        list of str: the history log
+    """
+    cmd = ['git', 'log', '--format={}'.format(outputFormat)]
+    if logCount is not None:
+        cmd += ['-n', str(logCount)]
+    if pattern is not None:
+        cmd += ['--grep', pattern]
+    cmd += [revision, '--', filename]
+    stdout, _, _ = _runCmd(cmd)
+    return stdout.splitlines()
+
+
+def logLastOneFile(filename, revision='HEAD', pattern=None, outputFormat='%h %s'):
+    """Get the last history logs of a single file (matching the filter).
+
+    This is the same as calling `logOneFile()` with logCount=1.
+
+    Args:
+        filename (str): the path of the file of interest.
+        revision (str, optional): the revision in which to get the history logs. Defaults to 'HEAD'.
+        pattern (str, optional): the pattern of logs to filter. Defaults to None.
+        outputFormat (str, optional): the format in which the logs shall be returned. Defaults to '%h %s'.
+
+    Returns:
+        list of str: the history log.
+    """
+    logs = logOneFile(filename, revision, pattern, outputFormat, logCount=1)
+    if len(logs) == 0:
+        raise GitNoLogError("No log was found for {} in {}, with pattern {}".format(filename, revision, pattern))
+    else:
+        return logs[0]
+
+
+def diffOneFile(filename, fromRevision='HEAD', toRevision=None, withColors=False):
+    """Get the diff of a file between 2 revisions.
+
+    Args:
+        filename (str): the file on which to apply the diff.
+        fromRevision (str, optional): the revision used as reference. Defaults to 'HEAD'.
+        toRevision (str, optional): the revision used as the modification. Defaults to None.
+                                    If None, it takes the working directory state.
+
+    Returns:
+        str: the patch-like result of the diff.
+    """
+    if toRevision is None:
+        revision = fromRevision
+    else:
+        revision = "{}..{}".format(fromRevision, toRevision)
+
+    cmd = ['git', 'diff']
+    if withColors:
+        cmd += ['--color=always']
+    cmd += [revision, '--', filename]
+
+    stdout, _, _ = _runCmd(cmd, outputCleanup=False)
+    return stdout
+
+
+def diffRevisions(fromRevision, toRevision, paths=None, withColors=False):
+    """Get the diff of all the files that differ between 2 revisions, with a single command.
+
+    Args:
+        fromRevision (str): the revision used as reference.
+        toRevision (str): the revision used as the modification.
+        paths (list of str, optional): the paths to compare, from the root of the repository. Defaults to None.
+                                       If None, the whole revisions are compared.
+        withColors (bool, optional): whether to color the diff. Defaults to False.
+
+    Returns:
+        str: the patch-like result of the diff.
+    """
+    cmd = ['git', 'diff', '--no-renames']
+    if withColors:
+        cmd += ['--color=always']
+    cmd += [fromRevision, toRevision]
+    if paths is not None:
+        cmd += ['--'] + list(paths)
+    stdout, _, _ = _runCmd(cmd, cwd=getGitRoot(), outputCleanup=False)
+    return stdout
+
+
+def applyDiff(diff):
+    """Apply a patch-like string to the repository.
+
+    Args:
+        diff (str or bytes): the patch-like text.
+    """
+    if isinstance(diff, str):
+        diffBytes = diff.encode('utf8')
+    else:
+        diffBytes = diff
+    _runCmd(['git', 'apply'], inputContent=diffBytes)
@@ -0,0 +1,270 @@
+# SPDX-FileCopyrightText: 2025 Olivier Churlaud <olivier@churlaud.com>
+# SPDX-FileCopyrightText: 2025 CNES
+#
+# SPDX-License-Identifier: MIT
+
+"""Asynchronous versions of the git queries of opsconf.libgit, to run independent queries concurrently.
+
+The coroutines have the same arguments and results as their blocking counterparts in opsconf.libgit.
+The number of git processes running at the same time is limited (see `getConcurrency()`).
+
+From blocking code, the coroutines are run with `runSync()` or `runAll()`:
+
+    notes = aio.runAll(aio.getNotesFromCommit(commitHash) for commitHash in hashes)
+"""
+
+import asyncio
+import logging
+import os
+import os.path
+import time
+import weakref
+
+from . import GitError, GitNoLogError, getCommandRecorder
+
+LOGGER = logging.getLogger('opsconf.libgit.aio')
+
+# the limiter of each event loop: a semaphore cannot be shared between loops
+_LIMITERS = weakref.WeakKeyDictionary()
+
+
+def getConcurrency():
+    """Get the maximum number of git processes run at the same time.
+
+    It defaults to the number of processors, and can be overridden by the environment variable OPSCONF_GIT_JOBS.
+
+    Returns:
+        int: the number of processes.
+    """
+    try:
+        concurrency = int(os.environ['OPSCONF_GIT_JOBS'])
+    except (KeyError, ValueError):
+        concurrency = os.cpu_count() or 1
+    return max(concurrency, 1)
+
+
+def _getLimiter():
+    """Internal function to get the limiter of the running event loop.
+
+    Returns:
+        asyncio.Semaphore: the limiter.
+    """
+    loop = asyncio.get_event_loop()
+    if loop not in _LIMITERS:
+        _LIMITERS[loop] = asyncio.Semaphore(getConcurrency())
+    return _LIMITERS[loop]
+
+
+async def runCmd(command, raiseException=True, cwd=None, inputContent=None, outputCleanup=True):
+    """Run a command, as `opsconf.libgit._runCmd()` does, without blocking the event loop.
+
+    Args:
+        command (list of str): the command to run
+        raiseException (bool, optional): whether to raise an exception or not if the command returns
+                                         an errorcode that is not 0. Defaults to True.
+        cwd (str, optional): the path where to run the command from. Defaults to None.
+        inputContent (bytes, optional): a content to feed to the command through the stdin. Defaults to None.
+        outputCleanup (bool, optional): whether to strip or not the newlines from the stdout and stderr.
+                                           Defaults to True.
+
+    Raises:
+        GitError: if raiseException is True and the errorcode returned by the command is not 0 this exception
+                  is raised.
+
+    Returns:
+        (str, str, int): the stdout, stderr and errorcode returned by the command.
+    """
+    if inputContent is not None:
+        stdin = asyncio.subprocess.PIPE
+    else:
+        stdin = None
+
+    async with _getLimiter():
+        LOGGER.debug("Running command: %s", command)
+        recorder = getCommandRecorder()
+        if recorder is not None:
+            startTime = time.time()
+        proc = await asyncio.create_subprocess_exec(*command, stdout=asyncio.subprocess.PIPE,
+                                                    stderr=asyncio.subprocess.PIPE, stdin=stdin, cwd=cwd)
+        out, err = await proc.communicate(input=inputContent)
+        if recorder is not None:
+            recorder(command, startTime, time.time() - startTime, len(out), proc.returncode)
+    stdout = out.decode('utf-8')
+    stderr = err.decode('utf-8')
+    if outputCleanup:
+        stdout = stdout.rstrip()
+        stderr = stderr.rstrip()
+    errno = proc.returncode
+
+    LOGGER.debug('Return: %s', {'errno': errno, 'stdout': stdout, 'stderr': stderr})
+
+    if raiseException and errno != 0:
+        raise GitError("errno: {} ; {}".format(errno, stderr))
+    return stdout, stderr, errno
+
+
+async def gather(coroutines):
+    """Run coroutines concurrently, within the limit of git processes.
+
+    Args:
+        coroutines (iterable of coroutine): the coroutines to run.
+
+    Raises:
+        GitError: if one of the coroutines fails, its exception is raised.
+
+    Returns:
+        list: the results of the coroutines, in the same order.
+    """
+    return list(await asyncio.gather(*coroutines))
+
+
+def runSync(coroutine):
+    """Run a coroutine from blocking code, in its own event loop.
+
+    Args:
+        coroutine (coroutine): the coroutine to run.
+
+    Returns:
+        object: the result of the coroutine.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        # the child watcher of the subprocesses needs the loop to be the current one
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coroutine)
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+def runAll(coroutines):
+    """Run coroutines concurrently from blocking code (see `gather()`).
+
+    Args:
+        coroutines (iterable of coroutine): the coroutines to run.
+
+    Returns:
+        list: the results of the coroutines, in the same order.
+    """
+    return runSync(gather(coroutines))
+
+
+async def existFileInRevision(filename, revision, absolutePath=False):
+    """Check if the file exists in the revision (see `opsconf.libgit.existFileInRevision()`).
+
+    Args:
+        filename (str): the file path to search.
+        revision (str): the revison (branch, tag, commit) where to search.
+        absolutePath (bool): whether the path is absolute (from the root of the repo) or
+            relative to the current directory.
+
+    Returns:
+        bool: True if the file was found. False otherwise.
+    """
+    if absolutePath:
+        objectName = '{}:{}'.format(revision, filename)
+    else:
+        # './' makes git resolve the path from the current directory
+        objectName = '{}:./{}'.format(revision, os.path.relpath(filename))
+    stdout, _, errno = await runCmd(['git', 'cat-file', '-t', objectName], raiseException=False)
+    return errno == 0 and stdout == 'blob'
+
+
+async def listAllFilesInRevision(revision):
+    """List the repository's files at the given revision (see `opsconf.libgit.listAllFilesInRevision()`).
+
+    Args:
+        revision (str): the revision to use.
+
+    Returns:
+        list of str: the file paths.
+    """
+    stdout, _, _ = await runCmd(['git', 'ls-tree', '-r', '--name-only', revision])
+    return stdout.splitlines()
+
+
+async def logOneFile(filename, revision='HEAD', pattern=None, outputFormat='%h %s', logCount=None):
+    """Get the history logs of a single file (see `opsconf.libgit.logOneFile()`).
+
+    Args:
+        filename (str): the path of the file of interest.
+        revision (str, optional): the revision in which to get the history logs. Defaults to 'HEAD'.
+        pattern (str, optional): the pattern of logs to filter. Defaults to None.
+        outputFormat (str, optional): the format in which the logs shall be returned. Defaults to '%h %s'.
+        logCount (int, optional): the number of logs to return. Defaults to None.
+
+    Returns:
+        list of str: the history log
+    """
+    cmd = ['git', 'log', '--format={}'.format(outputFormat)]
+    if logCount is not None:
+        cmd += ['-n', str(logCount)]
+    if pattern is not None:
+        cmd += ['--grep', pattern]
+    cmd += [revision, '--', filename]
+    stdout, _, _ = await runCmd(cmd)
+    return stdout.splitlines()
+
+
+async def logLastOneFile(filename, revision='HEAD', pattern=None, outputFormat='%h %s'):
+    """Get the last history logs of a single file (see `opsconf.libgit.logLastOneFile()`).
+
+    Args:
+        filename (str): the path of the file of interest.
+        revision (str, optional): the revision in which to get the history logs. Defaults to 'HEAD'.
+        pattern (str, optional): the pattern of logs to filter. Defaults to None.
+        outputFormat (str, optional): the format in which the logs shall be returned. Defaults to '%h %s'.
+
+    Raises:
+        GitNoLogError: if no log was found, this exception is raised.
+
+    Returns:
+        str: the history log.
+    """
+    logs = await logOneFile(filename, revision, pattern, outputFormat, logCount=1)
+    if len(logs) == 0:
+        raise GitNoLogError("No log was found for {} in {}, with pattern {}".format(filename, revision, pattern))
+    return logs[0]
+
+
+async def diffOneFile(filename, fromRevision='HEAD', toRevision=None, withColors=False):
+    """Get the diff of a file between 2 revisions (see `opsconf.libgit.diffOneFile()`).
+
+    Args:
+        filename (str): the file on which to apply the diff.
+        fromRevision (str, optional): the revision used as reference. Defaults to 'HEAD'.
+        toRevision (str, optional): the revision used as the modification. Defaults to None.
+                                    If None, it takes the working directory state.
+        withColors (bool, optional): whether to color the diff. Defaults to False.
+
+    Returns:
+        str: the patch-like result of the diff.
+    """
+    if toRevision is None:
+        revision = fromRevision
+    else:
+        revision = "{}..{}".format(fromRevision, toRevision)
+
+    cmd = ['git', 'diff']
+    if withColors:
+        cmd += ['--color=always']
+    cmd += [revision, '--', filename]
+
+    stdout, _, _ = await runCmd(cmd, outputCleanup=False)
+    return stdout
+
+
+async def getNotesFromCommit(commitHash, topic="commits"):
+    """Get the notes from a given commit (see `opsconf.libgit.getNotesFromCommit()`).
+
+    Args:
+        commitHash (str): the hash of the commit from which to get the notes.
+        topic (str, optional): the notes topic (refs/notes/{topic}). Defaults to 'commits'
+
+    Returns:
+        list of str: the notes of the commit (split by '\n\n')
+    """
+    # if the commit has no note, the command returns 1
+    # with raiseException=False, stdout will be empty
+    stdout, _, _ = await runCmd(['git', 'notes', '--ref', topic, 'show', commitHash], raiseException=False)
+    return stdout.split('\n\n')
@@ -0,0 +1,202 @@
+# SPDX-FileCopyrightText: 2025 Olivier Churlaud <olivier@churlaud.com>
+# SPDX-FileCopyrightText: 2025 CNES
+#
+# SPDX-License-Identifier: MIT
+
+"""Opt-in profiling of the git commands run by opsconf.libgit.
+
+When enabled, each git command is recorded with its arguments, its wall time, the size of its
+stdout, the libgit function that ran it and the opsconf function that called libgit. At exit,
+a summary is printed on the stderr, or the records are written to a file in the Chrome trace
+format (readable with chrome://tracing or https://ui.perfetto.dev).
+
+The profiling is enabled with `enableProfiling()`, or with the environment variable OPSCONF_PROFILE:
+'1' or 'summary' for the summary, or the path of the trace file. In the path, '{pid}' is replaced by
+the id of the process, so that the git hooks do not overwrite the trace of opsconf.
+"""
+
+import atexit
+import json
+import os
+import sys
+
+from . import setCommandRecorder
+
+# the records are None as long as the profiling is disabled
+_PROFILE = {'output': None, 'records': None}
+SUMMARY_SIZE = 15
+
+
+def enableProfiling(output='summary'):
+    """Enable the profiling of the git commands.
+
+    Args:
+        output (str, optional): 'summary' to print a summary on the stderr at exit, or the path of
+                                the trace file to write at exit. Defaults to 'summary'.
+    """
+    if _PROFILE['records'] is None:
+        _PROFILE['records'] = []
+        atexit.register(writeProfile)
+        setCommandRecorder(recordCommand)
+    _PROFILE['output'] = output.replace('{pid}', str(os.getpid()))
+
+
+def isProfiling():
+    """Check if the git commands are profiled.
+
+    Returns:
+        bool: True if the profiling is enabled.
+    """
+    return _PROFILE['records'] is not None
+
+
+def getArgvShape(argv):
+    """Get the shape of a command: the git subcommand and its options, without their values.
+
+    Args:
+        argv (list of str): the command.
+
+    Returns:
+        str: the shape, as 'git log --format -n --grep'.
+    """
+    shape = argv[:2]
+    for argument in argv[2:]:
+        if argument == '--':
+            break
+        if argument.startswith('-'):
+            shape.append(argument.split('=', 1)[0])
+    return ' '.join(shape)
+
+
+def _getCallers():
+    """Internal function to find who runs the current git command.
+
+    Returns:
+        (str, str): the outermost libgit function of the stack, and the opsconf function that called it
+                    ('-' if there is none, e.g. in a coroutine).
+    """
+    function = '-'
+    caller = '-'
+    # pylint: disable=protected-access
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module.startswith('opsconf.libgit'):
+            if not frame.f_code.co_name.startswith('_') and module != __name__:
+                function = frame.f_code.co_name
+        elif module.startswith('opsconf'):
+            caller = '{}.{}'.format(module.rsplit('.', 1)[-1], frame.f_code.co_name)
+            break
+        frame = frame.f_back
+    return function, caller
+
+
+def recordCommand(argv, startTime, duration, stdoutBytes, errno):
+    """Record a git command, if the profiling is enabled.
+
+    Args:
+        argv (list of str): the command.
+        startTime (float): when the command started, as given by `time.time()`.
+        duration (float): the wall time of the command, in seconds.
+        stdoutBytes (int): the size of the stdout of the command.
+        errno (int): the errorcode returned by the command.
+    """
+    if _PROFILE['records'] is None:
+        return
+    function, caller = _getCallers()
+    _PROFILE['records'].append({
+        'argv': list(argv),
+        'shape': getArgvShape(list(argv)),
+        'start': startTime,
+        'duration': duration,
+        'stdoutBytes': stdoutBytes,
+        'errno': errno,
+        'function': function,
+        'caller': caller,
+    })
+
+
+def getRecords():
+    """Get the git commands recorded so far.
+
+    Returns:
+        list of dict: the records as {'argv': <list of str>, 'shape': <str>, 'start': <float>, 'duration': <float>,
+                      'stdoutBytes': <int>, 'errno': <int>, 'function': <str>, 'caller': <str>}.
+    """
+    return list(_PROFILE['records'] or [])
+
+
+def _aggregate(records, key):
+    """Internal function to aggregate the records.
+
+    Args:
+        records (list of dict): the records.
+        key (function): the function giving the group of a record.
+
+    Returns:
+        list of (object, int, float, int): the groups sorted by total time, as (<group>, <count>,
+                                           <total time>, <stdout bytes>).
+    """
+    groups = {}
+    for record in records:
+        count, total, stdoutBytes = groups.get(key(record), (0, 0.0, 0))
+        groups[key(record)] = (count + 1, total + record['duration'], stdoutBytes + record['stdoutBytes'])
+    return sorted(((group,) + values for group, values in groups.items()), key=lambda item: item[2], reverse=True)
+
+
+def formatSummary(records):
+    """Format the summary of the records: the top commands and callers by total time.
+
+    Args:
+        records (list of dict): the records (see `getRecords()`).
+
+    Returns:
+        str: the summary, as tables.
+    """
+    lines = ["{} git commands in {:.3f} s (pid {})".format(len(records), sum(record['duration'] for record in records),
+                                                          os.getpid())]
+    rowTemplate = "| {:<45} | {:>6} | {:>10} | {:>9} | {:>12} |"
+    lines.append(rowTemplate.format('Command', 'Count', 'Total (ms)', 'Mean (ms)', 'Stdout (KiB)'))
+    for shape, count, total, stdoutBytes in _aggregate(records, lambda record: record['shape'])[:SUMMARY_SIZE]:
+        lines.append(rowTemplate.format(shape[:45], count, '{:.1f}'.format(total * 1000),
+                                        '{:.1f}'.format(total * 1000 / count), '{:.1f}'.format(stdoutBytes / 1024)))
+    rowTemplate = "| {:<45} | {:<25} | {:>6} | {:>10} |"
+    lines.append(rowTemplate.format('Caller', 'Function', 'Count', 'Total (ms)'))
+    for (caller, function), count, total, _ in _aggregate(records, lambda record: (record['caller'],
+                                                                                   record['function']))[:SUMMARY_SIZE]:
+        lines.append(rowTemplate.format(caller[:45], function[:25], count, '{:.1f}'.format(total * 1000)))
+    return '\n'.join(lines)
+
+
+def formatTrace(records):
+    """Format the records in the Chrome trace format.
+
+    Args:
+        records (list of dict): the records (see `getRecords()`).
+
+    Returns:
+        dict: the trace, to be written as JSON.
+    """
+    events = []
+    for record in records:
+        events.append({
+            'name': record['shape'],
+            'cat': record['function'],
+            'ph': 'X',
+            'ts': record['start'] * 1e6,
+            'dur': record['duration'] * 1e6,
+            'pid': os.getpid(),
+            'tid': 0,
+            'args': {key: record[key] for key in ['argv', 'stdoutBytes', 'errno', 'function', 'caller']},
+        })
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def writeProfile():
+    """Print the summary or write the trace file of the recorded git commands."""
+    records = getRecords()
+    if _PROFILE['output'] in ['1', 'summary']:
+        sys.stderr.write(formatSummary(records) + '\n')
+    else:
+        with open(_PROFILE['output'], 'w') as f:
+            json.dump(formatTrace(records), f)
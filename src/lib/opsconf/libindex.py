@@ -0,0 +1,320 @@
+# SPDX-FileCopyrightText: 2025 Olivier Churlaud <olivier@churlaud.com>
+# SPDX-FileCopyrightText: 2025 CNES
+#
+# SPDX-License-Identifier: MIT
+
+"""Library for the history index of opsconf. This module relies on opsconf.libgit.
+
+The index is stored in '<git dir>/opsconf/index.json'. For each indexed branch, it keeps the
+linear list of its commits and, for every path, the ordered list of the commits that changed it.
+It is built once with a single walk of the history, then updated from the last indexed commit
+of each branch, so that questions such as "which commits changed this file before this tag"
+are answered without running git.
+"""
+
+import bisect
+import json
+import logging
+import os
+
+from . import libgit
+
+INDEX_FORMAT = 1
+INDEX_DIR = "opsconf"
+INDEX_FILENAME = "index.json"
+
+LOGGER = logging.getLogger('opsconf.libindex')
+
+_INDEXES = {}
+# the generation of the repository state (see `libgit.getRepositoryStateGeneration()`) when each index was
+# last brought up-to-date, with its branches
+_INDEX_GENERATIONS = {}
+
+
+class HistoryIndex:
+    """The history of the indexed branches, path by path.
+
+    The data is stored as:
+        {
+            'format': <int>,
+            'branches': {
+                <branch>: {
+                    'tip': <str>,  # the last indexed commit
+                    'commits': <list of str>,  # the hashes, from the oldest to the newest
+                    'files': { <path>: <list of [<int>, <str>]> }  # [position in 'commits', subject]
+                }
+            },
+            'tags': { <tag>: <str> }  # the commit of each tag
+        }
+    """
+
+    def __init__(self, data=None):
+        """Create the index.
+
+        Args:
+            data (dict, optional): the content of the index, as loaded from the disk. Defaults to None.
+        """
+        if data is None or data.get('format') != INDEX_FORMAT:
+            data = {'format': INDEX_FORMAT, 'branches': {}, 'tags': {}}
+        self.data = data
+        self._positions = {}
+
+    def _getPositions(self, branch):
+        """Internal function to get the position of every commit of a branch.
+
+        Args:
+            branch (str): the indexed branch.
+
+        Returns:
+            dict: the positions as {<hash>: <int>}.
+        """
+        if branch not in self._positions:
+            commits = self.data['branches'][branch]['commits']
+            self._positions[branch] = {commitHash: position for position, commitHash in enumerate(commits)}
+        return self._positions[branch]
+
+    def getBranches(self):
+        """Get the indexed branches.
+
+        Returns:
+            list of str: the branches.
+        """
+        return list(self.data['branches'])
+
+    def getTip(self, branch):
+        """Get the last indexed commit of a branch.
+
+        Args:
+            branch (str): the branch.
+
+        Returns:
+            str or None: the hash of the commit, None if the branch is not indexed.
+        """
+        if branch not in self.data['branches']:
+            return None
+        return self.data['branches'][branch]['tip']
+
+    def locateCommit(self, commitHash, preferredBranch=None):
+        """Find the branch and position of a commit.
+
+        Args:
+            commitHash (str): the full hash of the commit.
+            preferredBranch (str, optional): the branch to search first. Defaults to None.
+
+        Returns:
+            (str, int) or None: the branch and the position of the commit in it, None if not indexed.
+        """
+        branches = self.getBranches()
+        if preferredBranch in branches:
+            branches.remove(preferredBranch)
+            branches.insert(0, preferredBranch)
+        for branch in branches:
+            position = self._getPositions(branch).get(commitHash)
+            if position is not None:
+                return branch, position
+        return None
+
+    def getCommitHash(self, branch, position):
+        """Get the hash of a commit from its position.
+
+        Args:
+            branch (str): the indexed branch.
+            position (int): the position of the commit in the branch.
+
+        Returns:
+            str: the hash of the commit.
+        """
+        return self.data['branches'][branch]['commits'][position]
+
+    def getFileHistory(self, branch, path, position=None):
+        """Get the commits of a branch that changed a path.
+
+        Args:
+            branch (str): the indexed branch.
+            path (str): the path of the file, from the root of the repository.
+            position (int, optional): only return the commits up to this position. Defaults to None
+                                      (the whole history).
+
+        Returns:
+            list of dict: the commits, from the oldest to the newest, as
+                          {'hash': <str>, 'subject': <str>, 'position': <int>}.
+        """
+        branchData = self.data['branches'][branch]
+        entries = branchData['files'].get(path, [])
+        if position is not None:
+            entries = entries[:bisect.bisect_right([entry[0] for entry in entries], position)]
+        commits = branchData['commits']
+        return [{'hash': commits[entryPosition], 'subject': subject, 'position': entryPosition}
+                for entryPosition, subject in entries]
+
+    def getTags(self):
+        """Get the tags known by the index.
+
+        Returns:
+            dict: the commit of each tag, as {<tag>: <hash>}.
+        """
+        return dict(self.data['tags'])
+
+    def update(self, branches):
+        """Bring the index up-to-date with the references of the repository.
+
+        Only the commits added since the last indexed commit are read. If a branch was rewritten,
+        it is indexed again from scratch.
+
+        Args:
+            branches (list of str): the branches to index.
+
+        Returns:
+            bool: True if the index changed.
+        """
+        refs = libgit.listRefs(['refs/heads/{}'.format(branch) for branch in branches] + ['refs/tags'])
+        changed = False
+
+        tags = {refname[len('refs/tags/'):]: commitHash for refname, commitHash in refs.items()
+                if refname.startswith('refs/tags/')}
+        if tags != self.data['tags']:
+            self.data['tags'] = tags
+            changed = True
+
+        for branch in list(self.data['branches']):
+            if 'refs/heads/{}'.format(branch) not in refs:
+                del self.data['branches'][branch]
+                self._positions.pop(branch, None)
+                changed = True
+
+        for branch in branches:
+            tip = refs.get('refs/heads/{}'.format(branch))
+            if tip is None or tip == self.getTip(branch):
+                continue
+            if not self._updateBranch(branch, tip):
+                LOGGER.debug("Branch %s was rewritten, indexing it again", branch)
+                self.data['branches'][branch] = {'tip': None, 'commits': [], 'files': {}}
+                self._positions.pop(branch, None)
+                self._updateBranch(branch, tip)
+            changed = True
+        return changed
+
+    def _updateBranch(self, branch, tip):
+        """Internal function to index the commits of a branch up to its new tip.
+
+        Args:
+            branch (str): the branch to index.
+            tip (str): the current commit of the branch.
+
+        Returns:
+            bool: True if the branch could be updated, False if its indexed history is not
+                  an ancestor of the new tip.
+        """
+        branchData = self.data['branches'].setdefault(branch, {'tip': None, 'commits': [], 'files': {}})
+        lastTip = branchData['tip']
+        if lastTip is None:
+            revision = tip
+        else:
+            revision = '{}..{}'.format(lastTip, tip)
+
+        positions = self._getPositions(branch)
+        commitNb = 0
+        try:
+            for commit in libgit.iterLogNameStatus(revision, reverse=True):
+                if commitNb == 0 and lastTip is not None and commit['parents'][:1] != [lastTip]:
+                    return False
+                self._addCommit(branchData, positions, commit)
+                commitNb += 1
+        except libgit.GitError:
+            if lastTip is None:
+                raise
+            # the last indexed commit does not exist anymore
+            return False
+        if commitNb == 0 and lastTip is not None:
+            # the branch went backwards
+            return False
+
+        branchData['tip'] = tip
+        LOGGER.debug("Indexed %d commits of %s", commitNb, branch)
+        return True
+
+    @staticmethod
+    def _addCommit(branchData, positions, commit):
+        """Internal function to append a commit to the history of a branch.
+
+        Args:
+            branchData (dict): the indexed data of the branch.
+            positions (dict): the positions of the commits of the branch.
+            commit (dict): the commit, as given by `libgit.iterLogNameStatus()`.
+        """
+        position = len(branchData['commits'])
+        branchData['commits'].append(commit['hash'])
+        positions[commit['hash']] = position
+        for _, path in commit['files']:
+            branchData['files'].setdefault(path, []).append([position, commit['subject']])
+
+
+def getIndexPath():
+    """Get the path of the index file.
+
+    Returns:
+        str: the absolute path of the index.
+    """
+    return os.path.join(os.path.abspath(libgit.getGitDir()), INDEX_DIR, INDEX_FILENAME)
+
+
+def _loadIndex(indexPath):
+    """Internal function to load the index from the disk.
+
+    Args:
+        indexPath (str): the path of the index file.
+
+    Returns:
+        HistoryIndex: the index (empty if the file does not exist or cannot be read).
+    """
+    try:
+        with open(indexPath, 'r') as f:
+            return HistoryIndex(json.load(f))
+    except (OSError, ValueError) as e:
+        LOGGER.debug("Cannot read the index, starting a new one: %s", e)
+        return HistoryIndex()
+
+
+def _saveIndex(index, indexPath):
+    """Internal function to write the index to the disk.
+
+    The file is replaced atomically, so that a concurrent reader never sees a partial index.
+
+    Args:
+        index (HistoryIndex): the index to save.
+        indexPath (str): the path of the index file.
+    """
+    tmpPath = "{}.{}.tmp".format(indexPath, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(indexPath), exist_ok=True)
+        with open(tmpPath, 'w') as f:
+            json.dump(index.data, f, separators=(',', ':'))
+        os.replace(tmpPath, indexPath)
+    except OSError as e:
+        # the index is only an accelerator: it is still usable from memory
+        LOGGER.warning("Cannot write the opsconf index %s: %s", indexPath, e)
+
+
+def getIndex(branches):
+    """Get the index of the repository, up-to-date with its references.
+
+    The references are read once: the index is only brought up-to-date again after an operation
+    that changed them (see `libgit.invalidateRepositoryState()`).
+
+    Args:
+        branches (list of str): the branches to index.
+
+    Returns:
+        HistoryIndex: the index.
+    """
+    indexPath = getIndexPath()
+    index = _INDEXES.get(indexPath)
+    if index is None:
+        index = _loadIndex(indexPath)
+        _INDEXES[indexPath] = index
+    generation = (libgit.getRepositoryStateGeneration(), tuple(branches))
+    if _INDEX_GENERATIONS.get(indexPath) != generation:
+        if index.update(branches):
+            _saveIndex(index, indexPath)
+        _INDEX_GENERATIONS[indexPath] = generation
+    return index
@@ -4,8 +4,11 @@
 # SPDX-License-Identifier: MIT
 
 """Library for opsconf functions. This module relies on opsconf.libgit."""
+import json
 import logging
 import os
+import re
+import time
 
 from . import libgit
 
@@ -16,6 +19,7 @@ OPSCONF_BRANCH_QUALIF = "qualification"
 OPSCONF_BRANCH_VALID = "master"
 
 OPSCONF_PREFIX_PATTERN = "^v[0-9]\+: "
+OPSCONF_PREFIX_REGEX = re.compile(r"^v([0-9]+): ")
 OPSCONF_PREFIX_REMOVED = "vZZ: "
 OPSCONF_HOOKDIR = "{}/githooks".format(os.getenv('OPSCONF_DIR', '/usr/share/opsconf'))
 
@@ -25,9 +29,21 @@ OPSCONF_SYMBOL_REMOVED = '!'
 OPSCONF_SYMBOL_NEWER = '*'
 OPSCONF_SYMBOL_CHANGED = '+'
 
+OPSCONF_STATE_DIR = "opsconf"
+OPSCONF_FETCH_STAMP = "last_fetch"
+OPSCONF_FETCH_TTL = 60  # seconds, can be overridden by the environment variable OPSCONF_FETCH_TTL
+OPSCONF_NOTES_CACHE = "notes-{}.json"
+OPSCONF_TRAILER_MOVED_FROM = "Opsconf-Moved-From"
+OPSCONF_TRAILER_MOVED_TO = "Opsconf-Moved-To"
+OPSCONF_MANIFEST_REFS = "refs/opsconf/manifests"
+OPSCONF_MANIFEST_HEADER = "opsconf-manifest 1"
+
 
 LOGGER = logging.getLogger('opsconf')
 
+# the manifests already parsed, by hash of their blob
+_TAG_MANIFESTS = {}
+
 
 class OpsconfFatalError(RuntimeError):
     """Error that shall stop the current process.
@@ -64,12 +80,14 @@ def initBranches(rootBranch=None):
     """Initialize the branches that are needed for opsconf
 
     1) An orphan branch WORK is created.
-    2) If a migration is needed (rootBranch given), all files from rootBranch are checked out
-    and committed to this new branch. Otherwise, a README file is created.
+    2) If a migration is needed (rootBranch given), all files from rootBranch are committed to this
+    new branch, one 'v1' commit per file. Otherwise, a README file is created.
     3) An '.opsconf' file is created
-    4) The VALID and QUALIF branch are created (normally has orphan, but VALID might exist as an empty branch).
+    4) The VALID and QUALIF branch are created as orphan branches.
     5) They are initalized with the .opsconf file's creation commit.
-    6) At the end, the repository is put on the WORK branch.
+    6) At the end, the branches are pushed at once and the repository is put on the WORK branch.
+
+    The commits are written with a single `git fast-import` per branch, without running the hooks.
 
     Args:
         rootBranch (str, optional): the branch to migrate from. Defaults to None.
@@ -87,55 +105,50 @@ def initBranches(rootBranch=None):
     if os.path.isfile("{}/.opsconf".format(libgit.getGitRoot)):
         raise OpsconfFatalError(".opsconf file already exists. Aborting.")
 
+    startTime = time.time()
     if rootBranch is not None:
         libgit.switchToRevision(rootBranch)
-        libgit.createAndSwitchToOrphanBranch(OPSCONF_BRANCH_WORK)
-        for root, dirnames, filenames in os.walk('.', topdown=True):
-            if '.git' in dirnames:
-                dirnames.remove('.git')
-
-            for f in filenames:
-                filepath = os.path.join(root, f)
-                libgit.addOneFile(filepath)
-                libgit.commitOneFile(filepath, "v1: First version for '{}'".format(filepath))
+        # the index and the working directory match this revision
+        currentRevision = libgit.resolveRevision('HEAD')
+        # the messages are the ones `git commit -m` would write
+        commits = [{'message': "v1: First version for './{}'\n".format(path),
+                    'files': [(entry['mode'], entry['hash'], path)]}
+                   for path, entry in sorted(libgit.listTreeEntries(currentRevision, None).items())]
     else:
-        libgit.createAndSwitchToOrphanBranch(OPSCONF_BRANCH_WORK)
-        readmeFile = "README.md"
-        with open("{}/{}".format(libgit.getGitRoot(), readmeFile), 'w') as f:
-            f.write("# Readme\n")
-            f.write("This repository is managed by opsconf.\n")
-        libgit.addOneFile(readmeFile)
-        libgit.commitOneFile(readmeFile, "v1: Add Readme")
+        currentRevision = libgit.getEmptyTreeObject()
+        readmeHash = libgit.writeBlob("# Readme\nThis repository is managed by opsconf.\n".encode('utf-8'))
+        commits = [{'message': "v1: Add Readme\n", 'files': [('100644', readmeHash, 'README.md')]}]
         LOGGER.debug("Created first README")
 
-    with open("{}/.opsconf".format(libgit.getGitRoot()), 'w') as f:
-        # We only need to have it created
-        pass
-
-    LOGGER.debug("Created .opsconf file")
-    libgit.addOneFile(".opsconf")
-    libgit.commitOneFile(".opsconf", "v1: Initialized opsconf")
-    # Keep the commit hash to initialize the other branches (cherry-pick)
-    commitHash = libgit.logLastOneFile('.', outputFormat='%H')
-    libgit.push(OPSCONF_BRANCH_WORK, newBranch=True)
-    LOGGER.debug("Committed .opsconf file")
+    # the same commit initializes all the branches, as a cherry-pick would do
+    opsconfCommit = {'message': "v1: Initialized opsconf\n", 'author': libgit.getIdent('author'),
+                     'files': [('100644', libgit.writeBlob(b''), '.opsconf')]}
+    workTip = libgit.buildCommits(None, commits + [opsconfCommit])[-1]
+    updates = [('refs/heads/{}'.format(OPSCONF_BRANCH_WORK), workTip, None)]
     for branch in [OPSCONF_BRANCH_VALID, OPSCONF_BRANCH_QUALIF]:
-        # if the branch exists
-        if libgit.existLocalBranch(branch):
-            LOGGER.debug("Changing to branch: %s", branch)
-            libgit.switchToRevision(branch)
-            libgit.cherryPick(commitHash)
-            libgit.push(branch)
-            LOGGER.debug("Branch updated: %s", branch)
+        updates.append(('refs/heads/{}'.format(branch), libgit.buildCommits(None, [opsconfCommit])[0], None))
+    LOGGER.debug("Committed .opsconf file")
+
+    headBranch = libgit.getHeadBranch()
+    libgit.moveWorkTree(currentRevision, workTip)
+    libgit.updateRefs(updates)
+    libgit.setHeadBranch(OPSCONF_BRANCH_WORK)
+    try:
+        libgit.pushRefs([ref for ref, _, _ in updates], setUpstream=True)
+    except libgit.GitError as e:
+        # put back the branches, the files and HEAD as they were before
+        libgit.updateRefs([(ref, None, newValue) for ref, newValue, _ in updates])
+        libgit.moveWorkTree(workTip, currentRevision)
+        if headBranch is not None:
+            libgit.setHeadBranch(headBranch)
         else:
-            LOGGER.debug("Creating branch: %s", branch)
-            libgit.createAndSwitchToOrphanBranch(branch)
-            libgit.resetTree(hard=True)
-            libgit.cherryPick(commitHash)
-            libgit.push(branch, newBranch=True)
-            LOGGER.debug("Branch created: %s", branch)
+            libgit.switchToRevision(currentRevision)
+        raise OpsconfFatalError("The push of the branches failed, nothing was initialized: {}".format(e))
 
-    libgit.switchToRevision(OPSCONF_BRANCH_WORK)
+    if rootBranch is not None:
+        duration = time.time() - startTime
+        LOGGER.info("Migrated %d files from %s in %.1f s (%.0f files/s)",
+                    len(commits), rootBranch, duration, len(commits) / duration if duration > 0 else 0)
 
 
 def isCurrentBranchWork():
@@ -168,13 +181,100 @@ def isCurrentBranchValid():
     return currentBranch == OPSCONF_BRANCH_VALID
 
 
-def isOpsConfRepo():
+def getFetchTtl():
+    """Get how long the fetched references are considered fresh.
+
+    The value is read from the environment variable OPSCONF_FETCH_TTL, in seconds.
+
+    Returns:
+        float: the time to live of a fetch, in seconds.
+    """
+    ttl = os.getenv('OPSCONF_FETCH_TTL')
+    if ttl is None:
+        return OPSCONF_FETCH_TTL
+    try:
+        return float(ttl)
+    except ValueError:
+        LOGGER.warning("Invalid OPSCONF_FETCH_TTL '%s', using %d seconds", ttl, OPSCONF_FETCH_TTL)
+        return OPSCONF_FETCH_TTL
+
+
+def _getFetchStampPath():
+    """Internal function to get the path of the file where the time of the last fetch is stored.
+
+    Returns:
+        str: the absolute path of the file.
+    """
+    return os.path.join(os.path.abspath(libgit.getGitDir()), OPSCONF_STATE_DIR, OPSCONF_FETCH_STAMP)
+
+
+def getLastFetchTime():
+    """Get when the remote repository was fetched for the last time.
+
+    Returns:
+        float or None: the time of the last fetch (as given by time.time()), None if unknown.
+    """
+    try:
+        with open(_getFetchStampPath(), 'r') as f:
+            return float(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def fetchRemote(strict=True):
+    """Fetch the remote repository.
+
+    When not strict, the fetch is skipped if the last one is more recent than `getFetchTtl()`,
+    or if the environment variable OPSCONF_OFFLINE is set.
+
+    Args:
+        strict (bool, optional): whether the fetch must be done in any case. Defaults to True.
+
+    Returns:
+        bool: True if the remote repository was fetched, False if the local references were used.
+    """
+    if not strict:
+        if 'OPSCONF_OFFLINE' in os.environ:
+            LOGGER.debug("Offline: the remote repository is not fetched")
+            return False
+        lastFetchTime = getLastFetchTime()
+        if lastFetchTime is not None and 0 <= time.time() - lastFetchTime < getFetchTtl():
+            LOGGER.debug("The remote repository was fetched %.0f seconds ago", time.time() - lastFetchTime)
+            return False
+
+    fetchTime = time.time()
+    # the manifests of the tags are fetched with the branches and the tags
+    libgit.fetchRefs('origin', ['+refs/heads/*:refs/remotes/origin/*', '+{0}/*:{0}/*'.format(OPSCONF_MANIFEST_REFS)])
+    _setLastFetchTime(fetchTime)
+    return True
+
+
+def _setLastFetchTime(fetchTime):
+    """Internal function to write the time of the last fetch of the remote repository.
+
+    Args:
+        fetchTime (float): the time when the fetch started, as given by `time.time()`.
+    """
+    stampPath = _getFetchStampPath()
+    try:
+        os.makedirs(os.path.dirname(stampPath), exist_ok=True)
+        with open(stampPath, 'w') as f:
+            f.write(repr(fetchTime))
+    except OSError as e:
+        LOGGER.warning("Cannot write the time of the fetch in %s: %s", stampPath, e)
+
+
+def isOpsConfRepo(strictFetch=True):
     """Check if the current repository is an opsconf repository.
 
+    Args:
+        strictFetch (bool, optional): whether the remote repository must be fetched, even if it was
+                                      fetched recently. Defaults to True.
+
     Returns:
         bool: True if it is an opsconf repository. False otherwise.
     """
-    libgit.fetch()
+    fetchRemote(strict=strictFetch)
     if not (libgit.existRemoteBranch(OPSCONF_BRANCH_WORK) and
             libgit.existRemoteBranch(OPSCONF_BRANCH_QUALIF) and
             libgit.existRemoteBranch(OPSCONF_BRANCH_VALID)):
@@ -267,6 +367,146 @@ def getRevisionRange(filename, revision):
     return revisionRange
 
 
+def getHistoryIndex():
+    """Get the history index of the opsconf branches, up-to-date with the repository.
+
+    Returns:
+        libindex.HistoryIndex: the index.
+    """
+    # imported on use, to keep the import of opsconf light for the git hooks
+    from . import libindex  # pylint: disable=import-outside-toplevel
+
+    return libindex.getIndex([OPSCONF_BRANCH_WORK, OPSCONF_BRANCH_QUALIF, OPSCONF_BRANCH_VALID])
+
+
+def _locateRevision(index, revision):
+    """Internal function to find a revision in the history index.
+
+    Args:
+        index (libindex.HistoryIndex): the history index.
+        revision (str): a revision (commit, branch, tag).
+
+    Returns:
+        (str, int) or None: the indexed branch and the position of the revision in it,
+                            None if the revision is not part of an indexed branch.
+    """
+    try:
+        commitHash = libgit.resolveRevision(revision)
+    except libgit.GitError:
+        return None
+    return index.locateCommit(commitHash, preferredBranch=revision)
+
+
+def _getVersionFromSubject(subject):
+    """Internal function to get the version from a commit subject matching OPSCONF_PREFIX_PATTERN.
+
+    Args:
+        subject (str): the commit subject.
+
+    Returns:
+        int or None: the version, None if the subject is not the one of a version.
+    """
+    match = OPSCONF_PREFIX_REGEX.match(subject)
+    if match is None:
+        return None
+    return int(match.group(1))
+
+
+def getFileHistory(filename, revision, sinceDeletion=True):
+    """Get the commits that changed a file in a revision.
+
+    The history index answers if the revision is part of an opsconf branch, git otherwise.
+
+    Args:
+        filename (str): the file of interest.
+        revision (str): the revision (branch, tag, commit).
+        sinceDeletion (bool, optional): whether to ignore what happened before the last deletion of the file.
+                                        Defaults to True.
+
+    Returns:
+        list of dict: the commits from the oldest to the newest, as
+                      {'hash': <str>, 'subject': <str>, 'version': <int or None>}.
+    """
+    index = getHistoryIndex()
+    location = _locateRevision(index, revision)
+    if location is None:
+        if sinceDeletion:
+            revision = getRevisionRange(filename, revision)
+        history = []
+        for log in reversed(libgit.logOneFile(filename, revision, outputFormat='%H %s')):
+            commitHash, _, subject = log.partition(' ')
+            history.append({'hash': commitHash, 'subject': subject})
+    else:
+        branch, position = location
+        history = index.getFileHistory(branch, libgit.toRepositoryPath(filename), position)
+        if sinceDeletion:
+            deletions = [k for k, commit in enumerate(history) if commit['subject'].startswith(OPSCONF_PREFIX_REMOVED)]
+            if deletions:
+                history = history[deletions[-1] + 1:]
+
+    for commit in history:
+        commit['version'] = _getVersionFromSubject(commit['subject'])
+    return history
+
+
+def _getLastCommitsByPath(index, revision, paths):
+    """Internal function to get the last commit that changed each path in a revision.
+
+    The manifest of a tag answers first. Then the history index answers if the revision is part of
+    an opsconf branch. Otherwise a single walk of the history of the revision is done for all the paths.
+
+    Args:
+        index (libindex.HistoryIndex): the history index.
+        revision (str): the revision (branch, tag, commit).
+        paths (iterable of str): the paths from the root of the repository.
+
+    Returns:
+        dict: the last commit of each path found, as {<path>: {'hash': <str>, 'subject': <str>}}.
+    """
+    lastCommits = {}
+    manifest = getTagManifest(revision)
+    if manifest is not None:
+        for path in paths:
+            if path in manifest:
+                # the callers read the version from the subject
+                lastCommits[path] = {'hash': manifest[path]['hash'], 'subject': "v{}: ".format(manifest[path]['version'])}
+        # the files without a version in the manifest are looked up in the history
+        paths = [path for path in paths if path not in lastCommits]
+        if not paths:
+            return lastCommits
+
+    location = _locateRevision(index, revision)
+    if location is None:
+        lastCommits.update(libgit.getLastCommitsByPath(revision, paths))
+        return lastCommits
+
+    for path in paths:
+        history = index.getFileHistory(location[0], path, location[1])
+        if history:
+            lastCommits[path] = history[-1]
+    return lastCommits
+
+
+def getVersionHash(filename, version, revision='HEAD'):
+    """Get the hash of the commit of a version of a file.
+
+    Args:
+        filename (str): the file of interest.
+        version (int): the version.
+        revision (str, optional): the revision in which to search. Defaults to 'HEAD'.
+
+    Raises:
+        libgit.GitNoLogError: if the version cannot be found, this exception is raised.
+
+    Returns:
+        str: the hash of the commit.
+    """
+    for commit in reversed(getFileHistory(filename, revision, sinceDeletion=False)):
+        if commit['version'] == version:
+            return commit['hash']
+    raise libgit.GitNoLogError("No log was found for {} in {}, with version {}".format(filename, revision, version))
+
+
 def prependFileVersion(filename):
     """Prepend to the commit message the version of the file ('v<VERSION>: ')
 
@@ -311,6 +551,90 @@ def prependFileVersion(filename):
         f.write("{}: {}".format(commitVersion, commitMessage))
 
 
+def commitFiles(filenames, message):
+    """Commit several files with one commit per file, and push them at once.
+
+    The versions are computed from a single pass on the history, the commits are created without
+    running the git hooks, and the branch is pushed once at the end. If the push fails, the
+    commits are undone: the changes stay in the working directory.
+
+    Args:
+        filenames (list of str): the paths of the files to commit.
+        message (str): the commit message, without the version.
+
+    Raises:
+        OpsconfFatalError: if a file cannot be committed or the push fails, this exception is raised
+                           and nothing is committed.
+
+    Returns:
+        list of (str, int): the committed files and their new versions. The unchanged files and the
+                            deleted files are skipped (a file is removed with `removeFiles()`).
+    """
+    deletedFiles = [filename for filename in filenames if not os.path.lexists(filename)]
+    for filename in deletedFiles:
+        LOGGER.warning("Not committed, the file was deleted (use 'opsconf remove'): %s", filename)
+    filenames = [filename for filename in filenames if filename not in deletedFiles]
+    for filename in filenames:
+        # we only know how to deal with files and links
+        if not os.path.islink(filename) and not os.path.isfile(filename):
+            raise OpsconfFatalError("This is not a file or link: {}".format(filename))
+    if message.split('\n', maxsplit=1)[0].strip() == "":
+        raise OpsconfFatalError("Empty commit. Aborting")
+    if not filenames:
+        return []
+
+    # the checks of the pre-commit hook, done once for all the files
+    checkBranchIsWork()
+    checkBranchUpToDate()
+
+    branch = libgit.getCurrentBranch()
+    parent = libgit.getLocalBranchTip()
+    prefix = libgit.getPathPrefix()
+    paths = [libgit.toRepositoryPath(filename, prefix) for filename in filenames]
+
+    commits = []
+    committedFiles = []
+    tip = parent
+    try:
+        try:
+            libgit.addFiles(filenames)
+        except libgit.GitError as e:
+            raise OpsconfFatalError("Cannot add the files, nothing was committed: {}".format(e))
+        entries = libgit.listIndexEntries(paths)
+        currentBlobs = libgit.getObjectsInfo('{}:{}'.format(parent, path) for path in paths)
+        lastCommits = _getLastCommitsByPath(getHistoryIndex(), parent, paths)
+
+        for filename, path, currentBlob in zip(filenames, paths, currentBlobs):
+            entry = entries.get(path)
+            if entry is None:
+                raise OpsconfFatalError("The file was not added, nothing was committed: {}".format(filename))
+            if currentBlob is not None and currentBlob['hash'] == entry['hash']:
+                LOGGER.debug("File unchanged, not committed: \"%s\"", filename)
+                continue
+            lastCommit = lastCommits.get(path)
+            previousVersion = None if lastCommit is None else getVersionFromCommitMsg(lastCommit['subject'])
+            version = (previousVersion or 0) + 1
+            commits.append({'message': libgit.cleanupMessage("v{}: {}".format(version, message)),
+                            'files': [(entry['mode'], entry['hash'], path)]})
+            committedFiles.append((filename, version))
+
+        if commits:
+            tip = libgit.createCommits(branch, parent, commits)
+    finally:
+        # the index must follow the branch, whatever happened
+        libgit.resetTree(mixed=True)
+
+    if not commits:
+        return []
+    try:
+        libgit.push(branch)
+    except libgit.GitError as e:
+        libgit.updateRef(branch, parent, tip)
+        libgit.resetTree(mixed=True)
+        raise OpsconfFatalError("The push failed, nothing was committed: {}".format(e))
+    return committedFiles
+
+
 def checkBranchIsWork():
     """Check if the current branch is WORK. Raises an exception otherwise.
 
@@ -372,7 +696,7 @@ def checkBranchUpToDate():
     Returns:
         bool: True if the local and remote branch are in sync.
     """
-    libgit.fetch()
+    fetchRemote()
     localTip = libgit.getLocalBranchTip()
     remoteTip = libgit.getRemoteBranchTip()
     if localTip == remoteTip:
@@ -420,24 +744,76 @@ def sync(localBranch, remote='origin'):
     Raises:
         OpsconfFatalError: if the synchronization cannot be automated, this exception is raised.
     """
-    libgit.fetch(remote, branch=localBranch)
-    libgit.pullNotes(remote)
+    syncBranches([localBranch], remote)
+
+
+def syncBranches(branches, remote='origin'):
+    """Synchronize several local branches with the remote, with a single fetch.
+
+    All the branches of the remote, the notes and the manifests of the tags are fetched at once, with
+    patterns that do not fail when the remote lacks some of them. Then each branch is compared to the
+    remote one: a branch behind is fast-forwarded (with a merge if it is checked out, by moving it
+    otherwise), and the branches ahead are pushed at once.
 
-    remoteBranch = "{}/{}".format(remote, localBranch)
+    Args:
+        branches (list of str): the branches to synchronize. The ones that do not exist locally or on the
+                                remote are skipped.
+        remote (str, optional): the remote to synchronize to. Defaults to 'origin'.
+
+    Raises:
+        OpsconfFatalError: if the synchronization cannot be automated, this exception is raised and no
+                           branch is changed.
+    """
+    # a detached HEAD has no branch to synchronize
+    branches = [branch for branch in branches if branch != 'HEAD']
+    fetchTime = time.time()
+    libgit.fetchRefs(remote, ['+refs/heads/*:refs/remotes/{}/*'.format(remote), 'refs/notes/*:refs/notes/*',
+                              '+{0}/*:{0}/*'.format(OPSCONF_MANIFEST_REFS)])
+    if remote == 'origin':
+        # the opsconf branches are fetched: the read-only commands can rely on them
+        _setLastFetchTime(fetchTime)
+
+    refs = libgit.listRefs(['refs/heads/{}'.format(branch) for branch in branches]
+                           + ['refs/remotes/{}/{}'.format(remote, branch) for branch in branches])
+    behindBranches = []
+    aheadBranches = []
+    for branch in branches:
+        localTip = refs.get('refs/heads/{}'.format(branch))
+        remoteTip = refs.get('refs/remotes/{}/{}'.format(remote, branch))
+        LOGGER.debug("Comparing %s/%s and %s", remote, branch, branch)
+        if localTip is None:
+            LOGGER.debug("The branch %s does not exist locally, nothing to synchronize", branch)
+            continue
+        if remoteTip is None:
+            LOGGER.warning("The branch %s does not exist on %s, nothing to synchronize", branch, remote)
+            continue
+        if localTip == remoteTip:
+            LOGGER.debug("Local and remote branch are in sync: %s", branch)
+            continue
+        mergeBase = libgit.getMergeBase(localTip, remoteTip)
+        if mergeBase == localTip:
+            behindBranches.append((branch, localTip, remoteTip))
+        elif mergeBase == remoteTip:
+            aheadBranches.append(branch)
+        else:
+            raise OpsconfFatalError("Local and remote branches have diverged ({}). Call an expert !".format(branch))
 
-    LOGGER.debug("Comparing %s and %s", remoteBranch, localBranch)
-    if libgit.getLocalBranchTip() == libgit.getRemoteBranchTip():
-        LOGGER.debug("Local and remote branch are in sync")
-    elif libgit.isAncestor(remoteBranch, ancestor=localBranch):
-        LOGGER.info("Local is behind the remote repository")
-        libgit.merge(remoteBranch, ffOnly=True)
+    currentBranch = libgit.getCurrentBranch()
+    for branch, localTip, remoteTip in behindBranches:
+        LOGGER.info("Local is behind the remote repository: %s", branch)
+        if branch == currentBranch:
+            libgit.merge("{}/{}".format(remote, branch), ffOnly=True)
+    otherUpdates = [('refs/heads/{}'.format(branch), remoteTip, localTip)
+                    for branch, localTip, remoteTip in behindBranches if branch != currentBranch]
+    if otherUpdates:
+        libgit.updateRefs(otherUpdates)
+    if behindBranches:
         LOGGER.info("Local was updated")
-    elif libgit.isAncestor(localBranch, ancestor=remoteBranch):
-        LOGGER.info("Local is ahead the remote repository")
-        libgit.push(localBranch)
+    if aheadBranches:
+        for branch in aheadBranches:
+            LOGGER.info("Local is ahead the remote repository: %s", branch)
+        libgit.pushRefs(['refs/heads/{}'.format(branch) for branch in aheadBranches], remote)
         LOGGER.info("Remote was updated")
-    else:
-        raise OpsconfFatalError("Local and remote branches have diverged. Call an expert !")
 
 
 def doPush():
@@ -447,56 +823,82 @@ def doPush():
     libgit.push(branch)
 
 
-def retrieveVersion(sourceBranch, filename, version):
-    """Bring the version of a file to the current branch.
+def checkBranchInSync(branch, remote='origin'):
+    """Check if a local branch is in sync with the remote, without changing anything.
+
+    Args:
+        branch (str): the branch to check.
+        remote (str, optional): the remote to compare to. Defaults to 'origin'.
+
+    Raises:
+        OpsconfFatalError: if the branch is not in sync, this exception is raised.
+    """
+    fetchRemote()
+    try:
+        inSync = libgit.resolveRevision(branch) == libgit.resolveRevision('{}/{}'.format(remote, branch))
+    except libgit.GitError:
+        inSync = False
+    if not inSync:
+        raise OpsconfFatalError("The branch {} is not in sync. Aborting. Run 'opsconf sync'".format(branch))
+
+
+def _prepareRetrieval(sourceBranch, filename, version, targetBranch, pending=None):
+    """Internal function to compute the commits that bring the version of a file to a branch.
+
+    The commits of the source branch are replayed as a cherry-pick would do: same message, same
+    author and author date, the changes of the commit applied to the target branch.
 
     Args:
         sourceBranch (src): the branch where to search the version from.
         filename (str): the path of the file to search.
         version (int): the version to retrieve.
+        targetBranch (str): the branch where to bring the version.
+        pending (dict, optional): the state of the target branch after the commits computed by the
+                                  previous calls, updated by this one, as
+                                  {'versions': {<path>: (<int>, <subject>)},
+                                   'entries': {<path>: (<mode>, <hash>) or None}}.
+                                  Defaults to None: the commits are applied on the target branch as it is.
 
     Raises:
         OpsconfFatalError: if the retrieval is not possible, this exception is raised.
 
     Returns:
-        str: the hash of the last created commit (or None if no commit was created).
+        list of dict or None: the commits to create on top of the target branch (see `libgit.buildCommits()`),
+                              None if the file is already in this version.
     """
-    # Bring a file version and its associated history from one branch to
-    # the current one.
-    revisionRange = getRevisionRange(filename, "HEAD")
-    sourceBranchRevisionRange = getRevisionRange(filename, sourceBranch)
-
-    try:
-        lastVersionCommitMsg = libgit.logLastOneFile(filename, revisionRange, pattern=OPSCONF_PREFIX_PATTERN, outputFormat="%s")
-        lastVersionNb = getVersionFromCommitMsg(lastVersionCommitMsg)
-    except libgit.GitNoLogError:
-        lastVersionNb = None
+    if pending is None:
+        pending = {'versions': {}, 'entries': {}}
+    path = libgit.toRepositoryPath(filename)
+    sourceVersions = [commit for commit in getFileHistory(filename, sourceBranch) if commit['version'] is not None]
+    commits = []
+
+    if path in pending['versions']:
+        lastVersionNb, lastVersionSubject = pending['versions'][path]
+    else:
+        versions = [commit for commit in getFileHistory(filename, targetBranch) if commit['version'] is not None]
+        if versions:
+            lastVersionNb, lastVersionSubject = versions[-1]['version'], versions[-1]['subject']
+        else:
+            lastVersionNb, lastVersionSubject = None, None
 
     if lastVersionNb is None:
-        # case where the current file does not exist yet on the current branch
-        # we pretend that the last commit on this file is HEAD
+        # case where the current file does not exist yet on the target branch
         LOGGER.debug("The file does not exist on this branch. Will take the first version: %s", filename)
 
-        # we take the last commit of the repository
-        lastHashBeforeRetrieval = libgit.logLastOneFile(libgit.getGitRoot(), "HEAD", outputFormat="%H")
-
         # get the first version from this file
-        try:
-            firstVersionHash = libgit.logLastOneFile(filename, sourceBranchRevisionRange, pattern="^v1: ", outputFormat="%H")
-        except libgit.GitNoLogError:
+        firstVersions = [commit for commit in sourceVersions if commit['version'] == 1]
+        if not firstVersions:
             raise OpsconfFatalError("v1 of {} does not exist in branch {}.".format(filename, sourceBranch))
+        firstVersionHash = firstVersions[-1]['hash']
 
         # A cherry pick doesn't work here, because we do not know the history of the source branch
         # so we do as if v1 was the creation of the file
-        firstVersionCommitMsg = libgit.logLastOneFile(filename, firstVersionHash, outputFormat='%B')
-        firstVersionAuthor = libgit.logLastOneFile(filename, firstVersionHash, outputFormat='%an <%ae>')
-        firstVersionDate = libgit.logLastOneFile(filename, firstVersionHash, outputFormat='%ci')
-
-        libgit.bringFileFromRevision(filename, firstVersionHash)
-        libgit.addOneFile(filename)
-        os.environ['OPSCONF_BYPASS_CHECK'] = 'yes'
-        libgit.commitOneFile(filename, message=firstVersionCommitMsg, author=firstVersionAuthor, date=firstVersionDate)
-        del os.environ['OPSCONF_BYPASS_CHECK']
+        firstVersionCommit = libgit.readCommit(firstVersionHash)
+        firstVersionEntry = libgit.listTreeEntries(firstVersionHash, [path])[path]
+        commits.append({'message': firstVersionCommit['message'],
+                        'author': "{} {}".format(firstVersionCommit['author'], firstVersionCommit['authorDate']),
+                        'files': [(firstVersionEntry['mode'], firstVersionEntry['hash'], path)]})
+        lastVersionSubject = firstVersions[-1]['subject']
 
     elif lastVersionNb == version:
         # case where the current file already has the expected version
@@ -508,41 +910,52 @@ def retrieveVersion(sourceBranch, filename, version):
         # case where the current file has a greater version than the current one
         # => Error as versions must increase
         raise OpsconfFatalError("{} is already in a latter version than {}. Aborting.".format(filename, version))
-    else:
-        # get the last commit on the file, on our branch
-        lastHashBeforeRetrieval = libgit.logLastOneFile(filename, revisionRange, pattern=OPSCONF_PREFIX_PATTERN, outputFormat="%H")
 
-    lastVersionSubject = libgit.logLastOneFile(filename, revisionRange, pattern=OPSCONF_PREFIX_PATTERN, outputFormat="%s")
-    try:
-        lastHashSource = libgit.logLastOneFile(filename, sourceBranchRevisionRange, pattern=lastVersionSubject, outputFormat="%H")
-        versionHashSource = libgit.logLastOneFile(filename, sourceBranchRevisionRange, pattern="^v{}: ".format(version), outputFormat="%H")
-    except libgit.GitNoLogError:
+    # find, in the source branch, the commits after the one we already have, up to the requested version
+    lastSourcePositions = [k for k, commit in enumerate(sourceVersions) if commit['subject'] == lastVersionSubject]
+    versionSourcePositions = [k for k, commit in enumerate(sourceVersions) if commit['version'] == version]
+    if not lastSourcePositions or not versionSourcePositions:
         raise OpsconfFatalError("v{} of {} does not exist in branch {}".format(version, filename, sourceBranch))
 
-    revisionToRetrieve = libgit.logOneFile(filename,
-                                           "{}..{}".format(lastHashSource, versionHashSource),
-                                           pattern=OPSCONF_PREFIX_PATTERN,
-                                           outputFormat='%h'
-                                          )
-    # We want the history sorted by increasing date
-    revisionToRetrieve.reverse()
-
+    revisionToRetrieve = [commit['hash'] for commit in
+                          sourceVersions[lastSourcePositions[-1] + 1:versionSourcePositions[-1] + 1]]
     LOGGER.debug("Cherry-picking commits: %s", " ".join(revisionToRetrieve))
-    for rev in revisionToRetrieve:
-        libgit.cherryPick(rev)
 
-    libgit.push(libgit.getCurrentBranch())
+    changesByCommit = libgit.listCommitChanges(revisionToRetrieve)
+    changedPaths = set(change['path'] for changes in changesByCommit.values() for change in changes)
+    # the content of the changed files on the target branch, as the commits are applied
+    entries = {entryPath: (entry['mode'], entry['hash'])
+               for entryPath, entry in libgit.listTreeEntries(targetBranch, sorted(changedPaths)).items()}
+    entries.update((entryPath, entry) for entryPath, entry in pending['entries'].items() if entryPath in changedPaths)
+    for commit in commits:
+        for mode, objectHash, filePath in commit['files']:
+            entries[filePath] = (mode, objectHash)
 
-    pickedLog = libgit.logOneFile(filename, "{}..HEAD".format(lastHashBeforeRetrieval), outputFormat='%H %s')
-    pickedLog.reverse()
-
-    # we have a list of [ '%H %s' ], for instance [ 'e2...dfa v3: the reason of the change', ... ]
-    # we want only the versions message (=%s) part
-    pickedLogMessages = [ '    {}'.format(log.split(' ', 1)[1]) for log in pickedLog ]
-    LOGGER.info("Retrieved changes of %s:\n%s", filename, '\n'.join(pickedLogMessages))
-    # we want only the versions message (=%h) part of the last commit
-    lastHashAfterRetrieval = pickedLog[-1].split(' ', 1)[0]
-    return lastHashAfterRetrieval
+    for rev in revisionToRetrieve:
+        sourceCommit = libgit.readCommit(rev)
+        files = []
+        for change in changesByCommit[rev]:
+            before = None if change['status'] == 'A' else (change['oldMode'], change['oldHash'])
+            if entries.get(change['path']) != before:
+                # git would need to merge the contents, which never happens with opsconf histories
+                raise OpsconfFatalError("Cannot bring {} to {}: {} differs from the one in {}. Aborting."
+                                        .format(sourceCommit['message'].split('\n', 1)[0], targetBranch,
+                                                change['path'], sourceBranch))
+            if change['status'] == 'D':
+                entries[change['path']] = None
+                files.append((None, None, change['path']))
+            else:
+                entries[change['path']] = (change['newMode'], change['newHash'])
+                files.append((change['newMode'], change['newHash'], change['path']))
+        commits.append({'message': sourceCommit['message'],
+                        'author': "{} {}".format(sourceCommit['author'], sourceCommit['authorDate']),
+                        'files': files})
+
+    for commit in commits:
+        for mode, objectHash, filePath in commit['files']:
+            pending['entries'][filePath] = (mode, objectHash) if mode is not None else None
+    pending['versions'][path] = (version, sourceVersions[versionSourcePositions[-1]]['subject'])
+    return commits
 
 
 def cleanLocalChange(filename):
@@ -557,6 +970,9 @@ def cleanLocalChange(filename):
 def rollbackToVersion(filename, version, reason):
     """Rollback a file to a previous version.
 
+    The content of the version is committed as a new version, from the object database: the
+    working directory is not used to compute it.
+
     Args:
         filename (str): the file to rollback.
         version (int): the version to rollback to.
@@ -564,20 +980,113 @@ def rollbackToVersion(filename, version, reason):
 
     Raises:
         OpsconfFatalError: if the rollback is not possible, this exception is raised.
+
+    Returns:
+        int: the new version of the file.
     """
+    checkBranchIsWork()
+    checkBranchUpToDate()
     branch = libgit.getCurrentBranch()
     if not libgit.existFileInRevision(filename, branch):
         raise OpsconfFatalError("This is not a file, or is not available in the branch {}: {}".format(branch, filename))
-    revisionRange = getRevisionRange(filename, "HEAD")
-    versionHash = libgit.logLastOneFile(filename, revisionRange, pattern="^v{}: ".format(version), outputFormat='%H')
+    versionHashes = [commit['hash'] for commit in getFileHistory(filename, branch) if commit['version'] == version]
+    if not versionHashes:
+        raise OpsconfFatalError("Version {} not found in history for this file: {}".format(version, filename))
+
+    path = libgit.toRepositoryPath(filename)
+    entries = libgit.listTreeEntries(versionHashes[-1], [path])
+    if entries[path]['hash'] == libgit.listTreeEntries(branch, [path])[path]['hash']:
+        raise OpsconfFatalError("Nothing to rollback, the file has the content of v{}: {}".format(version, filename))
+    message = "{}\n\nRolled-back to v{}".format(reason, version)
+    return _rollbackPaths(branch, [(path, entries[path]['mode'], entries[path]['hash'], message)])[0]
+
+
+def rollbackToTag(tag, filenames, reason):
+    """Rollback the files that changed since a tag to their version in the tag.
+
+    The changed files are found with a single comparison of the tag and the current branch. Each
+    file is committed as a new version, as `rollbackToVersion()` does, and the branch is pushed once.
+    The files created or removed since the tag are left as they are.
+
+    Args:
+        tag (str): the tag to rollback to.
+        filenames (list of str): the files or directories to rollback. If empty, the current directory.
+        reason (str): the reason of the rollback.
+
+    Raises:
+        OpsconfFatalError: if the tag does not exist, or if the rollback is not possible, this exception is raised.
 
-    diff = libgit.diffOneFile(filename, fromRevision="HEAD", toRevision=versionHash)
+    Returns:
+        list of (str, int, int): the rolled-back files, the version they were rolled back to and their new version.
+    """
+    checkBranchIsWork()
+    checkBranchUpToDate()
+    branch = libgit.getCurrentBranch()
     try:
-        libgit.applyDiff(diff)
+        tagCommit = libgit.resolveRevision('refs/tags/{}'.format(tag))
     except libgit.GitError:
-        libgit.bringFileFromRevision(filename, 'HEAD')
-        raise OpsconfFatalError("Rollback failed. Aborting.")
-    libgit.commitOneFile(filename, message="{}\n\nRolled-back to v{}".format(reason, version))
+        raise OpsconfFatalError("Tag not found: {}".format(tag))
+
+    prefix = libgit.getPathPrefix()
+    paths = [libgit.toRepositoryPath(filename, prefix) for filename in filenames or ['.']]
+    changes = libgit.diffTrees(tagCommit, branch, paths)
+    changedPaths = [change['path'] for change in changes if change['status'] in ['M', 'T']]
+    tagLastCommits = _getLastCommitsByPath(getHistoryIndex(), 'refs/tags/{}'.format(tag), changedPaths)
+
+    gitRoot = libgit.getGitRoot()
+    rollbacks = []
+    rolledBackFiles = []
+    for change in changes:
+        filename = os.path.relpath(os.path.join(gitRoot, change['path']))
+        if change['status'] == 'A':
+            LOGGER.warning("Not rolled back, the file was created after the tag %s: %s", tag, filename)
+            continue
+        if change['status'] == 'D':
+            LOGGER.warning("Not rolled back, the file was removed after the tag %s: %s", tag, filename)
+            continue
+        version = getVersionFromCommitMsg(tagLastCommits[change['path']]['subject'])
+        if version is None:
+            LOGGER.warning("Not rolled back, the file has no version in the tag %s: %s", tag, filename)
+            continue
+        rollbacks.append((change['path'], change['oldMode'], change['oldHash'],
+                          "{}\n\nRolled-back to v{} of tag {}".format(reason, version, tag)))
+        rolledBackFiles.append((filename, version))
+    if not rollbacks:
+        return []
+
+    newVersions = _rollbackPaths(branch, rollbacks)
+    return [(filename, version, newVersion) for (filename, version), newVersion in zip(rolledBackFiles, newVersions)]
+
+
+def _rollbackPaths(branch, rollbacks):
+    """Internal function to commit the rollback of several files, one commit per file, and push them at once.
+
+    Args:
+        branch (str): the current branch.
+        rollbacks (list of (str, str, str, str)): for each file, the path from the root of the repository,
+                                                  the mode and the hash of the content to commit, and the
+                                                  commit message without the version.
+
+    Raises:
+        OpsconfFatalError: if a file has local changes or if the push fails, this exception is raised
+                           and nothing is changed.
+
+    Returns:
+        list of int: the new version of each file.
+    """
+    tip = libgit.resolveRevision(branch)
+    lastCommits = _getLastCommitsByPath(getHistoryIndex(), tip, [path for path, _, _, _ in rollbacks])
+    commits = []
+    newVersions = []
+    for path, mode, objectHash, message in rollbacks:
+        lastCommit = lastCommits.get(path)
+        previousVersion = None if lastCommit is None else getVersionFromCommitMsg(lastCommit['subject'])
+        newVersion = (previousVersion or 0) + 1
+        commits.append({'message': libgit.cleanupMessage("v{}: {}".format(newVersion, message)),
+                        'files': [(mode, objectHash, path)]})
+        newVersions.append(newVersion)
+    _publishCommits(branch, commits, 'rolled back')
+    return newVersions
 
 
 def listAvailaibleVersions(branch, filename):
@@ -595,38 +1104,114 @@ def listAvailaibleVersions(branch, filename):
     """
     if not libgit.existFileInRevision(filename, branch):
         raise OpsconfFatalError("This is not a file, or is not available in the branch {}: {}".format(branch, filename))
-    revisionRange = getRevisionRange(filename, branch)
-    hashSubjects = libgit.logOneFile(filename, revisionRange, pattern=OPSCONF_PREFIX_PATTERN, outputFormat="%H,%s")
+    # from the last version to the first one
+    versionCommits = [commit for commit in reversed(getFileHistory(filename, branch)) if commit['version'] is not None]
+
+    tagsByHash = _getTagsByVersionHash(filename, versionCommits)
 
     versionList = []
+    for commit in versionCommits:
+        versionList.append({
+            'version': commit['version'],
+            'subject': getSubjectFromCommitMsg(commit['subject']),
+            'tags': tagsByHash.get(commit['hash'], [])
+        })
+    return versionList
 
-    # get the commit hashes of the file version at all
-    hashTagDict = {}
-    for tag in libgit.listTags():
-        try:
-            hashTagDict[tag] = libgit.logLastOneFile(filename, tag, outputFormat="%H")
-        except libgit.GitNoLogError:
-        # the file did not exist at the time
-            continue
 
-    # For all hashlog from rawLogs (hash,log), we get the hash
-    for item in hashSubjects:
-        commitHash, message = item.split(',', maxsplit=1)
+def listFollowedVersions(branch, filename):
+    """List all the versions of a file in a given branch, then the versions of the files it was moved from.
 
-        versionLine = {
-            'version': getVersionFromCommitMsg(message),
-            'subject': getSubjectFromCommitMsg(message)
-        }
+    Args:
+        branch (str): the branch where to search the versions.
+        filename (str): the file of interest.
+
+    Raises:
+        OpsconfFatalError: if the file does not exist in the branch, this exception is raised.
+
+    Returns:
+        list of dict: the versions, from the last one to the first one of the oldest source, as:
+                      {'file': <str>, 'version': <int>, 'subject': <str>, 'tags': <list of str>}.
+    """
+    if not libgit.existFileInRevision(filename, branch):
+        raise OpsconfFatalError("This is not a file, or is not available in the branch {}: {}".format(branch, filename))
 
-        tagList = []
-        for tag, tagHash in hashTagDict.items():
-            if tagHash == commitHash:
-                tagList.append(tag)
-        versionLine['tags'] = tagList
-        versionList.append(versionLine)
+    gitRoot = libgit.getGitRoot()
+    versionList = []
+    revision = branch
+    path = libgit.toRepositoryPath(filename)
+    while path is not None:
+        absolutePath = os.path.join(gitRoot, path)
+        history = getFileHistory(absolutePath, revision)
+        versionCommits = [commit for commit in reversed(history) if commit['version'] is not None]
+        tagsByHash = _getTagsByVersionHash(absolutePath, versionCommits)
+        for commit in versionCommits:
+            versionList.append({
+                'file': os.path.relpath(absolutePath),
+                'version': commit['version'],
+                'subject': getSubjectFromCommitMsg(commit['subject']),
+                'tags': tagsByHash.get(commit['hash'], [])
+            })
+        if not history:
+            break
+        # the source still exists in the commit that created its destination
+        revision = history[0]['hash']
+        path = getMovedFromPath(libgit.readCommit(revision)['message'])
     return versionList
 
 
+def _getTagsByVersionHash(filename, versionCommits):
+    """Internal function to find which tags contain which version of a file.
+
+    A tag contains a version if the last commit that changed the file before the tag is the one
+    of the version. The tags that are part of an indexed branch are resolved from the history index.
+    For the other ones, the file is looked up in all the tags at once, and only the tags where the
+    file has the content of a version need to be checked with git.
+
+    Args:
+        filename (str): the file of interest.
+        versionCommits (list of dict): the commits of the versions, as returned by `getFileHistory()`.
+
+    Returns:
+        dict: the tags, sorted by name, of each version commit as {<hash>: <list of str>}.
+    """
+    index = getHistoryIndex()
+    path = libgit.toRepositoryPath(filename)
+    versionHashes = set(commit['hash'] for commit in versionCommits)
+    tagsByHash = {}
+
+    unindexedTags = []
+    for tag, tagCommitHash in sorted(index.getTags().items()):
+        location = index.locateCommit(tagCommitHash)
+        if location is None:
+            unindexedTags.append(tag)
+            continue
+        tagHistory = index.getFileHistory(location[0], path, location[1])
+        if tagHistory and tagHistory[-1]['hash'] in versionHashes:
+            tagsByHash.setdefault(tagHistory[-1]['hash'], []).append(tag)
+
+    if unindexedTags:
+        # the same commit means the same content: compare the file in the tags and in the versions
+        versionBlobs = libgit.getObjectsInfo('{}:{}'.format(commitHash, path) for commitHash in versionHashes)
+        versionBlobHashes = set(blob['hash'] for blob in versionBlobs if blob is not None)
+        tagBlobs = libgit.getObjectsInfo('refs/tags/{}:{}'.format(tag, path) for tag in unindexedTags)
+        candidateTags = [tag for tag, tagBlob in zip(unindexedTags, tagBlobs)
+                         if tagBlob is not None and tagBlob['hash'] in versionBlobHashes]
+        if candidateTags:
+            # the tags are independent: their logs are run concurrently
+            # asyncio is only imported when needed, it is slow to import
+            from .libgit import aio  # pylint: disable=import-outside-toplevel
+            tagHashes = aio.runAll(aio.logLastOneFile(filename, 'refs/tags/{}'.format(tag), outputFormat="%H")
+                                   for tag in candidateTags)
+            for tag, tagHash in zip(candidateTags, tagHashes):
+                if tagHash in versionHashes:
+                    tagsByHash.setdefault(tagHash, []).append(tag)
+
+    for tags in tagsByHash.values():
+        tags.sort()
+    return tagsByHash
+
+
 def listAllVersions(filename):
     """List the versions of a file in the branch WORK.
 
@@ -659,6 +1244,52 @@ def listCurrentVersions(filename):
     return listAvailaibleVersions(branch, filename)
 
 
+def checkFileVersions(fileVersions, branch=OPSCONF_BRANCH_WORK):
+    """Check that versions of files exist in a branch, without changing anything.
+
+    The files are looked up in the branch all at once, and their last versions are read from the
+    history index when the branch is indexed.
+
+    Args:
+        fileVersions (list of (str, int)): the files and the versions to check.
+        branch (str, optional): the branch where to search the versions. Defaults to OPSCONF_BRANCH_WORK.
+
+    Returns:
+        list of dict: the result of each check, in the same order, as
+                      {
+                          'file': <str>,  # the path of the file
+                          'version': <int>,  # the checked version
+                          'lastVersion': <int>,  # the last version of the file in the branch, None if not found
+                          'error': <str>  # why the version is not available, None if it is
+                      }.
+    """
+    filenames = [filename for filename, _ in fileVersions]
+    prefix = libgit.getPathPrefix()
+    paths = {filename: libgit.toRepositoryPath(filename, prefix) for filename in filenames}
+    existing = dict(zip(filenames, libgit.existFilesInRevision(filenames, branch)))
+    lastCommits = _getLastCommitsByPath(getHistoryIndex(), branch,
+                                        set(paths[filename] for filename in filenames if existing[filename]))
+
+    results = []
+    for filename, version in fileVersions:
+        lastVersion = None
+        if existing[filename] and paths[filename] in lastCommits:
+            lastVersion = getVersionFromCommitMsg(lastCommits[paths[filename]]['subject'])
+            if lastVersion is None:
+                # the last commit is not a version (e.g. a merge): search the history of the file
+                versions = listAvailaibleVersions(branch, filename)
+                lastVersion = versions[0]['version'] if versions else None
+
+        if not existing[filename] or lastVersion is None:
+            error = "{} not found in {}".format(filename, branch)
+        elif lastVersion < version:
+            error = "v{} of {} not found in {} (max version=v{})".format(version, filename, branch, lastVersion)
+        else:
+            error = None
+        results.append({'file': filename, 'version': version, 'lastVersion': lastVersion, 'error': error})
+    return results
+
+
 def showCurrentVersions(revision, withNotes=False):
     """Show the last versions of all the files in a revision.
 
@@ -677,58 +1308,144 @@ def showCurrentVersions(revision, withNotes=False):
                             'notes': <list of str>  # The list of notes associated to the version
                         }.
     """
-    changedFileList = libgit.listChangedFiles()
-    fileList = libgit.listAllFilesInRevision(revision)
-    fileVersionList = []
-    for filename in sorted(fileList):
-        if filename == ".opsconf":
-            continue
+    return list(iterCurrentVersions(revision, withNotes))
 
-        lastCommitHashAndMsg = libgit.logLastOneFile(filename, revision, outputFormat='%H %s')
-        lastCommitHash, lastCommitMsg = lastCommitHashAndMsg.split(' ', 1)
-        lastVersion = getVersionFromCommitMsg(lastCommitMsg)
 
-        lastCommitMsgInWork = libgit.logLastOneFile(filename, OPSCONF_BRANCH_WORK, outputFormat='%s')
-        lastVersionInWork = getVersionFromCommitMsg(lastCommitMsgInWork)
+def _getNotesCachePath(topic):
+    """Internal function to get the path of the file where the notes of a topic are cached.
 
-        if withNotes:
-            notes = libgit.getNotesFromCommit(lastCommitHash, topic=OPSCONF_PROMOTION_NOTE_TOPIC)
-        else:
-            notes = []
+    Args:
+        topic (str): the notes topic (refs/notes/{topic}).
 
-        fileVersion = {
-            'file': filename,
-            'version': lastVersion,
-            'removed': False,
-            'newer': False,
-            'changed': False,
-            'notes': notes
-        }
-        if filename in changedFileList:
-            changedFileList.remove(filename)
-            fileVersion['changed'] = True
-
-        if lastVersionInWork is None:
-            fileVersion['removed'] = True
-        elif lastVersion != lastVersionInWork:
-            fileVersion['newer'] = True
-        else:
-            pass
+    Returns:
+        str: the absolute path of the file.
+    """
+    return os.path.join(os.path.abspath(libgit.getGitDir()), OPSCONF_STATE_DIR, OPSCONF_NOTES_CACHE.format(topic))
 
-        fileVersionList.append(fileVersion)
-    # The remaining files are the ones that were never committed in this branch
-    for filename in changedFileList:
-        fileVersionList.append(
-            {
+
+def getNotesByCommit(topic=OPSCONF_PROMOTION_NOTE_TOPIC):
+    """Get the notes of all the commits, as `libgit.getNotesFromCommit()` gives them.
+
+    The notes are read all at once, and cached on the disk with the commit of the notes reference:
+    as long as the notes do not change, they are read from the cache.
+
+    Args:
+        topic (str, optional): the notes topic (refs/notes/{topic}). Defaults to OPSCONF_PROMOTION_NOTE_TOPIC.
+
+    Returns:
+        dict: the notes of each commit that has some, as {<commit hash>: <list of str>}.
+    """
+    try:
+        notesCommit = libgit.resolveRevision('refs/notes/{}'.format(topic))
+    except libgit.GitError:
+        return {}
+
+    cachePath = _getNotesCachePath(topic)
+    try:
+        with open(cachePath, 'r') as f:
+            cache = json.load(f)
+        if cache['commit'] == notesCommit:
+            return cache['notes']
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        LOGGER.debug("Cannot read the notes cache: %s", e)
+
+    notes = {commitHash: note.rstrip().split('\n\n') for commitHash, note in libgit.getAllNotes(topic).items()}
+    tmpPath = "{}.{}.tmp".format(cachePath, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(cachePath), exist_ok=True)
+        with open(tmpPath, 'w') as f:
+            json.dump({'commit': notesCommit, 'notes': notes}, f, separators=(',', ':'))
+        os.replace(tmpPath, cachePath)
+    except OSError as e:
+        # the cache is only an accelerator
+        LOGGER.warning("Cannot write the notes cache %s: %s", cachePath, e)
+    return notes
+
+
+def iterCurrentVersions(revision, withNotes=False, chunkSize=256):
+    """Iterate over the last versions of all the files in a revision, chunk by chunk.
+
+    The list of the files is read first. If the revision and the WORK branch are in the history index,
+    the last commits are then looked up one chunk at a time, so that the first versions are given before
+    the last ones are looked up. A branch out of the index is walked once for all the files, before the
+    first version is given: walking it once per chunk would read its history several times. In any case,
+    the versions already given are not kept in memory.
+
+    Args:
+        revision (str): a revision (commit, branch, tag).
+        withNotes (bool): whether to attach the 'git notes' with them. Defaults to False.
+        chunkSize (int, optional): the number of files resolved at once. Defaults to 256.
+
+    Yields:
+        dict: each line, sorted by file, as described in `showCurrentVersions()`.
+    """
+    changedFileList = libgit.listChangedFiles()
+    changedFileSet = set(changedFileList)
+    fileList = sorted(filename for filename in libgit.listAllFilesInRevision(revision) if filename != ".opsconf")
+
+    prefix = libgit.getPathPrefix()
+    index = getHistoryIndex()
+    # a revision out of the index is walked once for all the files, instead of once per chunk
+    allLastCommits = {}
+    for branch in [revision, OPSCONF_BRANCH_WORK]:
+        if _locateRevision(index, branch) is None:
+            allLastCommits[branch] = _getLastCommitsByPath(
+                index, branch, [libgit.toRepositoryPath(filename, prefix) for filename in fileList])
+    notesByCommit = getNotesByCommit(OPSCONF_PROMOTION_NOTE_TOPIC) if withNotes else {}
+
+    for start in range(0, len(fileList), chunkSize):
+        chunk = fileList[start:start + chunkSize]
+        paths = {filename: libgit.toRepositoryPath(filename, prefix) for filename in chunk}
+        lastCommits, lastCommitsInWork = [
+            allLastCommits[branch] if branch in allLastCommits else _getLastCommitsByPath(index, branch, paths.values())
+            for branch in [revision, OPSCONF_BRANCH_WORK]]
+
+        for filename in chunk:
+            path = paths[filename]
+            if path not in lastCommits:
+                raise libgit.GitNoLogError("No log was found for {} in {}".format(filename, revision))
+            if path not in lastCommitsInWork:
+                raise libgit.GitNoLogError("No log was found for {} in {}".format(filename, OPSCONF_BRANCH_WORK))
+            lastCommitHash = lastCommits[path]['hash']
+            lastVersion = getVersionFromCommitMsg(lastCommits[path]['subject'])
+            lastVersionInWork = getVersionFromCommitMsg(lastCommitsInWork[path]['subject'])
+
+            if withNotes:
+                # a commit without note has an empty one, as `libgit.getNotesFromCommit()` gives
+                notes = notesByCommit.get(lastCommitHash, [''])
+            else:
+                notes = []
+
+            fileVersion = {
                 'file': filename,
-                'version': 0,
+                'version': lastVersion,
                 'removed': False,
                 'newer': False,
-                'changed': True,
-                'notes': []
-            })
-
-    return fileVersionList
+                'changed': False,
+                'notes': notes
+            }
+            if filename in changedFileSet:
+                changedFileSet.remove(filename)
+                fileVersion['changed'] = True
+
+            if lastVersionInWork is None:
+                fileVersion['removed'] = True
+            elif lastVersion != lastVersionInWork:
+                fileVersion['newer'] = True
+            else:
+                pass
+
+            yield fileVersion
+    # The remaining files are the ones that were never committed in this branch
+    for filename in [filename for filename in changedFileList if filename in changedFileSet]:
+        yield {
+            'file': filename,
+            'version': 0,
+            'removed': False,
+            'newer': False,
+            'changed': True,
+            'notes': []
+        }
 
 
 def removeFile(filename, reason):
@@ -744,15 +1461,149 @@ def removeFile(filename, reason):
     Raises:
         OpsconfFatalError: if the file cannot be found in the current branch, this exception is raised.
     """
+    removeFiles([filename], reason)
+
+
+def removeFiles(filenames, reason):
+    """Remove several files from the repository, with one commit per file and a single push.
+
+    The branch is checked once, all the files are checked against a single listing of its tree,
+    and the commits are created at once: either all the files are removed, or nothing is changed.
+
+    Args:
+        filenames (list of str): the paths of the files to remove, in the order of the commits.
+        reason (str): the reason of the deletion.
+
+    Raises:
+        OpsconfFatalError: if one of the files cannot be found in the current branch, if one of them
+                           has local changes or if the push fails, this exception is raised.
+    """
     checkBranchUpToDate()
     branch = libgit.getCurrentBranch()
-    if not libgit.existFileInRevision(filename, branch):
-        raise OpsconfFatalError("File not found in the branch {}: {}".format(branch, filename))
+    for filename, exists in zip(filenames, libgit.existFilesInRevision(filenames, branch)):
+        if not exists:
+            raise OpsconfFatalError("File not found in the branch {}: {}".format(branch, filename))
+    if not filenames:
+        return
+
+    prefix = libgit.getPathPrefix()
+    message = libgit.cleanupMessage("{}{}".format(OPSCONF_PREFIX_REMOVED, reason))
+    commits = [{'message': message, 'files': [(None, None, libgit.toRepositoryPath(filename, prefix))]}
+               for filename in filenames]
+    _publishCommits(branch, commits, 'removed')
+
 
-    libgit.removeOneFile(filename)
-    os.environ['OPSCONF_BYPASS_CHECK'] = 'yes'
-    libgit.commitOneFile(filename, message="{}{}".format(OPSCONF_PREFIX_REMOVED, reason))
-    del os.environ['OPSCONF_BYPASS_CHECK']
+def moveFiles(moves, reason):
+    """Move several files in the repository, keeping the link to their history, with a single push.
+
+    Each file is moved with two commits: the first version of the destination, with the trailer
+    OPSCONF_TRAILER_MOVED_FROM giving the source, then the removal of the source, with the trailer
+    OPSCONF_TRAILER_MOVED_TO. The content is taken from the branch: either all the files are moved,
+    or nothing is changed.
+
+    Args:
+        moves (list of (str, str)): the source and destination paths of the files, in the order of the commits.
+        reason (str): the reason of the move.
+
+    Raises:
+        OpsconfFatalError: if the function is not called from WORK, if a source cannot be found in the branch,
+                           if a destination already exists, if a source has local changes or if the push fails,
+                           this exception is raised.
+
+    Returns:
+        list of (str, int): the destinations and their new versions.
+    """
+    if reason.split('\n', maxsplit=1)[0].strip() == "":
+        raise OpsconfFatalError("Empty commit. Aborting")
+    checkBranchIsWork()
+    checkBranchUpToDate()
+    branch = libgit.getCurrentBranch()
+    sources = [source for source, _ in moves]
+    destinations = [destination for _, destination in moves]
+    for source, exists in zip(sources, libgit.existFilesInRevision(sources, branch)):
+        if not exists:
+            raise OpsconfFatalError("File not found in the branch {}: {}".format(branch, source))
+    for destination, exists in zip(destinations, libgit.existFilesInRevision(destinations, branch)):
+        if exists or os.path.lexists(destination):
+            raise OpsconfFatalError("The destination already exists: {}".format(destination))
+    if not moves:
+        return []
+
+    prefix = libgit.getPathPrefix()
+    sourcePaths = [libgit.toRepositoryPath(source, prefix) for source in sources]
+    destinationPaths = [libgit.toRepositoryPath(destination, prefix) for destination in destinations]
+    if len(set(destinationPaths)) != len(destinationPaths):
+        raise OpsconfFatalError("Several files would be moved to the same destination. Aborting")
+    tip = libgit.resolveRevision(branch)
+    entries = libgit.listTreeEntries(tip, sourcePaths)
+    lastCommits = _getLastCommitsByPath(getHistoryIndex(), tip, destinationPaths)
+
+    commits = []
+    movedFiles = []
+    for destination, sourcePath, destinationPath in zip(destinations, sourcePaths, destinationPaths):
+        lastCommit = lastCommits.get(destinationPath)
+        previousVersion = None if lastCommit is None else getVersionFromCommitMsg(lastCommit['subject'])
+        version = (previousVersion or 0) + 1
+        entry = entries[sourcePath]
+        commits.append({'message': libgit.cleanupMessage("v{}: {}\n\n{}: {}".format(
+                            version, reason, OPSCONF_TRAILER_MOVED_FROM, sourcePath)),
+                        'files': [(entry['mode'], entry['hash'], destinationPath)]})
+        commits.append({'message': libgit.cleanupMessage("{}{}\n\n{}: {}".format(
+                            OPSCONF_PREFIX_REMOVED, reason, OPSCONF_TRAILER_MOVED_TO, destinationPath)),
+                        'files': [(None, None, sourcePath)]})
+        movedFiles.append((destination, version))
+    _publishCommits(branch, commits, 'moved')
+    return movedFiles
+
+
+def _publishCommits(branch, commits, action):
+    """Internal function to add commits on top of the current branch, and push them.
+
+    The commits are built at once, then the index and the working directory are updated, the branch
+    is moved and pushed. If the push fails, the branch and the working directory are restored.
+
+    Args:
+        branch (str): the current branch.
+        commits (list of dict): the commits, from the oldest to the newest (see `libgit.buildCommits()`).
+        action (str): what the commits do, for the error messages ('removed', 'moved').
+
+    Raises:
+        OpsconfFatalError: if a file of the commits has local changes or if the push fails, this exception
+                           is raised and nothing is changed.
+    """
+    tip = libgit.resolveRevision(branch)
+    newTip = libgit.buildCommits(tip, commits)[-1]
+    try:
+        libgit.moveWorkTree(tip, newTip)
+    except libgit.GitError as e:
+        raise OpsconfFatalError("Cannot change the files of the branch {}, nothing was {}: {}".format(branch, action, e))
+    branchRef = 'refs/heads/{}'.format(branch)
+    libgit.updateRefs([(branchRef, newTip, tip)])
+    try:
+        libgit.pushRefs([branchRef])
+    except libgit.GitError as e:
+        libgit.updateRefs([(branchRef, tip, newTip)])
+        libgit.moveWorkTree(newTip, tip)
+        raise OpsconfFatalError("The push of {} failed, nothing was {}: {}".format(branch, action, e))
+
+
+def getMovedFromPath(message):
+    """Get the path a file was moved from, as given by the trailer OPSCONF_TRAILER_MOVED_FROM of a commit message.
+
+    Args:
+        message (str): the commit message.
+
+    Returns:
+        str or None: the path, from the root of the repository. None if the commit does not come from a move.
+    """
+    prefix = "{}: ".format(OPSCONF_TRAILER_MOVED_FROM)
+    for line in reversed(message.rstrip('\n').split('\n')):
+        if line.startswith(prefix):
+            return line[len(prefix):]
+        if not line.strip():
+            # the trailers are in the last paragraph only
+            break
+    return None
 
 
 def diffBetweenVersions(filename, version1=None, version2=None):
@@ -771,14 +1622,14 @@ def diffBetweenVersions(filename, version1=None, version2=None):
     """
     if version1 is not None:
         try:
-            h1 = libgit.logLastOneFile(filename, 'HEAD', pattern="^v{}: ".format(version1), outputFormat="%H")
+            h1 = getVersionHash(filename, version1, 'HEAD')
         except libgit.GitNoLogError:
             raise OpsconfFatalError("Version {} not found in history for this file: {}".format(version1, filename))
     else:
         h1 = libgit.getLocalBranchTip()  # must be 'HEAD' because the file might not yet exist in the history.
     if version2 is not None:
         try:
-            h2 = libgit.logLastOneFile(filename, 'HEAD', pattern="^v{}: ".format(version2), outputFormat="%H")
+            h2 = getVersionHash(filename, version2, 'HEAD')
         except libgit.GitNoLogError:
             raise OpsconfFatalError("Version {} not found in history for this file: {}".format(version2, filename))
     else:
@@ -797,10 +1648,229 @@ def diffBetweenVersions(filename, version1=None, version2=None):
     return libgit.diffOneFile(filename, h1, h2, withColors=withColors)
 
 
+def diffStates(oldRevision, newRevision, filenames=None):
+    """Compare the versions of the files between two states of the repository (branches, tags, commits).
+
+    The changed files are found with a single comparison of the revisions, and only their versions
+    are resolved.
+
+    Args:
+        oldRevision (str): the state used as reference.
+        newRevision (str): the state containing the changes.
+        filenames (list of str, optional): the files or directories to compare. Defaults to None: the
+                                           current directory.
+
+    Raises:
+        OpsconfFatalError: if one of the states does not exist, this exception is raised.
+
+    Returns:
+        list of dict: the changed files, sorted by file, as
+                      {
+                          'file': <str>,  # the path of the file
+                          'status': <str>,  # 'added', 'removed' or 'changed'
+                          'oldVersion': <int or None>,  # the version in the old state, None if added
+                          'newVersion': <int or None>  # the version in the new state, None if removed
+                      }.
+    """
+    for revision in [oldRevision, newRevision]:
+        try:
+            libgit.resolveRevision(revision)
+        except libgit.GitError:
+            raise OpsconfFatalError("Unknown branch or tag: {}".format(revision))
+
+    prefix = libgit.getPathPrefix()
+    paths = [libgit.toRepositoryPath(filename, prefix) for filename in filenames or ['.']]
+    changes = [change for change in libgit.diffTrees(oldRevision, newRevision, paths) if change['path'] != ".opsconf"]
+    index = getHistoryIndex()
+    oldLastCommits = _getLastCommitsByPath(index, oldRevision,
+                                           [change['path'] for change in changes if change['status'] != 'A'])
+    newLastCommits = _getLastCommitsByPath(index, newRevision,
+                                           [change['path'] for change in changes if change['status'] != 'D'])
+
+    gitRoot = libgit.getGitRoot()
+    statuses = {'A': 'added', 'D': 'removed'}
+    fileStates = []
+    for change in changes:
+        oldCommit = oldLastCommits.get(change['path'])
+        newCommit = newLastCommits.get(change['path'])
+        fileStates.append({
+            'file': os.path.relpath(os.path.join(gitRoot, change['path'])),
+            'status': statuses.get(change['status'], 'changed'),
+            'oldVersion': None if oldCommit is None else getVersionFromCommitMsg(oldCommit['subject']),
+            'newVersion': None if newCommit is None else getVersionFromCommitMsg(newCommit['subject'])
+        })
+    return fileStates
+
+
+def diffStatesPatch(oldRevision, newRevision, filenames=None):
+    """Get the diff of all the files changed between two states of the repository, with a single command.
+
+    Args:
+        oldRevision (str): the state used as reference.
+        newRevision (str): the state containing the changes.
+        filenames (list of str, optional): the files or directories to compare. Defaults to None: the
+                                           current directory.
+
+    Returns:
+        str: the diff (patch-like text).
+    """
+    prefix = libgit.getPathPrefix()
+    paths = [libgit.toRepositoryPath(filename, prefix) for filename in filenames or ['.']]
+    return libgit.diffRevisions(oldRevision, newRevision, paths, withColors=os.isatty(1))
+
+
+def listStates():
+    """List the states of the repository: the opsconf branches and the tags.
+
+    All the references are read with a single command, and all the states are compared to the
+    validation branch with a single other one.
+
+    Raises:
+        OpsconfFatalError: if the validation branch does not exist, this exception is raised.
+
+    Returns:
+        list of dict: the branches, then the tags sorted by name, as
+                      {
+                          'state': <str>,  # the name of the branch or tag
+                          'type': <str>,  # 'branch' or 'tag'
+                          'commit': <str>,  # the hash of the commit
+                          'date': <str>,  # the date of the commit (ISO 8601)
+                          'tagger': <str>,  # the author of the tag, empty for a branch or a lightweight tag
+                          'message': <str>,  # the subject of the tag, or of the commit
+                          'changedFiles': <int>  # the number of files that differ from the validation branch
+                      }.
+    """
+    branches = [OPSCONF_BRANCH_WORK, OPSCONF_BRANCH_QUALIF, OPSCONF_BRANCH_VALID]
+    refs = {ref['refname']: ref for ref in libgit.listRefsDetails(
+        ['refs/heads/{}'.format(branch) for branch in branches]
+        + ['refs/remotes/origin/{}'.format(branch) for branch in branches] + ['refs/tags'])}
+
+    states = []
+    for branch in branches:
+        # a branch that was never checked out only exists as a remote branch
+        ref = refs.get('refs/heads/{}'.format(branch)) or refs.get('refs/remotes/origin/{}'.format(branch))
+        if ref is not None:
+            states.append(dict(ref, state=branch, type='branch', tagger=''))
+    states += [dict(ref, state=refname[len('refs/tags/'):], type='tag')
+               for refname, ref in sorted(refs.items()) if refname.startswith('refs/tags/')]
+
+    masterTree = next((state['tree'] for state in states if state['state'] == OPSCONF_BRANCH_VALID
+                       and state['type'] == 'branch'), None)
+    if masterTree is None:
+        raise OpsconfFatalError("The branch '{}' does not exist".format(OPSCONF_BRANCH_VALID))
+    counts = libgit.countTreesChanges(masterTree, [state['tree'] for state in states])
+    return [{
+        'state': state['state'],
+        'type': state['type'],
+        'commit': state['commit'],
+        'date': state['date'],
+        'tagger': state['tagger'],
+        'message': state['subject'],
+        'changedFiles': counts[state['tree']]
+    } for state in states]
+
+
+def createTag(tag, message):
+    """Tag the current state of the repository, with the manifest of the versions of its files.
+
+    The manifest is a blob giving the version and the commit of each file of the tagged commit,
+    referenced by OPSCONF_MANIFEST_REFS/<tag>: the versions of the tag are then read without walking
+    the history. The tag and its manifest are pushed together.
+
+    Args:
+        tag (str): the name of the tag.
+        message (str): the message of the tag.
+
+    Raises:
+        OpsconfFatalError: if the push fails, this exception is raised and nothing is tagged.
+    """
+    commitHash = libgit.resolveRevision('HEAD')
+    blobHash = libgit.writeBlob(_buildTagManifest(commitHash))
+    libgit.setTag(tag, message)
+
+    tagRef = 'refs/tags/{}'.format(tag)
+    manifestRef = '{}/{}'.format(OPSCONF_MANIFEST_REFS, tag)
+    # a manifest left by a deleted tag is replaced
+    oldManifest = libgit.getObjectInfo(manifestRef)
+    oldManifestHash = None if oldManifest is None else oldManifest['hash']
+    libgit.updateRefs([(manifestRef, blobHash, oldManifestHash)])
+    try:
+        libgit.pushRefs([tagRef, '+{}'.format(manifestRef)])
+    except libgit.GitError as e:
+        libgit.updateRefs([(tagRef, None, libgit.getObjectInfo(tagRef)['hash']),
+                           (manifestRef, oldManifestHash, blobHash)])
+        raise OpsconfFatalError("The push of the tag {} failed, nothing was tagged: {}".format(tag, e))
+
+
+def _buildTagManifest(commitHash):
+    """Internal function to build the manifest of the versions of the files of a commit.
+
+    The manifest is a header line with the commit, then one line per file with a version,
+    sorted by path: '<version>\\t<commit hash>\\t<path>'.
+
+    Args:
+        commitHash (str): the hash of the commit.
+
+    Returns:
+        bytes: the content of the manifest.
+    """
+    paths = sorted(path for path in libgit.listTreeEntries(commitHash, None) if path != ".opsconf")
+    lastCommits = _getLastCommitsByPath(getHistoryIndex(), commitHash, paths)
+    lines = ['{} {}\n'.format(OPSCONF_MANIFEST_HEADER, commitHash)]
+    for path in paths:
+        commit = lastCommits.get(path)
+        version = None if commit is None else getVersionFromCommitMsg(commit['subject'])
+        # the files without a version, or whose path cannot fit on a line, are left to the history
+        if version is not None and '\n' not in path:
+            lines.append('{}\t{}\t{}\n'.format(version, commit['hash'], path))
+    return ''.join(lines).encode('utf-8')
+
+
+def getTagManifest(tag):
+    """Get the versions of the files of a tag from its manifest, without walking the history.
+
+    Args:
+        tag (str): the name of the tag, or its reference ('refs/tags/<tag>').
+
+    Returns:
+        dict or None: the version and the commit of each file with a version, as
+                      {<path>: {'version': <int>, 'hash': <str>}}. None if the tag has no manifest, or
+                      if the manifest was not built for the commit of the tag.
+    """
+    if tag.startswith('refs/tags/'):
+        tag = tag[len('refs/tags/'):]
+    if '\n' in tag:
+        return None
+    manifestInfo = libgit.getObjectInfo('{}/{}'.format(OPSCONF_MANIFEST_REFS, tag))
+    if manifestInfo is None or manifestInfo['type'] != 'blob':
+        return None
+
+    if manifestInfo['hash'] not in _TAG_MANIFESTS:
+        lines = libgit.readObject(manifestInfo['hash'])['content'].decode('utf-8').split('\n')
+        manifest = {}
+        for line in lines[1:]:
+            if line:
+                version, commitHash, path = line.split('\t', 2)
+                manifest[path] = {'version': int(version), 'hash': commitHash}
+        _TAG_MANIFESTS[manifestInfo['hash']] = (lines[0], manifest)
+    header, manifest = _TAG_MANIFESTS[manifestInfo['hash']]
+
+    # a tag moved after its manifest was written is looked up in the history
+    try:
+        commitHash = libgit.resolveRevision('refs/tags/{}'.format(tag))
+    except libgit.GitError:
+        return None
+    if header != '{} {}'.format(OPSCONF_MANIFEST_HEADER, commitHash):
+        LOGGER.debug("The manifest of the tag %s does not match its commit", tag)
+        return None
+    return manifest
+
+
 def promoteVersion(targetBranch, filename, version=None, message=None):
     """Promote a version of a file to the target branch.
 
-    This function is used to 'qualify' or 'validate' a file version.
+    This function is used to 'qualify' or 'validate' a file version. It is a batch of one version
+    (see `promoteVersions()`).
 
     Args:
         targetBranch (str): the branch where to bring the version.
@@ -813,52 +1883,103 @@ def promoteVersion(targetBranch, filename, version=None, message=None):
         OpsconfFatalError: if the function is called from a branch different from targetBranch or WORK,
                            this exception is raised.
     """
-    # If version is not given, get the last version from the WORK branch
-    if version is None:
-        lastCommitMsg = libgit.logLastOneFile(filename, OPSCONF_BRANCH_WORK,
-                                              pattern=OPSCONF_PREFIX_PATTERN,
-                                              outputFormat="%s")
-        versionToPromote = getVersionFromCommitMsg(lastCommitMsg)
-    else:
-        versionToPromote = version
+    promoteVersions(targetBranch, [(filename, version)], message)
 
-    if not libgit.existFileInRevision(filename, OPSCONF_BRANCH_WORK):
-        raise OpsconfFatalError("{} does not exist in the current branch '{}' or is not a file".format(filename, targetBranch))
 
-    lastHashAfterRetrieval = None
-    if isCurrentBranchWork():
-        # if on the WORK branch, move to the target branch to retrieve the file
-        # then come back to the WORK branch
-        currentPath = os.getcwd()
-        currentBranch = OPSCONF_BRANCH_WORK
+def promoteVersions(targetBranch, fileVersions, message=None):
+    """Promote a batch of file versions to the target branch, in a single transaction.
 
-        LOGGER.debug("We are in branch %s", currentBranch)
-        filePath = os.path.join(currentPath, filename)
-        gitRootDir = libgit.getGitRoot()
+    All the versions are resolved first, then the commits of all of them and their notes are
+    created at once, and the target branch and the promotion notes are pushed together:
+    either the whole batch is promoted, or nothing is changed.
 
-        if filePath.startswith(gitRootDir):
-            filePath.replace(gitRootDir, '', 1)
+    Args:
+        targetBranch (str): the branch where to bring the versions.
+        fileVersions (list of (str, int)): the files and the versions to promote, in order. A version
+                                           None stands for the last version of the file in the WORK branch.
+        message (str, optional): a message to attach to each version promotion. Defaults to None.
 
-        try:
-            # We first need to move the git root of the repository, in case it does not exist
-            # in the WORK branch
-            os.chdir(gitRootDir)
-            libgit.switchToRevision(targetBranch)
-            LOGGER.debug("We changed to branch %s", targetBranch)
-            lastHashAfterRetrieval = retrieveVersion(OPSCONF_BRANCH_WORK, filename, versionToPromote)
-        finally:
-            # Move back to where we were at the beginning
-            libgit.switchToRevision(currentBranch)
-            LOGGER.debug("We are back in branch %s", currentBranch)
-            os.chdir(currentPath)
-
-    elif libgit.getCurrentBranch() == targetBranch:
-        lastHashAfterRetrieval = retrieveVersion(OPSCONF_BRANCH_WORK, filename, versionToPromote)
-    else:
+    Raises:
+        OpsconfFatalError: if the function is called from a branch different from targetBranch or WORK,
+                           or if one of the versions cannot be promoted, this exception is raised.
+
+    Returns:
+        list of dict: the report of each version as
+                      {
+                          'file': <str>,  # the path of the file
+                          'version': <int>,  # the promoted version
+                          'commits': <int>,  # the number of commits brought to the target branch
+                          'duration': <float>  # the time spent resolving the version, in seconds
+                      }.
+    """
+    currentBranch = libgit.getCurrentBranch()
+    if currentBranch not in [OPSCONF_BRANCH_WORK, targetBranch]:
         raise OpsconfFatalError("This action can only be done on branch {} or {}. Currently on branch {}. Aborting."
-                                .format(OPSCONF_BRANCH_WORK, targetBranch, libgit.getCurrentBranch())
+                                .format(OPSCONF_BRANCH_WORK, targetBranch, currentBranch)
                                )
+    filenames = [filename for filename, _ in fileVersions]
+    for filename, exists in zip(filenames, libgit.existFilesInRevision(filenames, OPSCONF_BRANCH_WORK)):
+        if not exists:
+            raise OpsconfFatalError("{} does not exist in the branch '{}' or is not a file"
+                                    .format(filename, OPSCONF_BRANCH_WORK))
+    checkBranchInSync(targetBranch)
+
+    # resolve every version first, each one on top of the previous ones
+    pending = {'versions': {}, 'entries': {}}
+    commits = []
+    report = []
+    for filename, version in fileVersions:
+        startTime = time.time()
+        if version is None:
+            workVersions = [commit['version'] for commit in getFileHistory(filename, OPSCONF_BRANCH_WORK)
+                            if commit['version'] is not None]
+            if not workVersions:
+                raise OpsconfFatalError("{} has no version in the branch '{}'".format(filename, OPSCONF_BRANCH_WORK))
+            version = workVersions[-1]
+        versionCommits = _prepareRetrieval(OPSCONF_BRANCH_WORK, filename, version, targetBranch, pending) or []
+        commits.extend(versionCommits)
+        report.append({'file': filename, 'version': version, 'commits': len(versionCommits),
+                       'duration': time.time() - startTime})
+    if not commits:
+        return report
+
+    targetTip = libgit.resolveRevision(targetBranch)
+    hashes = libgit.buildCommits(targetTip, commits)
+    newTip = hashes[-1]
+    updates = [('refs/heads/{}'.format(targetBranch), newTip, targetTip)]
+    if message is not None:
+        # the note of a version goes to its last commit
+        notes = {}
+        lastCommitPosition = 0
+        for versionReport in report:
+            lastCommitPosition += versionReport['commits']
+            if versionReport['commits'] > 0:
+                notes[hashes[lastCommitPosition - 1]] = message
+        notesRef = 'refs/notes/{}'.format(OPSCONF_PROMOTION_NOTE_TOPIC)
+        try:
+            notesTip = libgit.resolveRevision(notesRef)
+        except libgit.GitError:
+            notesTip = None
+        updates.append((notesRef, libgit.buildNotesCommit(notesTip, notes), notesTip))
+
+    isTargetCheckedOut = libgit.isHeadABranch() and libgit.getCurrentBranch() == targetBranch
+    if isTargetCheckedOut:
+        libgit.moveWorkTree(targetTip, newTip)
+    libgit.updateRefs(updates)
+    try:
+        libgit.pushRefs([ref for ref, _, _ in updates])
+    except libgit.GitError as e:
+        libgit.updateRefs([(ref, oldValue, newValue) for ref, newValue, oldValue in updates])
+        if isTargetCheckedOut:
+            libgit.moveWorkTree(newTip, targetTip)
+        raise OpsconfFatalError("The push of {} failed, nothing was promoted: {}".format(targetBranch, e))
 
-    if lastHashAfterRetrieval is not None and message is not None:
-        libgit.addNoteToCommit(lastHashAfterRetrieval, message, topic=OPSCONF_PROMOTION_NOTE_TOPIC)
-        libgit.pushNotes(topic=OPSCONF_PROMOTION_NOTE_TOPIC)
+    # we want only the versions message (=%s) part
+    lastCommitPosition = 0
+    for versionReport in report:
+        versionCommits = commits[lastCommitPosition:lastCommitPosition + versionReport['commits']]
+        lastCommitPosition += versionReport['commits']
+        if versionCommits:
+            pickedLogMessages = ['    {}'.format(commit['message'].split('\n', 1)[0]) for commit in versionCommits]
+            LOGGER.info("Retrieved changes of %s:\n%s", versionReport['file'], '\n'.join(pickedLogMessages))
+    return report
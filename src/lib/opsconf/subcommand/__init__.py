@@ -5,24 +5,38 @@
 
 """Package containing all the subcommands that can be run by opsconf"""
 
-from . import (
-    # standard commands
-    commit,
-    diff,
-    init,
-    liststates,
-    log,
-    move,
-    qualify,
-    remove,
-    rollback,
-    status,
-    switch,
-    sync,
-    tag,
-    validate,
+import importlib
+
+# The subcommands, in the order of the help, with their short description.
+# Their modules are only imported when they are run (see `getModule()`).
+COMMANDS = [
+    ('sync', "synchronize local and distant repositories"),
+    ('commit', "commit changes to a file"),
+    ('log', "show changelogs of a file"),
+    ('diff', "show difference between two versions of a file"),
+    ('move', "move a file or directory"),
+    ('remove', "remove a file from the repository"),
+    ('rollback', "rollback a file to a given versions"),
+    ('qualify', "mark a file version as ready for qualification"),
+    ('validate', "mark a file version as validated of production use"),
+    ('init', "initialize the local repository"),
+    ('status', "list the current version in given state (tag or branch)"),
+    ('liststates', "list the repository states"),
+    ('switch', "get to a given repository state"),
+    ('tag', "label the current state of the whole repository"),
+    ('toolbox', "scripts of the opsconf toolbox"),
     # deprecated commands
-    checkout,
-    # other commands
-    toolbox
-    )
+    ('checkout', "[deprecated: use switch] get to a given repository state"),
+    ]
+
+
+def getModule(command):
+    """Import the module of a subcommand.
+
+    Args:
+        command (str): the name of the subcommand.
+
+    Returns:
+        module: the module, which defines `setupParser(parser)` and `runCmd(args)`.
+    """
+    return importlib.import_module('.{}'.format(command), __name__)
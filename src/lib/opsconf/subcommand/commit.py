@@ -47,10 +47,9 @@ def runCmd(args):
 
     if recursive and os.path.isdir(filename):
         # We search only changed file
-        changedFiles = libgit.listChangedFiles()
-        for f in changedFiles:
-            if f.startswith(filename):
-                _commitFile(f, message)
+        changedFiles = [f for f in libgit.listChangedFiles() if f.startswith(filename)]
+        for committedFile, version in opsconf.commitFiles(changedFiles, message):
+            LOGGER.info("File committed: \"%s\", v%d", committedFile, version)
     else:
         _commitFile(filename, message=message)
 
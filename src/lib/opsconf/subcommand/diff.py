@@ -5,6 +5,10 @@
 
 """Module to define the subcommand diff."""
 
+import csv
+import json
+import sys
+
 import opsconf
 
 
@@ -14,8 +18,16 @@ def setupParser(parser):
     Args:
         parser (argparse.ArgumentParser): the parser to setup
     """
-    parser.description = "Show the différence of FILE between version VERSION_OLD and VERSION_NEW"
-    parser.add_argument('file', help="the file on which to do the diff", metavar='FILE')
+    parser.description = ("Show the différence of FILE between version VERSION_OLD and VERSION_NEW, or with "
+                          "'--states', the versions of the files that differ between two branches or tags")
+    parser.add_argument('--states', help="compare the versions of the files between the branches or tags STATE_OLD "
+                        "and STATE_NEW (FILE, if given, limits the comparison to a file or directory)",
+                        nargs=2, metavar=('STATE_OLD', 'STATE_NEW'))
+    parser.add_argument('--format', help="the output format of '--states' (default: table)",
+                        choices=['table', 'csv', 'ndjson'], default='table', dest='outputFormat')
+    parser.add_argument('--patch', help="with '--states', also show the diff of the changed files",
+                        action='store_true')
+    parser.add_argument('file', help="the file on which to do the diff", metavar='FILE', nargs='?', default=None)
     parser.add_argument('version_old', help="the old version to compare to (defaults to the last version)",
                         metavar='VERSION_OLD', nargs='?', default=None)
     parser.add_argument('version_new', help="the new version to compare to (defaults to the state of the working directory)",
@@ -29,6 +41,72 @@ def runCmd(args):
         args (argparse.Namespace): the namespace returned by the parse_args() method
     """
     filename = args.file
+    if args.states is not None:
+        _diffStates(args.states[0], args.states[1], filename, args.outputFormat, args.patch)
+        return
+
+    if filename is None:
+        raise opsconf.OpsconfFatalError("A file is expected, or the option '--states'.")
     v1 = opsconf.versionToInt(args.version_old)
     v2 = opsconf.versionToInt(args.version_new)
     print(opsconf.diffBetweenVersions(filename, v1, v2))
+
+
+def _diffStates(oldRevision, newRevision, filename, outputFormat, withPatch):
+    """Internal function to print the versions of the files that differ between two states.
+
+    Args:
+        oldRevision (str): the state used as reference.
+        newRevision (str): the state containing the changes.
+        filename (str or None): the file or directory to compare, None for the current directory.
+        outputFormat (str): 'table', 'csv' or 'ndjson'.
+        withPatch (bool): whether to print the diff of the changed files after the table.
+    """
+    if withPatch and outputFormat != 'table':
+        raise opsconf.OpsconfFatalError("The option '--patch' is only available with the table format.")
+    filenames = None if filename is None else [filename]
+    fileStates = opsconf.diffStates(oldRevision, newRevision, filenames)
+
+    if outputFormat == 'csv':
+        _csvPrint(fileStates)
+    elif outputFormat == 'ndjson':
+        for fileState in fileStates:
+            print(json.dumps(fileState, sort_keys=True))
+    else:
+        _tablePrint(fileStates, oldRevision, newRevision)
+        if withPatch and fileStates:
+            print()
+            print(opsconf.diffStatesPatch(oldRevision, newRevision, filenames), end='')
+
+
+def _csvPrint(fileStates):
+    """Internal function to print to the stdout as CSV.
+
+    Args:
+        fileStates (list of dict): the list to print.
+    """
+    csvWriter = csv.writer(sys.stdout, dialect='excel', delimiter=';')
+    csvWriter.writerow(['filename', 'oldVersion', 'newVersion', 'status'])
+    for fileState in fileStates:
+        csvWriter.writerow([fileState['file'], fileState['oldVersion'], fileState['newVersion'], fileState['status']])
+
+
+def _tablePrint(fileStates, oldRevision, newRevision):
+    """Internal function to print to the stdout as a table.
+
+    Args:
+        fileStates (list of dict): the list to print.
+        oldRevision (str): the state used as reference.
+        newRevision (str): the state containing the changes.
+    """
+    if len(fileStates) == 0:
+        maxlength = 10
+    else:
+        maxlength = max(len(fileState['file']) for fileState in fileStates)
+    rowTemplate = '| {:{maxlength}} | {:>15} | {:>15} | {:8} |'
+    print(rowTemplate.format('Filename', oldRevision[:15], newRevision[:15], 'Status', maxlength=maxlength))
+    print(rowTemplate.format('-'*maxlength, '-'*15, '-'*15, '-'*8, maxlength=maxlength))
+    for fileState in fileStates:
+        versions = ['-' if version is None else 'v{}'.format(version)
+                    for version in [fileState['oldVersion'], fileState['newVersion']]]
+        print(rowTemplate.format(fileState['file'], versions[0], versions[1], fileState['status'], maxlength=maxlength))
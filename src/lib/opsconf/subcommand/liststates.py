@@ -5,13 +5,24 @@
 
 """Module to define the subcommand liststates."""
 
+import csv
+import json
+import sys
+
+import opsconf
+
+
 def setupParser(parser):
     """Setup the parser with the details of the current operation
 
     Args:
         parser (argparse.ArgumentParser): the parser to setup
     """
-    parser.description = "NOT IMPLEMENTED YET"
+    parser.description = ("List the states of the repository (the branches and the tags), with their date, tagger, "
+                          "message and number of files that differ from the branch '{}'".format(opsconf.OPSCONF_BRANCH_VALID))
+    parser.add_argument('--to-csv', help="output in csv (same as '--format csv')", action='store_true', dest='toCsv')
+    parser.add_argument('--format', help="the output format (default: table)", choices=['table', 'csv', 'ndjson'],
+                        default='table', dest='outputFormat')
 
 
 def runCmd(args):
@@ -20,5 +31,45 @@ def runCmd(args):
     Args:
         args (argparse.Namespace): the namespace returned by the parse_args() method
     """
-    print(args)
-    raise NotImplementedError("NOT IMPLEMENTED YET")
+    outputFormat = 'csv' if args.toCsv else args.outputFormat
+
+    states = opsconf.listStates()
+
+    if outputFormat == 'csv':
+        _csvPrint(states)
+    elif outputFormat == 'ndjson':
+        for state in states:
+            print(json.dumps(state, sort_keys=True))
+    else:
+        _tablePrint(states)
+
+
+def _csvPrint(states):
+    """Internal function to print to the stdout as CSV.
+
+    Args:
+        states (list of dict): the list to print.
+    """
+    csvWriter = csv.writer(sys.stdout, dialect='excel', delimiter=';')
+    csvWriter.writerow(['state', 'type', 'date', 'tagger', 'changedFiles', 'message'])
+    for state in states:
+        csvWriter.writerow([state['state'], state['type'], state['date'], state['tagger'], state['changedFiles'],
+                            state['message']])
+
+
+def _tablePrint(states):
+    """Internal function to print to the stdout as a table.
+
+    Args:
+        states (list of dict): the list to print.
+    """
+    maxlength = max([len('State')] + [len(state['state']) for state in states])
+    taggerLength = max([len('Tagger')] + [len(state['tagger']) for state in states])
+    rowTemplate = '| {:{maxlength}} | {:6} | {:25} | {:{taggerLength}} | {:>6} | {} |'
+    print(rowTemplate.format('State', 'Type', 'Date', 'Tagger', 'Files', 'Message',
+                             maxlength=maxlength, taggerLength=taggerLength))
+    print(rowTemplate.format('-'*maxlength, '-'*6, '-'*25, '-'*taggerLength, '-'*6, '-'*7,
+                             maxlength=maxlength, taggerLength=taggerLength))
+    for state in states:
+        print(rowTemplate.format(state['state'], state['type'], state['date'], state['tagger'], state['changedFiles'],
+                                 state['message'], maxlength=maxlength, taggerLength=taggerLength))
@@ -24,6 +24,8 @@ def setupParser(parser):
     parser.description = "Check existing versions of file FILE in the current branch (or in all branches if \"--all\")"
     parser.add_argument('-a', '--all', help="check in all branches", action='store_true', dest='allVersions')
     parser.add_argument('--to-csv', help="output in csv", action='store_true', dest='toCsv')
+    parser.add_argument('--follow', help="also list the versions of the files it was moved from",
+                        action='store_true', dest='follow')
     parser.add_argument('file', help="the file to apply the command to", metavar="FILE")
 
 def runCmd(args):
@@ -35,12 +37,17 @@ def runCmd(args):
     allVersions = args.allVersions
     filename = args.file
     toCsv = args.toCsv
+    follow = args.follow
 
     if allVersions:
         branch = opsconf.OPSCONF_BRANCH_WORK
-        versionListLastToFirst = opsconf.listAllVersions(filename)
     else:
         branch = libgit.getCurrentBranch()
+    if follow:
+        versionListLastToFirst = opsconf.listFollowedVersions(branch, filename)
+    elif allVersions:
+        versionListLastToFirst = opsconf.listAllVersions(filename)
+    else:
         versionListLastToFirst = opsconf.listCurrentVersions(filename)
 
     # We want the versions from first to last
@@ -48,39 +55,56 @@ def runCmd(args):
 
     LOGGER.info("On branch %s", branch)
     if toCsv:
-        _csvPrint(versionList)
+        _csvPrint(versionList, withFile=follow)
     else:
-        _tablePrint(versionList)
+        _tablePrint(versionList, withFile=follow)
 
 
-def _csvPrint(versionList):
+def _csvPrint(versionList, withFile=False):
     """Internal function to print to the stdout as CSV.
 
     Args:
         versionList (list of dict): the list to print.
+        withFile (bool, optional): whether to print the file of each version. Defaults to False.
     """
     csvWriter = csv.writer(sys.stdout, dialect='excel', delimiter=";")
 
     fieldnames = ['version', 'subject', 'tags']
+    if withFile:
+        fieldnames = ['file'] + fieldnames
     csvWriter.writerow(fieldnames)
 
     for version in versionList:
-        csvWriter.writerow([version['version'],
-                            version['subject'],
-                            ' '.join(version['tags'])])
+        row = [version['version'],
+               version['subject'],
+               ' '.join(version['tags'])]
+        if withFile:
+            row = [version['file']] + row
+        csvWriter.writerow(row)
 
 
-def _tablePrint(versionList):
+def _tablePrint(versionList, withFile=False):
     """Internal function to print to the stdout as a table.
 
     Args:
         versionList (list of dict): the list to print.
+        withFile (bool, optional): whether to print the file of each version. Defaults to False.
     """
     rowTemplate = '| {:5} | {:40} | {:20} |'
+    if withFile:
+        rowTemplate = '| {:40} ' + rowTemplate
     if sys.stdout.isatty():
-        print(rowTemplate.format('vers.','subject', 'tags'))
-        print(rowTemplate.format('-'*5, '-'*40, '-'*20))
+        header = ['vers.', 'subject', 'tags']
+        separator = ['-'*5, '-'*40, '-'*20]
+        if withFile:
+            header = ['file'] + header
+            separator = ['-'*40] + separator
+        print(rowTemplate.format(*header))
+        print(rowTemplate.format(*separator))
     for version in versionList:
-        print(rowTemplate.format(version['version'],
-                                 version['subject'],
-                                 ' '.join(version['tags'])))
+        row = [version['version'],
+               version['subject'],
+               ' '.join(version['tags'])]
+        if withFile:
+            row = [version['file']] + row
+        print(rowTemplate.format(*row))
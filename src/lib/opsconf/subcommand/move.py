@@ -5,14 +5,10 @@
 
 """Module to define the subcommand move."""
 
-from argparse import Namespace
 import logging
 import os
-import shutil
 
 import opsconf
-import opsconf.subcommand.commit
-import opsconf.subcommand.remove
 
 LOGGER = logging.getLogger('opsconf.move')
 
@@ -23,7 +19,9 @@ def setupParser(parser):
     Args:
         parser (argparse.ArgumentParser): the parser to setup
     """
-    parser.description = "Move file (or directory) SRC_FILE to DST_FILE with the justification MESSAGE"
+    parser.description = ("Move file (or directory) SRC_FILE to DST_FILE with the justification MESSAGE. "
+                          "If DST_FILE is an existing directory, SRC_FILE is moved into it. "
+                          "The history of the source can be displayed with 'opsconf log --follow'.")
     parser.add_argument('-m', metavar='REASON', help="the reason for the move", required=True, dest="reason")
     parser.add_argument('srcfile', metavar='SRC_FILE', help="the source path")
     parser.add_argument('dstfile', metavar='DST_FILE', help="the destination path")
@@ -35,16 +33,23 @@ def runCmd(args):
     Args:
         args (argparse.Namespace): the namespace returned by the parse_args() method
     """
-    srcfile = args.srcfile
-    dstfile = args.dstfile
+    srcfile = os.path.normpath(args.srcfile)
+    dstfile = os.path.normpath(args.dstfile)
     reason = args.reason
 
-    if os.path.isdir(srcfile):
-        shutil.copytree(srcfile, dstfile, symlinks=True)
+    # as 'git mv' does, move into the destination if it is a directory
+    if os.path.isdir(dstfile):
+        dstfile = os.path.join(dstfile, os.path.basename(srcfile))
+
+    if os.path.islink(srcfile) or os.path.isfile(srcfile):
+        moves = [(srcfile, dstfile)]
+    elif os.path.isdir(srcfile):
+        if os.path.lexists(dstfile):
+            raise opsconf.OpsconfFatalError("The destination already exists: {}".format(dstfile))
+        moves = [(os.path.join(root, name), os.path.join(dstfile, os.path.relpath(os.path.join(root, name), srcfile)))
+                 for root, _, files in os.walk(srcfile) for name in sorted(files)]
     else:
-        shutil.copy2(srcfile, dstfile, follow_symlinks=False)
+        raise opsconf.OpsconfFatalError("I don't know what to do with this file: {}".format(srcfile))
 
-    argsCommit = Namespace(file=dstfile, recursive=True, message=reason)
-    argsRemove = Namespace(file=srcfile, recursive=True, reason=reason)
-    opsconf.subcommand.commit.runCmd(argsCommit)
-    opsconf.subcommand.remove.runCmd(argsRemove)
+    for (source, _), (destination, version) in zip(moves, opsconf.moveFiles(moves, reason)):
+        LOGGER.info("File moved: \"%s\" -> \"%s\", v%d", source, destination, version)
@@ -52,11 +52,11 @@ def runCmd(args):
         if answer.lower() not in ['y', 'yes']:
             LOGGER.info("Aborted: nothing was done")
             return
-        for root, _, files in os.walk(filename, topdown=False):
-            for name in files:
-                subfilename = os.path.join(root, name)
-                opsconf.removeFile(subfilename, reason)
-                LOGGER.info("File removed: \"%s\"", subfilename)
+        subfilenames = [os.path.join(root, name) for root, _, files in os.walk(filename, topdown=False) for name in files]
+        # all the files are removed at once, so that nothing is removed if one of them is unknown
+        opsconf.removeFiles(subfilenames, reason)
+        for subfilename in subfilenames:
+            LOGGER.info("File removed: \"%s\"", subfilename)
 
     else:
         raise opsconf.OpsconfFatalError("I don't know what to do with this file: {}".format(filename))
@@ -5,8 +5,12 @@
 
 """Module to define the subcommand rollback."""
 
+import logging
+
 import opsconf
 
+LOGGER = logging.getLogger('opsconf.rollback')
+
 
 def setupParser(parser):
     """Setup the parser with the details of the current operation
@@ -14,10 +18,14 @@ def setupParser(parser):
     Args:
         parser (argparse.ArgumentParser): the parser to setup
     """
-    parser.description = "Create a new version of FILE with previous version VERSION, with the justification REASON"
+    parser.description = ("Create a new version of FILE with previous version VERSION, with the justification REASON. "
+                          "With '--to-tag TAG', create a new version of each file changed since the tag TAG under "
+                          "the paths PATH (or the current directory), with its version in the tag.")
     parser.add_argument('-m', metavar='REASON', help="the reason for rolling-back", required=True, dest="reason")
-    parser.add_argument('file', metavar='FILE', help="the file to rollback")
-    parser.add_argument('version', metavar='VERSION', help="the version to rollback")
+    parser.add_argument('--to-tag', metavar='TAG', help="rollback the files to their version in the tag TAG",
+                        dest="tag")
+    parser.add_argument('arguments', metavar='FILE VERSION | PATH', nargs='*',
+                        help="the file and the version to rollback, or the paths to rollback with '--to-tag'")
 
 
 def runCmd(args):
@@ -26,10 +34,16 @@ def runCmd(args):
     Args:
         args (argparse.Namespace): the namespace returned by the parse_args() method
     """
-    filename = args.file
-    version = opsconf.versionToInt(args.version)
     reason = args.reason
 
-    opsconf.checkBranchIsWork()
-    opsconf.checkBranchUpToDate()
-    opsconf.rollbackToVersion(filename, version, reason)
+    if args.tag is not None:
+        for filename, version, newVersion in opsconf.rollbackToTag(args.tag, args.arguments, reason):
+            LOGGER.info("File rolled back: \"%s\", v%d (to v%d)", filename, newVersion, version)
+        return
+
+    if len(args.arguments) != 2:
+        raise opsconf.OpsconfFatalError("A file and a version are expected, or the option '--to-tag'.")
+    filename = args.arguments[0]
+    version = opsconf.versionToInt(args.arguments[1])
+    newVersion = opsconf.rollbackToVersion(filename, version, reason)
+    LOGGER.info("File rolled back: \"%s\", v%d (to v%d)", filename, newVersion, version)
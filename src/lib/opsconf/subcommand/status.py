@@ -6,10 +6,15 @@
 """Module to define the subcommand status."""
 
 import csv
+import json
+import os
 import sys
 
 import opsconf
 
+# the default width of the filename column of the table
+DEFAULT_WIDTH = 60
+
 
 def setupParser(parser):
     """Setup the parser with the details of the current operation
@@ -20,7 +25,11 @@ def setupParser(parser):
     parser.description = "Show the versions of the files of the current state of the repo, or given branch BRANCH or tag TAG"
     parser.add_argument('--with-notes', help="whether to get the qualification/validation notes or not",
                         action='store_true', dest='withNotes')
-    parser.add_argument('--to-csv', help="output in csv", action='store_true', dest='toCsv')
+    parser.add_argument('--to-csv', help="output in csv (same as '--format csv')", action='store_true', dest='toCsv')
+    parser.add_argument('--format', help="the output format (default: table)", choices=['table', 'csv', 'ndjson'],
+                        default='table', dest='outputFormat')
+    parser.add_argument('--width', help="the width of the filename column of the table, longer filenames overflow "
+                        "(default: {})".format(DEFAULT_WIDTH), type=int, default=DEFAULT_WIDTH, metavar='WIDTH')
     parser.add_argument('revision', metavar='BRANCH|TAG', help="change to given branch or tag", nargs='?', default="HEAD")
 
 
@@ -32,22 +41,31 @@ def runCmd(args):
     """
     revision = args.revision
     withNotes = args.withNotes
-    toCsv = args.toCsv
-
-    fileVersionList = opsconf.showCurrentVersions(revision, withNotes=withNotes)
+    outputFormat = 'csv' if args.toCsv else args.outputFormat
 
+    # the rows are printed as they come
+    fileVersionList = opsconf.iterCurrentVersions(revision, withNotes=withNotes)
 
-    if toCsv:
-        _csvPrint(fileVersionList, withNotes)
-    else:
-        _tablePrint(fileVersionList, withNotes)
+    try:
+        if outputFormat == 'csv':
+            _csvPrint(fileVersionList, withNotes)
+        elif outputFormat == 'ndjson':
+            _ndjsonPrint(fileVersionList, withNotes)
+        else:
+            _tablePrint(fileVersionList, withNotes, args.width)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # the reader stopped reading (e.g. 'opsconf status | head'): the rest of the output is dropped,
+        # python would fail again when flushing the stdout at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
 
 
 def _csvPrint(fileVersionList, withNotes):
     """Internal function to print to the stdout as CSV.
 
     Args:
-        versionList (list of dict): the list to print.
+        versionList (iterable of dict): the list to print.
         withNotes (bool): whether to print the notes or not.
     """
     csvWriter = csv.writer(sys.stdout, dialect='excel', delimiter=';')
@@ -70,19 +88,34 @@ def _csvPrint(fileVersionList, withNotes):
         csvWriter.writerow(row)
 
 
-def _tablePrint(fileVersionList, withNotes):
+def _ndjsonPrint(fileVersionList, withNotes):
+    """Internal function to print to the stdout as newline-delimited JSON: one object per line.
+
+    Args:
+        versionList (iterable of dict): the list to print.
+        withNotes (bool): whether to print the notes or not.
+    """
+    for fileVersion in fileVersionList:
+        row = dict(fileVersion)
+        if not withNotes:
+            del row['notes']
+        print(json.dumps(row, sort_keys=True))
+
+
+def _tablePrint(fileVersionList, withNotes, width=DEFAULT_WIDTH):
     """Internal function to print to the stdout as a table.
 
+    The width of the filename column is fixed, so that each row is printed as soon as it is resolved.
+
     Args:
-        versionList (list of dict): the list to print.
+        versionList (iterable of dict): the list to print.
         withNotes (bool): whether to print the notes or not.
+        width (int, optional): the width of the filename column, longer filenames overflow.
+                               Defaults to DEFAULT_WIDTH.
     """
     # define columns and print header
     rowTemplate = '| {:{maxlength}} | {:6} |'
-    if len(fileVersionList) == 0:
-        maxlength = 10
-    else:
-        maxlength = max([ len(fileVersion['file']) for fileVersion in fileVersionList ])
+    maxlength = width
 
     if withNotes:
         rowTemplate += ' {:40} |'
@@ -16,6 +16,9 @@ def setupParser(parser):
         parser (argparse.ArgumentParser): the parser to setup
     """
     parser.description = "Synchronize the local and distant repositories"
+    parser.add_argument('--all', help="synchronize the branches {}, {} and {}, not only the current one"
+                        .format(opsconf.OPSCONF_BRANCH_WORK, opsconf.OPSCONF_BRANCH_QUALIF, opsconf.OPSCONF_BRANCH_VALID),
+                        action='store_true', dest='allBranches')
     parser.add_argument('remote', help="change to given branch or tag", metavar='REMOTE', nargs='?', default='origin')
 
 
@@ -26,6 +29,10 @@ def runCmd(args):
         args (argparse.Namespace): the namespace returned by the parse_args() method
     """
     remote = args.remote
-    currentBranch = libgit.getCurrentBranch()
 
-    opsconf.sync(currentBranch, remote)
+    if args.allBranches:
+        opsconf.syncBranches([opsconf.OPSCONF_BRANCH_WORK, opsconf.OPSCONF_BRANCH_QUALIF, opsconf.OPSCONF_BRANCH_VALID],
+                             remote)
+    else:
+        currentBranch = libgit.getCurrentBranch()
+        opsconf.sync(currentBranch, remote)
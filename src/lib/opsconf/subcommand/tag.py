@@ -7,7 +7,7 @@
 
 import time
 
-from opsconf import libgit
+import opsconf
 
 
 def setupParser(parser):
@@ -16,7 +16,8 @@ def setupParser(parser):
     Args:
         parser (argparse.ArgumentParser): the parser to setup
     """
-    parser.description = "Tag the current state of the repository with tag TAG"
+    parser.description = ("Tag the current state of the repository with tag TAG, with the manifest of the versions "
+                          "of its files")
     parser.add_argument('-m', help="the tag message", metavar="MESSAGE", dest="message")
     parser.add_argument('tag', help="the name of the tag", metavar='TAG')
 
@@ -32,5 +33,4 @@ def runCmd(args):
         message = "tag: {} ({})".format(tag, time.strftime('%d/%m/%Y %H:%M:%S'))
     else:
         message = args.message
-    libgit.setTag(tag, message)
-    libgit.pushTag(tag)
+    opsconf.createTag(tag, message)
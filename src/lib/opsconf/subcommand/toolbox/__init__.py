@@ -4,23 +4,39 @@
 # SPDX-License-Identifier: MIT
 
 """Module to define the subcommand toolbox. Since we don't know the scripts from the toolbox,
-we need to do clever things to discover them on the run."""
+we discover them from the content of this directory, and only import the one that is run."""
 
-import glob
+import importlib
 import logging
 import os
 
-import opsconf
 
-modules = glob.glob(os.path.join(os.path.dirname(__file__), "*.py"))
-__all__ = [ os.path.basename(f)[:-3] for f in modules if os.path.isfile(f) and not f.endswith('__init__.py')]
+LOGGER = logging.getLogger('opsconf.toolbox')
 
-# the import shall be here so that __all__ is already defined
-# pylint: disable=wrong-import-position, import-self
-from . import *
 
+def listScripts():
+    """List the scripts of the toolbox, without importing them.
+
+    Returns:
+        list of str: the names of the scripts.
+    """
+    scriptDir = os.path.dirname(__file__)
+    return sorted(filename[:-3] for filename in os.listdir(scriptDir)
+                  if filename.endswith('.py') and filename != '__init__.py'
+                  and os.path.isfile(os.path.join(scriptDir, filename)))
+
+
+def getScriptModule(script):
+    """Import the module of a toolbox script.
+
+    Args:
+        script (str): the name of the script.
+
+    Returns:
+        module: the module, which defines `setupParser(parser)` and `runCmd(args)`.
+    """
+    return importlib.import_module('.{}'.format(script), __name__)
 
-LOGGER = logging.getLogger('opsconf.toolbox')
 
 def setupParser(parser):
     """Setup the parser with the details of the current operation.
@@ -37,24 +53,22 @@ def runCmd(args):
     Args:
         args (argparse.Namespace): the namespace returned by the parse_args() method.
     """
-    if args.script in __all__:
-        # No better solution than an eval(). If you have a better idea, MR welcome
-        # pylint: disable=eval-used
-        eval(args.script).runCmd(args)
+    if args.script in listScripts():
+        getScriptModule(args.script).runCmd(args)
 
 
-def setupSubParsers(parser, parentParser):
+def setupSubParsers(parser, parentParser, selectedScript=None):
     """Setup the subparsers of the toolbox entry.
 
     Args:
         parser (argparse.ArgumentParser): the parser on which to setup the subparsers.
         parentParser (argparse.ArgumentParser): the parser which holds the common arguments.
+        selectedScript (str, optional): the script that is run. Defaults to None.
+                                        Only this script is imported to setup its arguments.
+                                        If not given, all the scripts are imported.
     """
-    subparserDict = {}
     subparsers = parser.add_subparsers(title='Opsconf Toolbox', dest='script')
-    for script in __all__:
-        parser = subparsers.add_parser(script, parents=[parentParser])
-        # No better solution than an eval(). If you have a better idea, MR welcome
-        # pylint: disable=eval-used
-        eval(script).setupParser(parser)
-        subparserDict[script] = parser
+    for script in listScripts():
+        scriptParser = subparsers.add_parser(script, parents=[parentParser])
+        if selectedScript is None or script == selectedScript:
+            getScriptModule(script).setupParser(scriptParser)
@@ -9,6 +9,7 @@ import argparse
 import csv
 import logging
 import sys
+import time
 
 import opsconf
 from opsconf import libgit
@@ -23,7 +24,8 @@ def setupParser(parentParser):
         parentParser (argparse.ArgumentParser): the parser to setup
     """
     parentParser.description = "Validate file versions based on the the stdin or the SRCFILE description."
-    parentParser.add_argument('--dry-run', help="pretend to validate the files, but do not do it", action='store_true')
+    parentParser.add_argument('--dry-run', help="pretend to validate the files (report in csv), but do not do it",
+                              action='store_true')
     parentParser.add_argument('-m', help="optional reason for the validation", metavar='MESSAGE', dest='message')
     parentParser.add_argument('sourceFile', help="the file that lists the versions to validate (in csv), defaults to the stdin",
                               metavar='SRCFILE', nargs='?', type=argparse.FileType('r'), default=sys.stdin)
@@ -45,26 +47,30 @@ def runCmd(args):
     fileVersionList = csv.DictReader(sourceFile, delimiter=';', dialect='excel')
 
     if args.dry_run:
+        # the report of each row goes to the stdout, as csv
+        fileVersions = [(fileVersion['filename'], int(fileVersion['version'])) for fileVersion in fileVersionList]
+        results = opsconf.checkFileVersions(fileVersions, opsconf.OPSCONF_BRANCH_WORK)
+        csvWriter = csv.writer(sys.stdout, dialect='excel', delimiter=';')
+        csvWriter.writerow(['filename', 'version', 'lastVersionInWork', 'status', 'error'])
         errorNb = 0
-        for fileVersion in fileVersionList:
-            filename = fileVersion['filename']
-            version = int(fileVersion['version'])
-            allVersionsFromFile = opsconf.listAllVersions(filename)
-            if len(allVersionsFromFile) == 0:
-                logging.error("Dry-run: Would fail: %s not found in %s.", filename, opsconf.OPSCONF_BRANCH_WORK)
-                errorNb +=1
-            elif allVersionsFromFile[0]['version'] < version:
-                logging.error("Dry-run: Would fail: %s, v%d not found in %s (max version=v%d).",
-                              filename, version, opsconf.OPSCONF_BRANCH_WORK, allVersionsFromFile[0]['version'])
-                errorNb +=1
+        for result in results:
+            if result['error'] is not None:
+                logging.error("Dry-run: Would fail: %s.", result['error'])
+                errorNb += 1
             else:
-                logging.info("Dry-run: Would validate %s in v%d.", filename, version)
+                logging.info("Dry-run: Would validate %s in v%d.", result['file'], result['version'])
+            csvWriter.writerow([result['file'], result['version'],
+                                result['lastVersion'] if result['lastVersion'] is not None else '',
+                                'KO' if result['error'] is not None else 'OK', result['error'] or ''])
         if errorNb > 0:
             raise opsconf.OpsconfFatalError("Error where found. See above for details.")
 
     else:
-        for fileVersion in fileVersionList:
-            filename = fileVersion['filename']
-            version = int(fileVersion['version'])
-            opsconf.promoteVersion(opsconf.OPSCONF_BRANCH_VALID, filename, version, message)
-            logging.info("Validated %s in v%d.", filename, version)
+        # all the versions are promoted at once: if one of them fails, none is promoted
+        fileVersions = [(fileVersion['filename'], int(fileVersion['version'])) for fileVersion in fileVersionList]
+        startTime = time.time()
+        report = opsconf.promoteVersions(opsconf.OPSCONF_BRANCH_VALID, fileVersions, message)
+        for versionReport in report:
+            logging.info("Validated %s in v%d (%d commit(s), resolved in %.0f ms).", versionReport['file'],
+                         versionReport['version'], versionReport['commits'], versionReport['duration'] * 1000)
+        logging.info("%d version(s) validated in %.1f s.", len(report), time.time() - startTime)
@@ -37,8 +37,42 @@ else
    log_result "KO"
 fi
 
+log_test "An init whose push fails leaves the empty repository as it was."
+FAILED_REMOTE="$WORKSPACE/01_init_failed_remote.git"
+FAILED_LOCAL="$WORKSPACE/01_init_failed_local"
+(
+git init --bare "$FAILED_REMOTE"
+printf '#!/bin/sh\nexit 1\n' > "$FAILED_REMOTE/hooks/pre-receive"
+chmod +x "$FAILED_REMOTE/hooks/pre-receive"
+git clone "$FAILED_REMOTE" "$FAILED_LOCAL"
+) &> /dev/null
+pushd "$FAILED_LOCAL" > /dev/null
+git config --local user.email "testing@test.tld"
+git config --local user.name "The Tester"
+HEAD_BEFORE=$(git symbolic-ref HEAD)
+if ! OPSCONF_BIN init &> /dev/null && [ "$(git symbolic-ref HEAD)" = "$HEAD_BEFORE" ] \
+   && [ -z "$(git for-each-ref refs/heads)" ] && [ -z "$(ls -A | grep -v "^.git$")" ] \
+   && [ -z "$(git status --porcelain)" ] ; then
+   log_result "OK"
+else
+   log_result "KO"
+fi
+popd > /dev/null
+
 log_info "Initialize opsconf"
-OPSCONF_BIN init --root-branch develop
+OPSCONF_BIN init --root-branch develop 2>&1 | tee "$WORKSPACE/01_init_opsconf.log"
+
+log_test "The migration creates a v1 commit per file and pushes all the branches."
+if [ "$(git log --format=%s work | grep -c "^v1: First version for './before_opsconf/file1.txt'$")" -eq 1 ] \
+   && [ "$(git rev-list --count work)" -eq 2 ] && [ "$(git rev-list --count master)" -eq 1 ] \
+   && [ "$(git rev-parse --abbrev-ref HEAD)" = "work" ] && [ -f .opsconf ] \
+   && [ "$(git rev-parse work@{u})" = "$(git rev-parse work)" ] \
+   && [ "$(git rev-parse qualification@{u})" = "$(git rev-parse qualification)" ] \
+   && grep -q "^\[INFO\] Migrated 1 files from develop in .* files/s)$" "$WORKSPACE/01_init_opsconf.log" ; then
+   log_result "OK"
+else
+   log_result "KO"
+fi
 
 log_test "Hooks are correctly deployed."
 result=0
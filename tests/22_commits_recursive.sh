@@ -55,4 +55,57 @@ else
     log_result "KO"
 fi
 
+for filename in "${COMMITTED_DIR}"/* ; do
+    lorem_ipsum >> "$filename"
+done
+head_before="$(git rev-parse HEAD)"
+
+log_test "Committing recursively creates one commit per file, with its own version"
+OPSCONF_BIN commit -r -m "changed dir2 again" "${COMMITTED_DIR}" &> /dev/null
+versions="$(for filename in "${COMMITTED_DIR}"/* ; do git log --format=%s -n1 -- "$filename" | cut -d: -f1 ; done | sort -u)"
+if [ "$(git rev-list --count "${head_before}..HEAD")" -eq 3 ] && [ "$versions" = "v3" ]; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "The recursive commit is pushed"
+if [ "$(git rev-parse HEAD)" = "$(git rev-parse origin/work)" ]; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "If the push fails, nothing is committed"
+for filename in "${COMMITTED_DIR}"/* ; do
+    lorem_ipsum >> "$filename"
+done
+head_before="$(git rev-parse HEAD)"
+printf '#!/bin/sh\nexit 1\n' > "${REPO_REMOTE}/hooks/pre-receive"
+chmod +x "${REPO_REMOTE}/hooks/pre-receive"
+if ! OPSCONF_BIN commit -r -m "rejected change" "${COMMITTED_DIR}" &> /dev/null && \
+        [ "$(git rev-parse HEAD)" = "$head_before" ] && \
+        [ "$(git diff --name-only -- "${COMMITTED_DIR}" | wc -l)" -eq 3 ] && \
+        [ "$(git diff --cached --name-only | wc -l)" -eq 0 ]; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+rm "${REPO_REMOTE}/hooks/pre-receive"
+git checkout -- "${COMMITTED_DIR}"
+
+log_test "Committing recursively a directory skips its deleted files"
+rm "${COMMITTED_DIR}/file1"
+lorem_ipsum >> "${COMMITTED_DIR}/file2"
+head_before="$(git rev-parse HEAD)"
+if OPSCONF_BIN commit -r -m "changed dir2 with a deleted file" "${COMMITTED_DIR}" &> /dev/null && \
+        [ "$(git rev-list --count "${head_before}..HEAD")" -eq 1 ] && \
+        [ "$(git log --format=%s -n1 -- "${COMMITTED_DIR}/file2" | cut -d: -f1)" = "v4" ] && \
+        git cat-file -e "HEAD:${COMMITTED_DIR}/file1" && [ ! -e "${COMMITTED_DIR}/file1" ]; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+git checkout -- "${COMMITTED_DIR}"
+
 popd > /dev/null
@@ -91,12 +91,20 @@ for branch in "qualification" "master" ; do
 
     log_test "Can $cmd file from branch work"
     OPSCONF_BIN checkout work
+    inode_before="$(stat -c %i "$FILE")"
     if OPSCONF_BIN "$cmd" "$FILE" 8 ; then
         log_result "OK"
     else
         log_result "KO"
     fi
 
+    log_test "...without changing the working directory"
+    if [ "$(git rev-parse --abbrev-ref HEAD)" = "work" ] && [ "$(stat -c %i "$FILE")" = "$inode_before" ]; then
+        log_result "OK"
+    else
+        log_result "KO"
+    fi
+
     log_test "...and the command works successfully"
     OPSCONF_BIN checkout $branch
     if [ "$(OPSCONF_BIN log "$FILE" | wc -l)" -eq 8 ]; then
@@ -27,14 +27,25 @@ for operation in "validate" "qualify" ; do
     cmd="${operation}FromFile"
     log_test "$cmd: Dry-run works from stdin"
     # the grep -v ;0; removes the new files
-    if OPSCONF_BIN status --to-csv | grep -v ';0;' | OPSCONF_BIN toolbox $cmd --dry-run 2> /dev/null ; then
+    if OPSCONF_BIN status --to-csv | grep -v ';0;' | OPSCONF_BIN toolbox $cmd --dry-run &> /dev/null ; then
         log_result "OK"
     else
         log_result "KO"
     fi
 
     log_test "$cmd: Dry-run fails if the input is wrong from stdin"
-    if ! OPSCONF_BIN status --to-csv | grep -v ';0;' | sed 's/;1;/;23;/' | OPSCONF_BIN toolbox $cmd --dry-run 2> /dev/null ; then
+    if ! OPSCONF_BIN status --to-csv | grep -v ';0;' | sed 's/;1;/;23;/' | OPSCONF_BIN toolbox $cmd --dry-run &> /dev/null ; then
+        log_result "OK"
+    else
+        log_result "KO"
+    fi
+
+    log_test "$cmd: Dry-run reports the failing rows in csv"
+    report="$( (OPSCONF_BIN status --to-csv | grep -v ';0;' | sed 's/;1;/;23;/' ; echo "${CURRENT_TEST}/unknown.txt;1;") \
+               | OPSCONF_BIN toolbox $cmd --dry-run 2> /dev/null || true)"
+    if [ "$(echo "$report" | grep -c ';KO;')" -eq "$(($(OPSCONF_BIN status --to-csv | grep -c ';1;') + 1))" ] \
+       && echo "$report" | grep -q "^${CURRENT_TEST}/unknown.txt;1;;KO;" \
+       && echo "$report" | grep -q "^${FILEPATTERN/<>/5};3;3;OK;" ; then
         log_result "OK"
     else
         log_result "KO"
@@ -49,7 +60,7 @@ for operation in "validate" "qualify" ; do
 
     log_test "$cmd: Dry-run works from a file"
     OPSCONF_BIN status --to-csv | grep -v ';0;' > "$INPUTFILE"
-    if OPSCONF_BIN toolbox $cmd --dry-run "$INPUTFILE" 2> /dev/null ; then
+    if OPSCONF_BIN toolbox $cmd --dry-run "$INPUTFILE" &> /dev/null ; then
         log_result "OK"
     else
         log_result "KO"
@@ -89,4 +100,52 @@ for operation in "validate" "qualify" ; do
     OPSCONF_BIN checkout work 2> /dev/null
 done
 
+for k in {1..3} ; do
+    for n in {1..2} ; do
+        lorem_ipsum >> "${FILEPATTERN/<>/$k}"
+        OPSCONF_BIN commit -m "Change ${FILEPATTERN/<>/$k} : batch $n" "${FILEPATTERN/<>/$k}" 2> /dev/null
+    done
+done
+
+log_test "validateFromFile: Nothing is promoted if one of the versions cannot be"
+OPSCONF_BIN status --to-csv | grep -v ';0;' > "$INPUTFILE"
+echo "${FILEPATTERN/<>/5};23;" >> "$INPUTFILE"
+masterBefore="$(git rev-parse master)"
+notesBefore="$(git rev-parse refs/notes/promotion)"
+if ! OPSCONF_BIN toolbox validateFromFile -m "NOT PROMOTED" "$INPUTFILE" 2> /dev/null \
+   && [ "$(git rev-parse master)" = "$masterBefore" ] \
+   && [ "$(git rev-parse origin/master)" = "$masterBefore" ] \
+   && [ "$(git rev-parse refs/notes/promotion)" = "$notesBefore" ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "validateFromFile: The versions and their notes are pushed at once"
+# the same file can be promoted in several versions: file3 goes through v5 to v6
+OPSCONF_BIN status --to-csv | sed -n '1p' > "$INPUTFILE"
+echo "${FILEPATTERN/<>/3};5;" >> "$INPUTFILE"
+OPSCONF_BIN status --to-csv | grep "${CURRENT_TEST}" >> "$INPUTFILE"
+MESSAGE="BATCH MESSAGE"
+if [ "$(OPSCONF_BIN toolbox validateFromFile -vv -m "$MESSAGE" "$INPUTFILE" 2>&1 | grep -c "'git', 'push'")" -eq 1 ] \
+   && [ "$(git rev-parse master)" = "$(git ls-remote "$REPO_REMOTE" refs/heads/master | cut -f1)" ] \
+   && [ "$(git rev-parse refs/notes/promotion)" = "$(git ls-remote "$REPO_REMOTE" refs/notes/promotion | cut -f1)" ] \
+   && [ "$(git log master --notes=promotion --format=%N | grep -c "$MESSAGE")" -eq 4 ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+rm "$INPUTFILE"
+
+log_test "The notes of the status are read at once, then from the cache"
+git checkout master 2> /dev/null
+if [ "$(OPSCONF_BIN status --with-notes -vv 2>&1 | grep -c "'git', 'notes'")" -le 1 ] \
+   && [ "$(OPSCONF_BIN status --with-notes -vv 2>&1 | grep -c "'git', 'notes'")" -eq 0 ] \
+   && [ "$(OPSCONF_BIN status --with-notes | grep -c "$MESSAGE")" -eq 3 ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+git checkout work 2> /dev/null
+
 popd > /dev/null
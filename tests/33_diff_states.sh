@@ -0,0 +1,56 @@
+#!/bin/bash -e
+
+. env.sh
+
+CURRENT_TEST=33_diff_states
+
+pushd "$REPO_LOCAL" > /dev/null
+git checkout work 2> /dev/null
+mkdir ${CURRENT_TEST}
+
+for k in {1..3} ; do
+    FILE=${CURRENT_TEST}/file$k.txt
+    for v in {1..3} ; do
+        lorem_ipsum > "$FILE"
+        OPSCONF_BIN commit -m "Set $FILE content to $v" "$FILE" &> /dev/null
+    done
+done
+
+OPSCONF_BIN checkout master &> /dev/null
+OPSCONF_BIN validate "${CURRENT_TEST}/file1.txt" v1 &> /dev/null
+OPSCONF_BIN validate "${CURRENT_TEST}/file2.txt" v3 &> /dev/null
+OPSCONF_BIN tag "${CURRENT_TEST}_tag" &> /dev/null
+OPSCONF_BIN checkout work &> /dev/null
+
+log_test "The diff of two states gives the versions of the changed files"
+if [ "$(OPSCONF_BIN diff --states "${CURRENT_TEST}_tag" work --format csv "${CURRENT_TEST}" | tr -d "\r")" = "filename;oldVersion;newVersion;status
+${CURRENT_TEST}/file1.txt;1;3;changed
+${CURRENT_TEST}/file3.txt;;3;added" ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "The diff of two states can be printed as NDJSON"
+if [ "$(OPSCONF_BIN diff --states work "${CURRENT_TEST}_tag" --format ndjson "${CURRENT_TEST}" | sed -n '2p')" \
+     = "{\"file\": \"${CURRENT_TEST}/file3.txt\", \"newVersion\": null, \"oldVersion\": 3, \"status\": \"removed\"}" ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "The diff of two states can show the patch of the changed files"
+if [ "$(OPSCONF_BIN diff --states "${CURRENT_TEST}_tag" work --patch "${CURRENT_TEST}" | grep -c "^diff --git")" -eq 2 ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "The diff of unknown states fails"
+if ! OPSCONF_BIN diff --states "${CURRENT_TEST}_unknown" work 2> /dev/null ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+popd > /dev/null
@@ -0,0 +1,60 @@
+#!/bin/bash -e
+
+. env.sh
+
+CURRENT_TEST=34_liststates
+
+pushd "$REPO_LOCAL" > /dev/null
+git checkout work 2> /dev/null
+mkdir ${CURRENT_TEST}
+
+for k in {1..2} ; do
+    FILE=${CURRENT_TEST}/file$k.txt
+    lorem_ipsum > "$FILE"
+    OPSCONF_BIN commit -m "Create $FILE" "$FILE" &> /dev/null
+done
+OPSCONF_BIN checkout master &> /dev/null
+OPSCONF_BIN tag -m "${CURRENT_TEST}: before" "${CURRENT_TEST}_before" &> /dev/null
+OPSCONF_BIN validate "${CURRENT_TEST}/file1.txt" v1 &> /dev/null
+OPSCONF_BIN tag -m "${CURRENT_TEST}: after" "${CURRENT_TEST}_after" &> /dev/null
+OPSCONF_BIN checkout work &> /dev/null
+
+log_test "The states list the branches and the tags"
+STATES=$(OPSCONF_BIN liststates --to-csv | tr -d "\r" | cut -d";" -f1,2)
+if [ "$(echo "$STATES" | head -4)" = "state;type
+work;branch
+qualification;branch
+master;branch" ] && echo "$STATES" | grep -q "^${CURRENT_TEST}_before;tag$" \
+   && echo "$STATES" | grep -q "^${CURRENT_TEST}_after;tag$" ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "The states give the number of files that differ from master"
+STATES=$(OPSCONF_BIN liststates --format ndjson)
+if echo "$STATES" | grep "\"state\": \"${CURRENT_TEST}_before\"" | grep -q "\"changedFiles\": 1," \
+   && echo "$STATES" | grep "\"state\": \"${CURRENT_TEST}_after\"" | grep -q "\"changedFiles\": 0," \
+   && echo "$STATES" | grep "\"state\": \"${CURRENT_TEST}_after\"" | grep -q "\"message\": \"${CURRENT_TEST}: after\"" \
+   && [ "$(OPSCONF_BIN liststates | grep -c "^| ${CURRENT_TEST}_")" -eq 2 ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "The states are read with one command, whatever the number of tags"
+for k in {1..100} ; do
+    echo "create refs/tags/${CURRENT_TEST}_$k $(git rev-parse "work~$((k % 2))")"
+done | git update-ref --stdin
+COMMANDS=$(OPSCONF_BIN liststates -vv 2>&1 > /dev/null | grep "Running command")
+if [ "$(echo "$COMMANDS" | grep -c "'for-each-ref'")" -eq 1 ] && [ "$(echo "$COMMANDS" | grep -c "'diff-tree'")" -eq 1 ] \
+   && [ "$(OPSCONF_BIN liststates --to-csv | grep -c "^${CURRENT_TEST}_[0-9]*;tag;")" -eq 100 ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+for k in {1..100} ; do
+    echo "delete refs/tags/${CURRENT_TEST}_$k"
+done | git update-ref --stdin
+
+popd > /dev/null
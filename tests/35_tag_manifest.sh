@@ -0,0 +1,66 @@
+#!/bin/bash -e
+
+. env.sh
+
+CURRENT_TEST=35_tag_manifest
+
+pushd "$REPO_LOCAL" > /dev/null
+git checkout work 2> /dev/null
+mkdir ${CURRENT_TEST}
+
+FILE=${CURRENT_TEST}/file.txt
+for v in {1..3} ; do
+    lorem_ipsum > "$FILE"
+    OPSCONF_BIN commit -m "Set $FILE content to $v" "$FILE" &> /dev/null
+done
+OPSCONF_BIN checkout master &> /dev/null
+OPSCONF_BIN validate "$FILE" v2 &> /dev/null
+OPSCONF_BIN tag "${CURRENT_TEST}_tag" &> /dev/null
+OPSCONF_BIN checkout work &> /dev/null
+MANIFEST=refs/opsconf/manifests/${CURRENT_TEST}_tag
+
+log_test "A tag is pushed with the manifest of the versions of its files"
+if [ "$(git ls-remote origin "$MANIFEST" | cut -f1)" = "$(git rev-parse "$MANIFEST")" ] \
+   && [ "$(git cat-file blob "$MANIFEST" | head -1)" = "opsconf-manifest 1 $(git rev-parse "${CURRENT_TEST}_tag^{commit}")" ] \
+   && git cat-file blob "$MANIFEST" | grep -q "^2	[0-9a-f]*	$FILE$" ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "The versions of a tag are read from its manifest"
+# a forged manifest shows where the versions come from
+FORGED=$(git cat-file blob "$MANIFEST" | sed "s|^2\(	.*	$FILE\)$|42\1|" | git hash-object -w --stdin)
+ORIGINAL=$(git rev-parse "$MANIFEST")
+git update-ref "$MANIFEST" "$FORGED"
+if OPSCONF_BIN status "${CURRENT_TEST}_tag" | grep -q "| $FILE *| v42" \
+   && [ "$(OPSCONF_BIN diff --states "${CURRENT_TEST}_tag" work --format csv "$FILE" | tr -d "\r" | tail -1)" = "$FILE;42;3;changed" ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+git update-ref "$MANIFEST" "$ORIGINAL"
+
+log_test "The manifest of a moved tag is ignored"
+git tag -f -a -m "${CURRENT_TEST}: moved" "${CURRENT_TEST}_tag" work &> /dev/null
+if OPSCONF_BIN status "${CURRENT_TEST}_tag" | grep -q "| $FILE *| v3 " ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+git fetch -q -f origin "refs/tags/${CURRENT_TEST}_tag:refs/tags/${CURRENT_TEST}_tag"
+
+log_test "A tag whose push fails is not created"
+TAG=${CURRENT_TEST}_failed
+printf '#!/bin/sh\nexit 1\n' > "${REPO_REMOTE}/hooks/pre-receive"
+chmod +x "${REPO_REMOTE}/hooks/pre-receive"
+if ! OPSCONF_BIN tag "$TAG" &> /dev/null && ! git rev-parse -q --verify "refs/tags/$TAG" > /dev/null \
+   && ! git rev-parse -q --verify "refs/opsconf/manifests/$TAG" > /dev/null \
+   && [ -z "$(git ls-remote origin "refs/opsconf/manifests/$TAG")" ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+rm "${REPO_REMOTE}/hooks/pre-receive"
+
+popd > /dev/null
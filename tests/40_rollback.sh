@@ -51,6 +51,48 @@ else
     log_result "KO"
 fi
 
+log_test "Rollback restores a binary version"
+BINFILE=${CURRENT_TEST}/file.bin
+head -c 4096 /dev/urandom > "$BINFILE"
+OPSCONF_BIN commit -m "Create $BINFILE" "$BINFILE" &> /dev/null
+cp "$BINFILE" "$WORKSPACE/${CURRENT_TEST}_v1.bin"
+head -c 4096 /dev/urandom > "$BINFILE"
+OPSCONF_BIN commit -m "Change $BINFILE" "$BINFILE" &> /dev/null
+if OPSCONF_BIN rollback -m "Back to v1" "$BINFILE" v1 &> /dev/null && cmp -s "$BINFILE" "$WORKSPACE/${CURRENT_TEST}_v1.bin" \
+   && [ "$(git log --format=%s -n1 -- "$BINFILE")" = "v3: Back to v1" ] && [ -z "$(git status --porcelain -- "$BINFILE")" ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+rm -f "$WORKSPACE/${CURRENT_TEST}_v1.bin"
+
+log_test "Rollback to a tag restores the changed files with a single push"
+DIR=${CURRENT_TEST}/directory
+mkdir "$DIR"
+for k in {1..3} ; do
+    lorem_ipsum > "$DIR/file$k.txt"
+    OPSCONF_BIN commit -m "Create $DIR/file$k.txt" "$DIR/file$k.txt" &> /dev/null
+done
+OPSCONF_BIN tag -m "Before the changes" "${CURRENT_TEST}_tag" &> /dev/null
+for k in {1..2} ; do
+    lorem_ipsum > "$DIR/file$k.txt"
+    OPSCONF_BIN commit -m "Change $DIR/file$k.txt" "$DIR/file$k.txt" &> /dev/null
+done
+lorem_ipsum > "$DIR/file4.txt"
+OPSCONF_BIN commit -m "Create $DIR/file4.txt" "$DIR/file4.txt" &> /dev/null
+TIP=$(git rev-parse work)
+OPSCONF_BIN rollback -m "Back to the tag" --to-tag "${CURRENT_TEST}_tag" "$DIR" &> /dev/null
+if [ -z "$(git diff "${CURRENT_TEST}_tag" work -- "$DIR/file1.txt" "$DIR/file2.txt" "$DIR/file3.txt")" ] \
+   && [ -f "$DIR/file4.txt" ] && [ "$(git rev-list --count "$TIP..work")" -eq 2 ] \
+   && [ "$(git log --format=%B -n1 -- "$DIR/file2.txt")" = "v3: Back to the tag
+
+Rolled-back to v1 of tag ${CURRENT_TEST}_tag" ] \
+   && [ "$(git ls-remote origin refs/heads/work | cut -f1)" = "$(git rev-parse work)" ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
 log_test "Rollback does not work on master branch"
 OPSCONF_BIN checkout master
 if ! OPSCONF_BIN rollback -m "test" $FILE v1 ; then
@@ -104,4 +104,56 @@ else
     log_result "KO"
 fi
 
+log_test "Removing a directory removes nothing if one of its files is not tracked"
+OPSCONF_BIN checkout work
+DIR=${CURRENT_TEST}/directory
+mkdir "$DIR"
+for k in {1..3} ; do
+    lorem_ipsum > "$DIR/file$k.txt"
+    OPSCONF_BIN commit -m "Create $DIR/file$k.txt" "$DIR/file$k.txt" &> /dev/null
+done
+touch "$DIR/untracked.txt"
+if ! yes | OPSCONF_BIN remove -r -m "Removed" "$DIR" &> /dev/null && [ "$(git ls-files "$DIR" | wc -l)" -eq 3 ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "Removing a directory removes all its files"
+rm "$DIR/untracked.txt"
+yes | OPSCONF_BIN remove -r -m "Removed" "$DIR" &> /dev/null
+if [ "$(git ls-files "$DIR" | wc -l)" -eq 0 ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "Removing a directory removes nothing if one of its files has local changes"
+mkdir "$DIR"
+for k in {1..3} ; do
+    lorem_ipsum > "$DIR/file$k.txt"
+    OPSCONF_BIN commit -m "Create $DIR/file$k.txt" "$DIR/file$k.txt" &> /dev/null
+done
+TIP=$(git rev-parse work)
+echo "local change" >> "$DIR/file2.txt"
+if ! yes | OPSCONF_BIN remove -r -m "Removed" "$DIR" &> /dev/null \
+   && [ "$(git rev-parse work)" = "$TIP" ] && [ "$(git ls-files "$DIR" | wc -l)" -eq 3 ] \
+   && grep -q "local change" "$DIR/file2.txt" ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "Removing a directory creates one commit per file and pushes them"
+git checkout -q "$DIR/file2.txt"
+yes | OPSCONF_BIN remove -r -m "Removed again" "$DIR" &> /dev/null
+if [ "$(git log --format=%s "$TIP..work" | grep -c "^vZZ: Removed again$")" -eq 3 ] \
+   && [ "$(git rev-list --count "$TIP..work")" -eq 3 ] \
+   && [ "$(git ls-remote origin refs/heads/work | cut -f1)" = "$(git rev-parse work)" ] \
+   && [ ! -e "$DIR" ] && [ -z "$(git status --porcelain -- "$DIR")" ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
 popd > /dev/null
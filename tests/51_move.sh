@@ -0,0 +1,85 @@
+#!/bin/bash -e
+
+. env.sh
+
+CURRENT_TEST=51_move
+
+pushd "$REPO_LOCAL" > /dev/null
+git checkout work 2> /dev/null
+mkdir -p ${CURRENT_TEST}/source/subdir
+
+FILE=${CURRENT_TEST}/file.txt
+lorem_ipsum > "$FILE"
+OPSCONF_BIN commit -m "Create $FILE" "$FILE" &> /dev/null
+for k in {2..3} ; do
+    lorem_ipsum > "$FILE"
+    OPSCONF_BIN commit -m "Set $FILE content to $k" "$FILE" &> /dev/null
+done
+for f in file1.txt file2.txt subdir/file3.txt ; do
+    lorem_ipsum > "${CURRENT_TEST}/source/$f"
+    OPSCONF_BIN commit -m "Create $f" "${CURRENT_TEST}/source/$f" &> /dev/null
+done
+
+log_test "Moving a file keeps its content and starts a new history linked to the source"
+CONTENT=$(cat "$FILE")
+OPSCONF_BIN move -m "Moved" "$FILE" "${CURRENT_TEST}/moved.txt" &> /dev/null
+if [ ! -e "$FILE" ] && [ "$(cat "${CURRENT_TEST}/moved.txt")" = "$CONTENT" ] \
+   && [ "$(OPSCONF_BIN log "${CURRENT_TEST}/moved.txt" | wc -l)" -eq 1 ] \
+   && git log -1 --format=%B -- "${CURRENT_TEST}/moved.txt" | grep -q "^Opsconf-Moved-From: $FILE$" ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "The log follows the history of a moved file"
+if [ "$(OPSCONF_BIN log --follow "${CURRENT_TEST}/moved.txt" | wc -l)" -eq 4 ] \
+   && [ "$(OPSCONF_BIN log --follow --to-csv "${CURRENT_TEST}/moved.txt" | grep -c "^$FILE;")" -eq 3 ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "Moving a directory moves all its files with a single push"
+TIP=$(git rev-parse work)
+OPSCONF_BIN move -m "Moved directory" "${CURRENT_TEST}/source" "${CURRENT_TEST}/destination" &> /dev/null
+if [ ! -e "${CURRENT_TEST}/source" ] && [ "$(git ls-files "${CURRENT_TEST}/destination" | wc -l)" -eq 3 ] \
+   && [ "$(git rev-list --count "$TIP..work")" -eq 6 ] \
+   && [ "$(git ls-remote origin refs/heads/work | cut -f1)" = "$(git rev-parse work)" ] \
+   && [ "$(OPSCONF_BIN log --follow "${CURRENT_TEST}/destination/subdir/file3.txt" | wc -l)" -eq 2 ] \
+   && [ -z "$(git status --porcelain -- "${CURRENT_TEST}")" ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "Moving a directory moves nothing if one of its files has local changes"
+TIP=$(git rev-parse work)
+echo "local change" >> "${CURRENT_TEST}/destination/file1.txt"
+if ! OPSCONF_BIN move -m "Moved again" "${CURRENT_TEST}/destination" "${CURRENT_TEST}/other" &> /dev/null \
+   && [ "$(git rev-parse work)" = "$TIP" ] && [ ! -e "${CURRENT_TEST}/other" ] \
+   && grep -q "local change" "${CURRENT_TEST}/destination/file1.txt" ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+git checkout -q "${CURRENT_TEST}/destination/file1.txt"
+
+log_test "It is not possible to move a file onto an existing file"
+if ! OPSCONF_BIN move -m "Moved" "${CURRENT_TEST}/moved.txt" "${CURRENT_TEST}/destination/file1.txt" &> /dev/null \
+   && [ -f "${CURRENT_TEST}/moved.txt" ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "A moved file can be validated"
+OPSCONF_BIN checkout master &> /dev/null
+OPSCONF_BIN validate "${CURRENT_TEST}/moved.txt" v1 &> /dev/null
+if [ -f "${CURRENT_TEST}/moved.txt" ] && [ "$(OPSCONF_BIN log --follow "${CURRENT_TEST}/moved.txt" | wc -l)" -eq 1 ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+OPSCONF_BIN checkout work &> /dev/null
+
+popd > /dev/null
@@ -0,0 +1,65 @@
+#!/bin/bash -e
+
+. env.sh
+
+CURRENT_TEST=60_history_index
+
+pushd "$REPO_LOCAL" > /dev/null
+git checkout work 2> /dev/null
+mkdir ${CURRENT_TEST}
+
+FILE=${CURRENT_TEST}/file.txt
+INDEX_FILE="$(git rev-parse --git-dir)/opsconf/index.json"
+
+touch "$FILE"
+OPSCONF_BIN commit -m "Create $FILE" "$FILE" &> /dev/null
+for _ in {2..4} ; do
+    lorem_ipsum > "$FILE"
+    OPSCONF_BIN commit -m "Change $FILE content" "$FILE" &> /dev/null
+done
+
+log_test "The history index is created"
+OPSCONF_BIN status > /dev/null
+if [ -f "$INDEX_FILE" ]; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "The history index is updated with new commits"
+lorem_ipsum > "$FILE"
+OPSCONF_BIN commit -m "Change $FILE content" "$FILE" &> /dev/null
+if [ "$(OPSCONF_BIN log "$FILE" | wc -l)" -eq 5 ]; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "The history index reads the references once per command"
+if [ "$(OPSCONF_BIN log --all -vv "$FILE" 2>&1 | grep -c "'for-each-ref'")" -eq 1 ]; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "A rebuilt history index gives the same results"
+status_before="$(OPSCONF_BIN status)"
+log_before="$(OPSCONF_BIN log --all "$FILE")"
+rm "$INDEX_FILE"
+if [ "$(OPSCONF_BIN status)" = "$status_before" ] && [ "$(OPSCONF_BIN log --all "$FILE")" = "$log_before" ]; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "The history index follows a rewritten branch"
+work_tip="$(git rev-parse HEAD)"
+git reset --hard HEAD~1 &> /dev/null
+if [ "$(OPSCONF_BIN log "$FILE" | wc -l)" -eq 4 ]; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+git reset --hard "$work_tip" &> /dev/null
+
+popd > /dev/null
@@ -0,0 +1,56 @@
+#!/bin/bash -e
+
+. env.sh
+
+CURRENT_TEST=61_fetch_freshness
+
+pushd "$REPO_LOCAL" > /dev/null
+git checkout work 2> /dev/null
+mkdir ${CURRENT_TEST}
+
+FILE=${CURRENT_TEST}/file.txt
+
+fetch_count() {
+    OPSCONF_BIN "$@" -vv 2>&1 | grep -c "'git', 'fetch'" || true
+}
+
+log_test "A commit fetches the remote repository"
+touch "$FILE"
+OPSCONF_BIN commit -m "Create $FILE" "$FILE" &> /dev/null
+lorem_ipsum > "$FILE"
+if [ "$(fetch_count commit -m "Change $FILE content" "$FILE")" -ge 1 ]; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "A read-only command does not fetch a remote repository fetched recently"
+if [ "$(OPSCONF_FETCH_TTL=3600 fetch_count log "$FILE")" -eq 0 ]; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "A read-only command fetches when the last fetch is too old"
+if [ "$(OPSCONF_FETCH_TTL=0 fetch_count status)" -eq 1 ]; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "A read-only command does not fetch when offline"
+if [ "$(OPSCONF_FETCH_TTL=0 fetch_count status --offline)" -eq 0 ]; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "A command that changes the repository fetches even when offline"
+lorem_ipsum > "$FILE"
+if [ "$(OPSCONF_FETCH_TTL=3600 fetch_count commit --offline -m "Change $FILE content" "$FILE")" -ge 1 ]; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+popd > /dev/null
@@ -0,0 +1,30 @@
+#!/bin/bash -e
+
+. env.sh
+
+pushd "$REPO_LOCAL" > /dev/null
+git checkout work 2> /dev/null
+
+log_test "The help does not import the subcommands"
+if ! python3 -X importtime "$ROOT_DIR/src/bin/opsconf" --help 2>&1 > /dev/null | grep -q "opsconf\.subcommand\." ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "The toolbox lists its scripts without importing them"
+toolbox_help="$(python3 -X importtime "$ROOT_DIR/src/bin/opsconf" toolbox --help 2>&1)"
+if grep -q "qualifyFromFile,validateFromFile" <<< "$toolbox_help" && ! grep -q "toolbox\.qualifyFromFile" <<< "$toolbox_help" ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "A toolbox script is loaded when it is run"
+if OPSCONF_BIN toolbox qualifyFromFile --help | grep -q "dry-run" ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+popd > /dev/null
@@ -0,0 +1,34 @@
+#!/bin/bash -e
+
+. env.sh
+
+pushd "$REPO_LOCAL" > /dev/null
+git checkout work 2> /dev/null
+
+log_test "The asynchronous git queries give the same results as the blocking ones"
+if OPSCONF_GIT_JOBS=2 python3 - <<'PYTHON'
+import sys
+from opsconf import libgit
+from opsconf.libgit import aio
+
+files = libgit.listAllFilesInRevision('work')
+expected = [libgit.logOneFile(filename, 'work') for filename in files]
+expected += [libgit.existFileInRevision(filename, 'master') for filename in files]
+results = aio.runAll([aio.logOneFile(filename, 'work') for filename in files]
+                     + [aio.existFileInRevision(filename, 'master') for filename in files])
+sys.exit(0 if files and results == expected and aio.runSync(aio.listAllFilesInRevision('work')) == files else 1)
+PYTHON
+then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "The status does not import asyncio"
+if ! python3 -X importtime "$ROOT_DIR/src/bin/opsconf" status --offline --with-notes 2>&1 > /dev/null | grep -q " asyncio$" ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+popd > /dev/null
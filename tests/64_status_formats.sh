@@ -0,0 +1,35 @@
+#!/bin/bash -e
+
+. env.sh
+
+pushd "$REPO_LOCAL" > /dev/null
+git checkout work 2> /dev/null
+
+log_test "The status in ndjson gives the same versions as in csv"
+csv_versions="$(OPSCONF_BIN status --to-csv | tail -n +2 | cut -d';' -f1,2)"
+ndjson_versions="$(OPSCONF_BIN status --format ndjson \
+    | python3 -c 'import json, sys; [print("{};{}".format(row["file"], row["version"])) for row in map(json.loads, sys.stdin)]')"
+if [ -n "$csv_versions" ] && [ "$csv_versions" = "$ndjson_versions" ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "The status table with a fixed width has the same rows"
+if [ "$(OPSCONF_BIN status --with-notes | tr -s ' -')" = "$(OPSCONF_BIN status --with-notes --width 12 | tr -s ' -')" ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "The status stops quietly when its reader stops"
+result=OK
+for format in table csv ndjson ; do
+    # the reader exits before the status is printed
+    if OPSCONF_BIN status --format "$format" 2>&1 > >(true) | grep -q "Traceback\|BrokenPipeError" ; then
+        result=KO
+    fi
+done
+log_result "$result"
+
+popd > /dev/null
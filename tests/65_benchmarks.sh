@@ -0,0 +1,26 @@
+#!/bin/bash -e
+
+. env.sh
+
+CURRENT_TEST=65_benchmarks
+
+BASELINE="$WORKSPACE/${CURRENT_TEST}.json"
+
+log_test "The benchmark of the subcommands runs on a generated repository"
+if python3 "$ROOT_DIR/benchmarks/subcommands.py" --files 30 --versions 3 --tags 2 --deletions 3 --runs 1 \
+       --output "$BASELINE" > /dev/null 2>&1 \
+   && python3 -c 'import json, sys; cases = json.load(open(sys.argv[1]))["cases"]; sys.exit(0 if len(cases) == 12 and all(case["gitProcesses"] > 0 for case in cases.values()) else 1)' "$BASELINE" ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "The benchmark reports the regressions against a baseline"
+python3 -c 'import json, sys; baseline = json.load(open(sys.argv[1])); baseline["cases"]["status"]["gitProcesses"] = 1; json.dump(baseline, open(sys.argv[1], "w"))' "$BASELINE"
+if ! python3 "$ROOT_DIR/benchmarks/subcommands.py" --files 30 --versions 3 --tags 2 --deletions 3 --runs 1 \
+       --baseline "$BASELINE" --tolerance 2 2> /dev/null | grep -q "^Regression: status: gitProcesses" ; then
+    log_result "KO"
+else
+    log_result "OK"
+fi
+rm "$BASELINE"
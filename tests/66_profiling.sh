@@ -0,0 +1,39 @@
+#!/bin/bash -e
+
+. env.sh
+
+CURRENT_TEST=66_profiling
+
+pushd "$REPO_LOCAL" > /dev/null
+git checkout work 2> /dev/null
+
+TRACE="$WORKSPACE/${CURRENT_TEST}.json"
+
+log_test "The option --profile prints a summary of the git commands"
+if OPSCONF_BIN status --profile 2>&1 > /dev/null | grep -q "^| libopsconf.iterCurrentVersions .*| listAllFilesInRevision" ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "OPSCONF_PROFILE writes a trace of the git commands"
+OPSCONF_PROFILE="$TRACE" OPSCONF_BIN status > /dev/null
+if python3 -c 'import json, sys; events = json.load(open(sys.argv[1]))["traceEvents"]; sys.exit(0 if events and all(event["ph"] == "X" and event["args"]["argv"][0] == "git" for event in events) else 1)' "$TRACE" ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+rm -f "$TRACE"
+
+log_test "The profiling records the history walks and the object lookups"
+rm "$(git rev-parse --git-dir)/opsconf/index.json"
+SUMMARY=$(OPSCONF_BIN log --all --profile "$(git ls-files | grep -v "^\.opsconf$" | head -1)" 2>&1 > /dev/null)
+if grep -q "^| libindex._updateBranch .*| iterLogNameStatus " <<< "$SUMMARY" \
+   && grep -q "^| git cat-file --batch-check " <<< "$SUMMARY" \
+   && grep -q "^| libopsconf.isOpsConfRepo .*| existFileInRevision " <<< "$SUMMARY" ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+popd > /dev/null
@@ -0,0 +1,72 @@
+#!/bin/bash -e
+
+. env.sh
+
+CURRENT_TEST=67_sync
+
+pushd "$REPO_LOCAL" > /dev/null
+git checkout work 2> /dev/null
+
+# a commit on top of a branch, with the same content
+commit_on_top() {
+    git commit-tree "$1^{tree}" -p "$1" -m "$2"
+}
+
+log_test "A sync fetches the branches and the notes at once"
+OPSCONF_BIN sync &> /dev/null
+if [ "$(OPSCONF_FETCH_TTL=3600 OPSCONF_BIN sync -vv 2>&1 | grep -c "'git', 'fetch'")" -eq 1 ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "A sync of all the branches updates the branches that are not checked out"
+QUALIF_TIP=$(git rev-parse qualification)
+REMOTE_COMMIT=$(commit_on_top qualification "${CURRENT_TEST}: remote commit")
+git push -q origin "$REMOTE_COMMIT:refs/heads/qualification"
+git update-ref refs/remotes/origin/qualification "$QUALIF_TIP"
+MASTER_TIP=$(git rev-parse master)
+LOCAL_COMMIT=$(commit_on_top master "${CURRENT_TEST}: local commit")
+git update-ref refs/heads/master "$LOCAL_COMMIT" "$MASTER_TIP"
+OPSCONF_BIN sync --all &> /dev/null
+if [ "$(git rev-parse qualification)" = "$REMOTE_COMMIT" ] \
+   && [ "$(git ls-remote origin refs/heads/master | cut -f1)" = "$LOCAL_COMMIT" ] \
+   && [ "$(git rev-parse --abbrev-ref HEAD)" = "work" ] && [ "$(git rev-parse work)" = "$(git rev-parse origin/work)" ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+
+log_test "A sync of all the branches changes nothing if one of them has diverged"
+QUALIF_TIP=$(git rev-parse qualification)
+git push -q origin "$(commit_on_top qualification "${CURRENT_TEST}: diverged remote commit"):refs/heads/qualification"
+git update-ref refs/heads/qualification "$(commit_on_top qualification "${CURRENT_TEST}: diverged local commit")"
+DIVERGED_TIP=$(git rev-parse qualification)
+MASTER_TIP=$(git rev-parse master)
+git update-ref refs/heads/master "$(commit_on_top master "${CURRENT_TEST}: local commit")"
+if ! OPSCONF_BIN sync --all &> /dev/null && [ "$(git rev-parse qualification)" = "$DIVERGED_TIP" ] \
+   && [ "$(git ls-remote origin refs/heads/master | cut -f1)" = "$MASTER_TIP" ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+# back to a synchronized state for the next tests
+git update-ref refs/heads/master "$MASTER_TIP"
+git push -q -f origin "$QUALIF_TIP:refs/heads/qualification"
+git update-ref refs/heads/qualification "$QUALIF_TIP"
+git fetch -q origin
+
+log_test "A sync with a remote that lacks some of the branches synchronizes the others"
+OTHER_REMOTE="$WORKSPACE/${CURRENT_TEST}_other.git"
+git init -q --bare "$OTHER_REMOTE"
+git remote add other "$OTHER_REMOTE"
+git push -q other "$(git rev-parse work~1):refs/heads/work"
+if OPSCONF_BIN sync --all other &> /dev/null && [ "$(git ls-remote other refs/heads/work | cut -f1)" = "$(git rev-parse work)" ] \
+   && [ -z "$(git ls-remote other refs/heads/master)" ] ; then
+    log_result "OK"
+else
+    log_result "KO"
+fi
+git remote remove other
+
+popd > /dev/null